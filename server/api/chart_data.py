@@ -0,0 +1,94 @@
+# api/chart_data.py
+# 2026-10-18 18:30:00 UTC
+# Aggregated chart data: top-N categories plus an "Other" bucket, cached per file
+
+from flask import request, jsonify
+from utils.hybrid_storage import storage_manager
+from utils.user_manager import user_manager
+from utils.cache_manager import data_cache
+from utils.aggregation import parse_agg, parse_top_n, top_n_with_other, AGG_COUNT, InvalidAggregationRequest
+from utils.data_processor import clean_column_name, resolve_column
+from config import TOP_N_DEFAULT
+
+def _top_n(user_id, file_id, x_column, y_column, agg, top_n):
+    df = storage_manager.get_file_df(user_id, file_id)
+    if df is None:
+        return None
+    return top_n_with_other(df, x_column, y_column, agg, top_n)
+
+def register_chart_data_routes(app):
+    """Register aggregated chart data routes with the Flask app"""
+    
+    @app.route('/api/chart-data', methods=['POST'])
+    def get_chart_data():
+        """
+        Aggregate a file's y column per x category (sum, count or mean), keep
+        the top N categories and fold the rest into "Other", so bar and pie
+        charts stay small however many categories the file has
+        """
+        try:
+            data = request.json
+            file_id = data.get('fileId')
+            session_id = data.get('sessionId')
+            x_name = data.get('xColumn')
+            y_name = data.get('yColumn')
+            
+            try:
+                agg = parse_agg(data.get('agg'))
+                top_n = parse_top_n(data.get('topN'), TOP_N_DEFAULT)
+            except InvalidAggregationRequest as e:
+                return jsonify({
+                    'error': str(e),
+                    'message': 'Invalid aggregation request'
+                }), 400
+            
+            # Get user ID
+            user_id = user_manager.get_or_create_user_id(session_id)
+            
+            version = storage_manager.get_file_version(user_id, file_id)
+            
+            if version is None:
+                return jsonify({
+                    'error': 'File not found'
+                }), 404
+            
+            # Default to the same chart columns as /process-file; the upload-time
+            # profile lists them without loading the frame. Names may be given as
+            # stored or cleaned (as /process-file and /api/files report them)
+            columns = list(storage_manager.get_file_profile(user_id, file_id) or {})
+            if x_name is None and len(columns) > 0:
+                x_name = clean_column_name(columns[0])
+            if y_name is None and agg != AGG_COUNT and len(columns) > 1:
+                y_name = clean_column_name(columns[1])
+            x_column = resolve_column(columns, x_name) if x_name is not None else None
+            y_column = resolve_column(columns, y_name) if y_name is not None else None
+            
+            missing = [name for name, col in ((x_name, x_column), (y_name, y_column))
+                       if name is not None and col is None]
+            if x_name is None or (y_name is None and agg != AGG_COUNT) or missing:
+                return jsonify({
+                    'error': f"Column not found: {', '.join(missing) or 'none selected'}",
+                    'message': 'Select an x column and, except for counts, a y column'
+                }), 400
+            
+            # Computed once per (file content, x, y, agg, N)
+            params = {'xColumn': x_column, 'yColumn': y_column, 'agg': agg, 'topN': top_n}
+            result, cache_hit = data_cache.get_or_compute(
+                'top_n', version, params,
+                lambda: _top_n(user_id, file_id, x_column, y_column, agg, top_n)
+            )
+            
+            if result is None:
+                return jsonify({
+                    'error': 'File not found'
+                }), 404
+            
+            response = jsonify(dict(result, xColumn=x_name, yColumn=y_name, agg=agg, topN=top_n))
+            response.headers['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+            return response
+            
+        except Exception as e:
+            return jsonify({
+                'error': str(e),
+                'message': 'Failed to get chart data'
+            }), 500
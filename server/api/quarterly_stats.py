@@ -2,11 +2,112 @@
 # 2025-07-28 17:50:00 UTC
 # Updated to work with hybrid storage system
 
+import math
 from flask import request, jsonify
 from utils.hybrid_storage import storage_manager
 from utils.user_manager import user_manager
-from utils.data_processor import process_uploaded_file
-import pandas as pd
+from utils.data_processor import resolve_date_column, unique_quarters
+from utils.quarterly_summaries import TOTALS_PERIOD, percentile_name
+from utils.cache_manager import data_cache
+from utils.quantile_sketch import rank_error_bound
+from config import QUARTERLY_PERCENTILES, QUANTILE_SKETCH_K
+
+
+def _requested_period(year, quarter):
+    """(year, quarter) to look up; the whole-file totals when either is missing"""
+    if not (year and quarter):
+        return TOTALS_PERIOD
+    try:
+        return int(year), int(quarter)
+    except (TypeError, ValueError):
+        return -1, -1  # Matches no quarter, like the old mask comparison
+
+
+def _requested_percentiles(percentiles):
+    """Validated list of percentiles (0-100), defaulting to QUARTERLY_PERCENTILES"""
+    if percentiles is None:
+        return QUARTERLY_PERCENTILES
+    try:
+        percentiles = [float(p) for p in percentiles]
+    except (TypeError, ValueError):
+        percentiles = None
+    if not percentiles or not all(0 <= p <= 100 for p in percentiles):
+        raise ValueError("'percentiles' must be a list of numbers from 0 to 100")
+    return [int(p) if p.is_integer() else p for p in percentiles]
+
+
+def _sketch_percentiles(sketch, percentiles):
+    """{'median': ..., 'p90': ...} from a sketch; None (JSON null) when the period has no values"""
+    values = sketch.quantiles([p / 100 for p in percentiles]) if sketch is not None else [None] * len(percentiles)
+    return {percentile_name(p): value for p, value in zip(percentiles, values)}
+
+
+def _null_missing(numeric_columns):
+    """Replace NaN statistics (periods where a column has no values) with None, which jsonify writes as null"""
+    return {col: {name: None if isinstance(value, float) and math.isnan(value) else value
+                  for name, value in stats.items()}
+            for col, stats in numeric_columns.items()}
+
+
+def _quarter_options(quarters, date_column):
+    return jsonify({
+        'availableQuarters': [{'year': year, 'quarter': quarter, 'name': f"Q{quarter} {year}"}
+                              for year, quarter in quarters],
+        'dateColumn': date_column
+    })
+
+
+def _compute_quarterly_stats(user_id, file_id, date_column, year, quarter):
+    """Statistics of the numeric columns for one quarter (or the whole file), or None if the file is gone"""
+    # Profiled date columns are answered from the upload-time summaries and sketches
+    if date_column:
+        period = _requested_period(year, quarter)
+        summary = storage_manager.get_quarter_summary(user_id, file_id, date_column, *period)
+        if summary is not None:
+            total_records, numeric_columns = summary
+            sketches = storage_manager.get_quarter_sketches(user_id, file_id, date_column, [period]) or {}
+            for col, stats in numeric_columns.items():
+                stats.update(_sketch_percentiles(sketches.get(col), QUARTERLY_PERCENTILES))
+            return {
+                'totalRecords': total_records,
+                'numericColumns': _null_missing(numeric_columns)
+            }
+    
+    # Load data from hybrid storage
+    df = storage_manager.get_file_df(user_id, file_id)
+    
+    if df is None:
+        return None
+    
+    # Filter by quarter using the date parts cached for the file
+    df_filtered = df
+    if date_column and year and quarter and date_column in df.columns:
+        years, quarters = storage_manager.get_date_parts(user_id, file_id, date_column)
+        target_year, target_quarter = _requested_period(year, quarter)
+        df_filtered = df[(years == target_year) & (quarters == target_quarter)]
+    
+    # Calculate statistics
+    stats = {
+        'totalRecords': len(df_filtered),
+        'numericColumns': {}
+    }
+    
+    # Get stats for numeric columns
+    numeric_cols = df_filtered.select_dtypes(include=['number']).columns
+    for col in numeric_cols:
+        if col != date_column:
+            stats['numericColumns'][col] = {
+                'sum': float(df_filtered[col].sum()),
+                'average': float(df_filtered[col].mean()),
+                'min': float(df_filtered[col].min()),
+                'max': float(df_filtered[col].max()),
+                **{percentile_name(p): float(value) for p, value in
+                   zip(QUARTERLY_PERCENTILES, df_filtered[col].quantile([p / 100 for p in QUARTERLY_PERCENTILES]))}
+            }
+    stats['numericColumns'] = _null_missing(stats['numericColumns'])
+    
+    return stats
+
 
 def register_quarterly_stats_routes(app):
     """Register quarterly stats routes with the Flask app"""
@@ -25,49 +126,30 @@ def register_quarterly_stats_routes(app):
             # Get user ID
             user_id = user_manager.get_or_create_user_id(session_id)
             
-            # Load data from hybrid storage
-            df = storage_manager.get_file_df(user_id, file_id)
+            version = storage_manager.get_file_version(user_id, file_id)
             
-            if df is None:
+            if version is None:
                 return jsonify({
                     'error': 'File not found'
                 }), 404
             
-            # Process dates and add quarter information
-            if date_column and date_column in df.columns:
-                df = process_uploaded_file(df, [date_column])
-            
-            # Filter by quarter
-            if date_column and year and quarter:
-                year_col = f'{date_column}_year'
-                quarter_col = f'{date_column}_quarter'
-                
-                if year_col in df.columns and quarter_col in df.columns:
-                    mask = (df[year_col] == year) & (df[quarter_col] == quarter)
-                    df_filtered = df[mask]
-                else:
-                    df_filtered = df
-            else:
-                df_filtered = df
-            
-            # Calculate statistics
-            stats = {
-                'totalRecords': len(df_filtered),
-                'numericColumns': {}
-            }
+            date_column = resolve_date_column(storage_manager.get_file_profile(user_id, file_id), date_column)
             
-            # Get stats for numeric columns
-            numeric_cols = df_filtered.select_dtypes(include=['number']).columns
-            for col in numeric_cols:
-                if col not in [date_column, f'{date_column}_year', f'{date_column}_quarter']:
-                    stats['numericColumns'][col] = {
-                        'sum': float(df_filtered[col].sum()),
-                        'average': float(df_filtered[col].mean()),
-                        'min': float(df_filtered[col].min()),
-                        'max': float(df_filtered[col].max())
-                    }
+            params = {'dateColumn': date_column, 'period': _requested_period(year, quarter),
+                      'percentiles': QUARTERLY_PERCENTILES}
+            stats, cache_hit = data_cache.get_or_compute(
+                'quarterly_stats', version, params,
+                lambda: _compute_quarterly_stats(user_id, file_id, date_column, year, quarter)
+            )
             
-            return jsonify(stats)
+            if stats is None:
+                return jsonify({
+                    'error': 'File not found'
+                }), 404
+            
+            response = jsonify(stats)
+            response.headers['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+            return response
             
         except Exception as e:
             return jsonify({
@@ -87,6 +169,14 @@ def register_quarterly_stats_routes(app):
             # Get user ID
             user_id = user_manager.get_or_create_user_id(session_id)
             
+            date_column = resolve_date_column(storage_manager.get_file_profile(user_id, file_id), date_column)
+            
+            # Profiled date columns list their quarters from the upload-time summaries
+            if date_column:
+                quarters = storage_manager.get_available_quarters(user_id, file_id, date_column)
+                if quarters is not None:
+                    return _quarter_options(quarters, date_column)
+            
             # Load data from hybrid storage
             df = storage_manager.get_file_df(user_id, file_id)
             
@@ -95,32 +185,10 @@ def register_quarterly_stats_routes(app):
                     'error': 'File not found'
                 }), 404
             
-            # Process dates and add quarter information
+            # Get unique year-quarter combinations from the date parts cached for the file
             if date_column and date_column in df.columns:
-                df = process_uploaded_file(df, [date_column])
-                
-                year_col = f'{date_column}_year'
-                quarter_col = f'{date_column}_quarter'
-                
-                if year_col in df.columns and quarter_col in df.columns:
-                    # Get unique year-quarter combinations
-                    quarters = df[[year_col, quarter_col]].drop_duplicates().sort_values([year_col, quarter_col])
-                    
-                    options = []
-                    for _, row in quarters.iterrows():
-                        year = int(row[year_col])
-                        quarter = int(row[quarter_col])
-                        quarter_name = f"Q{quarter} {year}"
-                        options.append({
-                            'year': year,
-                            'quarter': quarter,
-                            'name': quarter_name
-                        })
-                    
-                    return jsonify({
-                        'availableQuarters': options,
-                        'dateColumn': date_column
-                    })
+                years, quarters = storage_manager.get_date_parts(user_id, file_id, date_column)
+                return _quarter_options(unique_quarters(years, quarters), date_column)
             
             return jsonify({
                 'error': 'No date column found or processed'
@@ -130,4 +198,61 @@ def register_quarterly_stats_routes(app):
             return jsonify({
                 'error': str(e),
                 'message': 'Failed to get quarterly options'
-            }), 500
\ No newline at end of file
+            }), 500
+
+    @app.route('/api/quarterly-percentiles', methods=['POST'])
+    def get_quarterly_percentiles():
+        """
+        Approximate percentiles of numeric columns over any combination of
+        quarters (the whole file when none are given), answered by merging the
+        quantile sketches built at upload instead of rescanning rows
+        """
+        try:
+            data = request.json
+            file_id = data.get('fileId')
+            date_column = data.get('dateColumn')
+            session_id = data.get('sessionId')
+            columns = data.get('columns')
+            
+            try:
+                percentiles = _requested_percentiles(data.get('percentiles'))
+                periods = [(int(q['year']), int(q['quarter'])) for q in data.get('quarters') or []]
+            except (TypeError, ValueError, KeyError) as e:
+                return jsonify({
+                    'error': str(e) if isinstance(e, ValueError) else 'Invalid quarters',
+                    'message': "Send 'quarters' as [{'year': ..., 'quarter': ...}] and 'percentiles' from 0 to 100"
+                }), 400
+            
+            # Get user ID
+            user_id = user_manager.get_or_create_user_id(session_id)
+            
+            profile = storage_manager.get_file_profile(user_id, file_id)
+            if profile is None:
+                return jsonify({
+                    'error': 'File not found'
+                }), 404
+            
+            date_column = resolve_date_column(profile, date_column)
+            sketches = storage_manager.get_quarter_sketches(user_id, file_id, date_column,
+                                                            periods or [TOTALS_PERIOD]) if date_column else None
+            if sketches is None:
+                return jsonify({
+                    'error': f"'{date_column}' is not a date column" if date_column else 'No date column found',
+                    'message': 'Choose a column detected as dates'
+                }), 400
+            
+            columns = list(sketches) if columns is None else columns
+            return jsonify({
+                'dateColumn': date_column,
+                'quarters': [{'year': year, 'quarter': quarter, 'name': f"Q{quarter} {year}"}
+                             for year, quarter in sorted(set(periods))],
+                'percentiles': {col: _sketch_percentiles(sketches.get(col), percentiles) for col in columns},
+                'counts': {col: sketches[col].count if col in sketches else 0 for col in columns},
+                'rankError': rank_error_bound(QUANTILE_SKETCH_K)
+            })
+            
+        except Exception as e:
+            return jsonify({
+                'error': str(e),
+                'message': 'Failed to get quarterly percentiles'
+            }), 500
@@ -3,27 +3,36 @@
 # date: 2025-08-17 13:39:45
 # Updated to use hybrid storage system with user management
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 import pandas as pd
 import io
 import time
-import re
 import json
 import uuid
-from datetime import datetime, timedelta
+import os
+from datetime import timedelta
+from models import init_database
 from utils.hybrid_storage import storage_manager
 from utils.user_manager import user_manager
+from utils.upload_stream import spool_stream, spool_multipart, read_csv_in_chunks, UploadTooLarge
+from utils.serializers import negotiate_format, encode_frame_payload, UnsupportedFormat
+from utils.pagination import parse_page_request, slice_frame, page_info, InvalidPageRequest
+from utils.date_parsing import parse_date_labels, to_datetimes
+from utils.tick_spacing import time_spacing, apply_default_spacing
+from utils.downsampling import (target_points, method_for_chart, downsample_frame, downsample_indices,
+                                numeric_values, axis_positions, InvalidDownsampleRequest)
+from utils.aggregation import (parse_top_n, parse_agg, top_n_frame, AGG_COUNT, TOP_N_CHART_TYPES,
+                               InvalidAggregationRequest)
+from utils.data_processor import clean_column_name
+from tier_management import tier_manager, get_user_tier
 import textwrap
 
 # Import API modules
 from api.quarterly_stats import register_quarterly_stats_routes
-
-# Month names for consistent formatting
-MONTH_NAMES = {
-    1: 'Jan', 2: 'Feb', 3: 'March', 4: 'April', 5: 'May', 6: 'June',
-    7: 'July', 8: 'Aug', 9: 'Sept', 10: 'Oct', 11: 'Nov', 12: 'Dec'
-}
+from api.chart_data import register_chart_data_routes
+from api.range_stats import register_range_stats_routes
+from utils.maintenance import maintenance_scheduler
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -37,6 +46,9 @@ def process_file():
     start_time = time.time()
     
     try:
+        # Pick the response encoding before doing any work
+        response_format = negotiate_format(request)
+        
         # Parse request body
         body = request.get_json()
         
@@ -44,6 +56,9 @@ def process_file():
         file_content = body.get('content', '')
         chart_config = body.get('chart_config', {})
         session_id = body.get('session_id')  # Get session ID from request
+        max_points = target_points(chart_config.get('max_points'), chart_config.get('chart_width'))
+        top_n = parse_top_n(chart_config.get('top_n'))
+        agg = parse_agg(chart_config.get('agg'))
         
         # Get or create user ID
         user_id = user_manager.get_or_create_user_id(session_id)
@@ -51,49 +66,229 @@ def process_file():
         # Store file using hybrid approach
         file_id = storage_manager.store_file(user_id, file_content, filename)
         
-        # Get the processed DataFrame
-        df = storage_manager.get_file_df(user_id, file_id)
+        return build_file_response(user_id, file_id, filename, chart_config.get('chart_type', 'bar'),
+                                   session_id, start_time, response_format, max_points, top_n, agg)
         
-        # Clean and standardize the data
-        cleaned_df = clean_and_standardize_data(df)
+    except UnsupportedFormat as e:
+        return unsupported_format_response(e)
         
-        # Auto-detect columns for chart
-        columns = list(cleaned_df.columns)
-        x_column = columns[0] if len(columns) > 0 else None
-        y_column = columns[1] if len(columns) > 1 else None
+    except InvalidDownsampleRequest as e:
+        return invalid_downsample_response(e)
         
-        # Generate smart chart elements
-        chart_elements = format_chart_elements(cleaned_df, x_column, y_column, chart_config.get('chart_type', 'bar'))
+    except InvalidAggregationRequest as e:
+        return invalid_aggregation_response(e)
         
-        # Convert to JSON-serializable format
-        data_json = cleaned_df.to_dict('records')
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'message': 'Failed to process file'
+        }), 500
+
+@app.route('/process-file/upload', methods=['POST'])
+def process_file_upload():
+    """
+    Streaming file processing - accepts the CSV as the raw request body or as a
+    multipart 'file' field, spools it to disk and parses it in chunks
+    """
+    
+    start_time = time.time()
+    spool = None
+    
+    try:
+        session_id = request.args.get('session_id')
+        chart_type = request.args.get('chart_type', 'bar')
+        response_format = negotiate_format(request)
+        max_points = target_points(request.args.get('max_points'), request.args.get('chart_width'))
+        top_n = parse_top_n(request.args.get('top_n'))
+        agg = parse_agg(request.args.get('agg'))
+        
+        # Reject oversized uploads before reading the body when the size is declared
+        tier = get_user_tier(session_id, request.remote_addr, request.args.get('user_token'))
+        max_bytes = int(tier_manager.get_max_file_size_mb(tier) * 1024 * 1024)
+        if request.content_length is not None and not tier_manager.validate_file_size(
+                tier, request.content_length / (1024 * 1024)):
+            raise UploadTooLarge(max_bytes, request.content_length)
+        
+        # Copy the file to disk, enforcing the limit as bytes arrive (request.files
+        # would first buffer the whole body in Werkzeug's own temporary file)
+        if request.mimetype == 'multipart/form-data':
+            upload = spool_multipart(request.environ, 'file', max_bytes)
+            if upload is None:
+                return jsonify({
+                    'error': 'No file provided',
+                    'message': "Expected a multipart field named 'file'"
+                }), 400
+            spool, file_size, content_hash, filename = upload
+            filename = filename or 'unknown.csv'
+        else:
+            spool, file_size, content_hash = spool_stream(request.stream, max_bytes)
+            filename = request.args.get('filename', 'unknown.csv')
         
-        # Processing info
-        processing_info = {
-            'duration': round((time.time() - start_time) * 1000, 2),
-            'rows_processed': len(cleaned_df),
-            'columns_processed': len(cleaned_df.columns),
-            'filename': filename,
-            'file_id': file_id,
-            'user_id': user_id
-        }
+        # Get or create user ID
+        user_id = user_manager.get_or_create_user_id(session_id)
         
-        response = {
-            'data': data_json,
-            'chart_elements': chart_elements,
-            'processing_info': processing_info,
-            'columns': columns,
-            'file_id': file_id,
-            'session_id': session_id or str(uuid.uuid4())
-        }
+        # Store file using hybrid approach (parsing is skipped for repeat uploads)
+        file_id = storage_manager.store_upload(user_id, filename, content_hash, file_size,
+                                               lambda: read_csv_in_chunks(spool))
         
-        return jsonify(response)
+        return build_file_response(user_id, file_id, filename, chart_type, session_id, start_time,
+                                   response_format, max_points, top_n, agg)
+        
+    except UnsupportedFormat as e:
+        return unsupported_format_response(e)
+        
+    except InvalidDownsampleRequest as e:
+        return invalid_downsample_response(e)
+        
+    except InvalidAggregationRequest as e:
+        return invalid_aggregation_response(e)
+        
+    except UploadTooLarge as e:
+        return jsonify({
+            'error': str(e),
+            'message': 'File exceeds the upload limit for your tier',
+            'max_file_size_mb': e.max_bytes / (1024 * 1024)
+        }), 413
         
     except Exception as e:
         return jsonify({
             'error': str(e),
             'message': 'Failed to process file'
         }), 500
+    
+    finally:
+        if spool is not None:
+            spool.close()
+
+def build_file_response(user_id, file_id, filename, chart_type, session_id, start_time, response_format,
+                        max_points=None, top_n=None, agg=None):
+    """
+    Build the chart-ready response for a freshly stored file
+    max_points (see utils/downsampling.py) caps the rows sent for large files;
+    top_n (see utils/aggregation.py) sends bar and pie charts their top
+    categories plus "Other" instead
+    """
+    # Get the processed DataFrame
+    df = storage_manager.get_file_df(user_id, file_id)
+    
+    # Clean the data and generate chart elements (cached per file)
+    cleaned_df, chart_elements, cache_hit = get_cleaned_chart_data(user_id, file_id, df, chart_type)
+    columns = list(cleaned_df.columns)
+    chart_df, reduction, reduction_hit = reduce_for_chart(user_id, file_id, cleaned_df, chart_type, max_points,
+                                                          top_n, agg)
+    
+    # Processing info
+    processing_info = {
+        'duration': round((time.time() - start_time) * 1000, 2),
+        'rows_processed': len(cleaned_df),
+        'columns_processed': len(cleaned_df.columns),
+        'filename': filename,
+        'file_id': file_id,
+        'user_id': user_id
+    }
+    
+    payload = {
+        'chart_elements': chart_elements,
+        'processing_info': processing_info,
+        'columns': columns,
+        'file_id': file_id,
+        'session_id': session_id or str(uuid.uuid4())
+    }
+    payload.update(reduction)
+    return frame_response(chart_df, payload, response_format, cache_hit and reduction_hit)
+
+def reduce_for_chart(user_id, file_id, df, chart_type, max_points, top_n, agg, window=(0, None)):
+    """
+    Shrink a cleaned frame (or a window of it) before it is sent: the top_n
+    categories plus "Other" for bar and pie charts when top_n is set,
+    otherwise downsampling to max_points. Returns (frame, payload_fields,
+    cache_hit), payload_fields holding 'aggregation' or 'downsampling' info.
+    """
+    if top_n is not None and chart_type in TOP_N_CHART_TYPES:
+        columns = list(df.columns)
+        x_column = columns[0] if len(columns) > 0 else None
+        y_column = columns[1] if len(columns) > 1 else None
+        if x_column is not None and (y_column is not None or agg == AGG_COUNT):
+            # Computed once per (file, window, x, y, agg, N)
+            (frame, aggregation), hit = storage_manager.get_derived(
+                user_id, file_id, f'top_n:{window}:{x_column}:{y_column}:{agg}:{top_n}',
+                lambda: top_n_frame(df, x_column, y_column, agg, top_n)
+            )
+            return frame, {'aggregation': aggregation}, hit
+    
+    chart_df, downsampling = downsample_for_chart(df, chart_type, max_points)
+    return chart_df, ({} if downsampling is None else {'downsampling': downsampling}), True
+
+def downsample_for_chart(df, chart_type, max_points):
+    """
+    Reduce a cleaned frame to max_points rows using its chart columns (first
+    column as x, second as y): LTTB for line-like charts, min/max per bucket
+    otherwise. Returns (frame, downsampling_info or None when not requested).
+    """
+    if max_points is None:
+        return df, None
+    columns = list(df.columns)
+    x_column = columns[0] if len(columns) > 0 else None
+    y_column = columns[1] if len(columns) > 1 else None
+    return downsample_frame(df, x_column, y_column, max_points, method_for_chart(chart_type))
+
+def frame_response(df, payload, response_format, cache_hit):
+    """Encode a DataFrame and the rest of the payload in the negotiated format"""
+    body, mimetype = encode_frame_payload(df, payload, response_format)
+    response = Response(body, mimetype=mimetype)
+    response.headers['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+    response.headers['Vary'] = 'Accept'
+    return response
+
+def unsupported_format_response(error):
+    """406 response for a format the client asked for but this server can't produce"""
+    return jsonify({
+        'error': str(error),
+        'message': 'Requested response format is not available'
+    }), 406
+
+def invalid_aggregation_response(error):
+    """400 response for a malformed top_n or agg"""
+    return jsonify({
+        'error': str(error),
+        'message': 'Invalid aggregation request'
+    }), 400
+
+def invalid_downsample_response(error):
+    """400 response for a malformed max_points or chart_width"""
+    return jsonify({
+        'error': str(error),
+        'message': 'Invalid downsampling request'
+    }), 400
+
+def get_cleaned_chart_data(user_id, file_id, df, chart_type):
+    """
+    Get the cleaned DataFrame and chart elements for a file, computing each
+    once per file. Returns (cleaned_df, chart_elements, cache_hit).
+    The cleaned frame is shared between requests and must not be modified.
+    """
+    cleaned_df, cleaned_hit = storage_manager.get_derived(
+        user_id, file_id, 'cleaned', lambda: clean_and_standardize_data(df)
+    )
+    
+    # Auto-detect columns for chart
+    columns = list(cleaned_df.columns)
+    x_column = columns[0] if len(columns) > 0 else None
+    y_column = columns[1] if len(columns) > 1 else None
+    
+    # Generate smart chart elements from the upload-time column profile
+    chart_elements, elements_hit = storage_manager.get_derived(
+        user_id, file_id, f'chart_elements:{chart_type}',
+        lambda: format_chart_elements(cleaned_df, x_column, y_column, chart_type,
+                                      get_cleaned_column_profiles(user_id, file_id))
+    )
+    
+    return cleaned_df, chart_elements, cleaned_hit and elements_hit
+
+def get_cleaned_column_profiles(user_id, file_id):
+    """Get a file's column profiles keyed by cleaned column name"""
+    profile = storage_manager.get_file_profile(user_id, file_id) or {}
+    return {clean_column_name(col): column_profile for col, column_profile in profile.items()}
 
 @app.route('/format-chart', methods=['POST'])
 def format_chart():
@@ -124,9 +319,20 @@ def get_user_files():
 
 @app.route('/api/files/<file_id>', methods=['GET'])
 def get_file_data(file_id):
-    """Get file data for charting"""
+    """
+    Get file data for charting
+    Accepts offset/limit, rows=start:end, columns=a,b and cursor parameters
+    (see utils/pagination.py) so clients can load large files a window at a time,
+    and max_points/chart_width to downsample the window for a chart_type, or
+    top_n/agg to send a bar or pie chart the window's top categories plus "Other"
+    """
     try:
         session_id = request.args.get('session_id')
+        response_format = negotiate_format(request)
+        chart_type = request.args.get('chart_type', 'bar')
+        max_points = target_points(request.args.get('max_points'), request.args.get('chart_width'))
+        top_n = parse_top_n(request.args.get('top_n'))
+        agg = parse_agg(request.args.get('agg'))
         user_id = user_manager.get_or_create_user_id(session_id)
         
         df = storage_manager.get_file_df(user_id, file_id)
@@ -136,28 +342,39 @@ def get_file_data(file_id):
                 'error': 'File not found'
             }), 404
         
-        # Clean and standardize the data
-        cleaned_df = clean_and_standardize_data(df)
-        
-        # Auto-detect columns for chart
-        columns = list(cleaned_df.columns)
-        x_column = columns[0] if len(columns) > 0 else None
-        y_column = columns[1] if len(columns) > 1 else None
-        
-        # Generate smart chart elements
-        chart_elements = format_chart_elements(cleaned_df, x_column, y_column, 'bar')
+        # Clean the data and generate chart elements (cached per file)
+        cleaned_df, chart_elements, cache_hit = get_cleaned_chart_data(user_id, file_id, df, chart_type)
+        total_rows = len(cleaned_df)
         
-        # Convert to JSON-serializable format
-        data_json = cleaned_df.to_dict('records')
+        # Only the requested window is serialized
+        page = parse_page_request(request.args, file_id, list(cleaned_df.columns), total_rows)
+        window = slice_frame(cleaned_df, page)
+        chart_df, reduction, reduction_hit = reduce_for_chart(user_id, file_id, window, chart_type, max_points,
+                                                              top_n, agg, (page['offset'], page['limit']))
         
-        response = {
-            'data': data_json,
+        payload = {
             'chart_elements': chart_elements,
-            'columns': columns,
+            'columns': list(window.columns),
             'file_id': file_id
         }
+        payload.update(page_info(page, len(window), total_rows, file_id))
+        payload.update(reduction)
+        return frame_response(chart_df, payload, response_format, cache_hit and reduction_hit)
         
-        return jsonify(response)
+    except UnsupportedFormat as e:
+        return unsupported_format_response(e)
+        
+    except InvalidDownsampleRequest as e:
+        return invalid_downsample_response(e)
+        
+    except InvalidAggregationRequest as e:
+        return invalid_aggregation_response(e)
+        
+    except InvalidPageRequest as e:
+        return jsonify({
+            'error': str(e),
+            'message': 'Invalid data window request'
+        }), 400
         
     except Exception as e:
         return jsonify({
@@ -209,27 +426,21 @@ def clean_and_standardize_data(df):
     
     return cleaned_df
 
-def clean_column_name(name):
-    """
-    Convert raw column names to clean, standardized format
-    """
-    # Remove special characters and standardize
-    cleaned = re.sub(r'[^\w\s]', '', str(name))
-    cleaned = re.sub(r'\s+', '_', cleaned.strip())
-    return cleaned.lower()
-
-def format_chart_elements(df, x_column, y_column, chart_type):
+def format_chart_elements(df, x_column, y_column, chart_type, column_profiles=None):
     """
     Generate professional chart titles and labels
     This is the proprietary server-side formatting
+    column_profiles ({column: profile} from the upload-time profiler) lets
+    axis labels skip rescanning the data
     """
+    column_profiles = column_profiles or {}
     
     # Smart title generation
     title = generate_smart_title(x_column, y_column, chart_type)
     
     # Professional axis labels
-    x_label = format_axis_label(x_column, df[x_column] if x_column else None)
-    y_label = format_axis_label(y_column, df[y_column] if y_column else None)
+    x_label = format_axis_label(x_column, df[x_column] if x_column else None, column_profiles.get(x_column))
+    y_label = format_axis_label(y_column, df[y_column] if y_column else None, column_profiles.get(y_column))
     
     return {
         'title': title,
@@ -297,7 +508,7 @@ def format_column_name_for_display(column_name):
     
     return ' '.join(words)
 
-def format_axis_label(column_name, data_series):
+def format_axis_label(column_name, data_series, column_profile=None):
     """
     Create professional axis labels with units and context
     """
@@ -306,6 +517,18 @@ def format_axis_label(column_name, data_series):
     if data_series is None or len(data_series) == 0:
         return base_label
     
+    # Use the upload-time profile when available
+    if column_profile is not None:
+        if column_profile['count'] == 0:
+            return base_label
+        if column_profile['is_currency']:
+            return f"{base_label} (USD)"
+        elif column_profile['is_percentage']:
+            return f"{base_label} (%)"
+        elif column_profile['scale']:
+            return f"{base_label} ({column_profile['scale']})"
+        return base_label
+    
     # Sample some values for analysis
     sample_values = data_series.dropna().head(20)
     
@@ -375,11 +598,14 @@ def auto_spacing():
                 'error': 'No X-axis labels provided'
             }), 400
         
+        # Parse the labels once and share the dates between detection and spacing
+        dates = parse_date_labels(x_labels)
+        
         # Detect time interval and apply appropriate spacing
-        interval_type = detect_time_interval(x_labels)
+        interval_type = detect_time_interval(x_labels, dates)
         
         if interval_type:
-            xaxis_config = apply_time_spacing(x_labels, interval_type)
+            xaxis_config = apply_time_spacing(x_labels, interval_type, dates)
         else:
             xaxis_config = apply_default_spacing(x_labels)
         
@@ -431,32 +657,17 @@ def calculate_subtitle_width():
             'error': str(e)
         }), 500
 
-def detect_time_interval(x_labels):
+def detect_time_interval(x_labels, dates=None):
     """
     Detect if labels represent time series and determine interval
+    dates (from parse_date_labels) avoids parsing the labels again
     """
     try:
-        # Try to parse dates from labels
-        dates = []
-        for label in x_labels[:10]:  # Sample first 10 labels
-            # Skip if label is "Date" or similar header
-            if str(label).lower() in ['date', 'time', 'period', '']:
-                continue
-                
-            try:
-                # Try various date formats
-                for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d %H:%M:%S', 
-                           '%m/%d/%Y %H:%M', '%Y-%m-%d %H:%M', '%H:%M', '%Y-%m',
-                           '%d-%b-%y', '%d-%b-%Y', '%Y/%m/%d', '%d/%m/%Y',
-                           '%b %d, %Y', '%B %d, %Y', '%d %b %Y', '%d %B %Y']:
-                    try:
-                        date = datetime.strptime(str(label), fmt)
-                        dates.append(date)
-                        break
-                    except ValueError:
-                        continue
-            except:
-                continue
+        if dates is None:
+            dates = parse_date_labels(x_labels)
+        
+        # Sample the first 10 labels, skipping any that aren't dates
+        dates = [date for date in to_datetimes(dates[:10]) if date is not None]
         
         if len(dates) < 3:
             return None  # Not enough valid dates
@@ -492,423 +703,21 @@ def detect_time_interval(x_labels):
         print(f"Error detecting time interval: {e}")
         return None
 
-def apply_time_spacing(x_labels, interval_type):
+def apply_time_spacing(x_labels, interval_type, dates=None):
     """
     Apply appropriate spacing based on time interval type
+    dates (from parse_date_labels) avoids parsing the labels again
     """
     try:
-        dates = []
-        for label in x_labels:
-            # Skip if label is "Date" or similar header
-            if str(label).lower() in ['date', 'time', 'period', '']:
-                dates.append(None)
-                continue
-                
-            try:
-                for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d %H:%M:%S', 
-                           '%m/%d/%Y %H:%M', '%Y-%m-%d %H:%M', '%H:%M', '%Y-%m',
-                           '%d-%b-%y', '%d-%b-%Y', '%Y/%m/%d', '%d/%m/%Y',
-                           '%b %d, %Y', '%B %d, %Y', '%d %b %Y', '%d %B %Y']:
-                    try:
-                        date = datetime.strptime(str(label), fmt)
-                        dates.append(date)
-                        break
-                    except ValueError:
-                        continue
-            except:
-                dates.append(None)
-        
-        if interval_type == 'hour':
-            return apply_hourly_spacing(dates, x_labels)
-        elif interval_type == 'day':
-            return apply_daily_spacing(dates, x_labels)
-        elif interval_type == 'week':
-            return apply_weekly_spacing(dates, x_labels)
-        elif interval_type == 'month':
-            return apply_monthly_spacing(dates, x_labels)
-        elif interval_type == 'quarter':
-            return apply_quarterly_spacing(dates, x_labels)
-        elif interval_type == 'year':
-            return apply_yearly_spacing(dates, x_labels)
-        else:
-            return apply_default_spacing(x_labels)
+        if dates is None:
+            dates = parse_date_labels(x_labels)
+        
+        return time_spacing(dates, x_labels, interval_type)
             
     except Exception as e:
         print(f"Error applying time spacing: {e}")
         return apply_default_spacing(x_labels)
 
-def apply_hourly_spacing(dates, x_labels):
-    """Show every 6th hour: 0600, 1200, 1800, 2400"""
-    tickvals = []
-    ticktext = []
-    
-    for i, (date, label) in enumerate(zip(dates, x_labels)):
-        if date and date.hour in [0, 6, 12, 18]:
-            tickvals.append(i)
-            ticktext.append(date.strftime('%H:%M'))
-    
-    # Check if the final label follows the same spacing pattern as other labels
-    if len(tickvals) > 2:
-        # Calculate the typical spacing between labels
-        spacings = []
-        for i in range(1, len(tickvals)):
-            spacing = tickvals[i] - tickvals[i-1]
-            spacings.append(spacing)
-        
-        if spacings:
-            # Calculate average spacing (excluding the last interval)
-            avg_spacing = sum(spacings[:-1]) / len(spacings[:-1]) if len(spacings) > 1 else spacings[0]
-            
-            # Check if the final spacing is significantly different from average
-            final_spacing = spacings[-1] if spacings else 0
-            if abs(final_spacing - avg_spacing) > avg_spacing * 0.5:  # If more than 50% different
-                # Remove the final label as it doesn't follow the pattern
-                tickvals.pop()
-                ticktext.pop()
-    
-    return {
-        'tickmode': 'array',
-        'tickvals': tickvals,
-        'ticktext': ticktext,
-        'tickangle': 0,
-        'showticklabels': True,
-        'showgrid': False,
-        'ticks': 'outside',
-        'ticklen': 8,
-        'tickwidth': 2,
-        'tickcolor': 'black',
-        'showline': True,
-        'linecolor': 'black',
-        'linewidth': 1
-    }
-
-def apply_daily_spacing(dates, x_labels):
-    """Show only Mondays"""
-    tickvals = []
-    ticktext = []
-    
-    for i, (date, label) in enumerate(zip(dates, x_labels)):
-        if date and date.weekday() == 0:  # Monday
-            tickvals.append(i)
-            ticktext.append(date.strftime('%a %m/%d'))
-    
-    # Check if the final label follows the same spacing pattern as other labels
-    if len(tickvals) > 2:
-        # Calculate the typical spacing between labels
-        spacings = []
-        for i in range(1, len(tickvals)):
-            spacing = tickvals[i] - tickvals[i-1]
-            spacings.append(spacing)
-        
-        if spacings:
-            # Calculate average spacing (excluding the last interval)
-            avg_spacing = sum(spacings[:-1]) / len(spacings[:-1]) if len(spacings) > 1 else spacings[0]
-            
-            # Check if the final spacing is significantly different from average
-            final_spacing = spacings[-1] if spacings else 0
-            if abs(final_spacing - avg_spacing) > avg_spacing * 0.5:  # If more than 50% different
-                # Remove the final label as it doesn't follow the pattern
-                tickvals.pop()
-                ticktext.pop()
-    
-    return {
-        'tickmode': 'array',
-        'tickvals': tickvals,
-        'ticktext': ticktext,
-        'tickangle': 0,
-        'showticklabels': True,
-        'showgrid': False,
-        'ticks': 'outside',
-        'ticklen': 8,
-        'tickwidth': 2,
-        'tickcolor': 'black',
-        'showline': True,
-        'linecolor': 'black',
-        'linewidth': 1
-    }
-
-def apply_weekly_spacing(dates, x_labels):
-    """Show every 4th week, starting with 4th week"""
-    tickvals = []
-    ticktext = []
-    
-    for i, (date, label) in enumerate(zip(dates, x_labels)):
-        if date and i >= 3 and (i - 3) % 4 == 0:  # Start from 4th week, every 4th
-            tickvals.append(i)
-            ticktext.append(date.strftime('%d %B %Y'))
-    
-    # Check if the final label follows the same spacing pattern as other labels
-    if len(tickvals) > 2:
-        # Calculate the typical spacing between labels
-        spacings = []
-        for i in range(1, len(tickvals)):
-            spacing = tickvals[i] - tickvals[i-1]
-            spacings.append(spacing)
-        
-        if spacings:
-            # Calculate average spacing (excluding the last interval)
-            avg_spacing = sum(spacings[:-1]) / len(spacings[:-1]) if len(spacings) > 1 else spacings[0]
-            
-            # Check if the final spacing is significantly different from average
-            final_spacing = spacings[-1] if spacings else 0
-            if abs(final_spacing - avg_spacing) > avg_spacing * 0.5:  # If more than 50% different
-                # Remove the final label as it doesn't follow the pattern
-                tickvals.pop()
-                ticktext.pop()
-    
-    return {
-        'tickmode': 'array',
-        'tickvals': tickvals,
-        'ticktext': ticktext,
-        'tickangle': 0,
-        'showticklabels': True,
-        'showgrid': False,
-        'ticks': 'outside',
-        'ticklen': 8,
-        'tickwidth': 2,
-        'tickcolor': 'black',
-        'showline': True,
-        'linecolor': 'black',
-        'linewidth': 1
-    }
-
-def apply_monthly_spacing(dates, x_labels):
-    """Show every 3rd month: March, June, Sept, Dec"""
-    tickvals = []
-    ticktext = []
-    
-    for i, (date, label) in enumerate(zip(dates, x_labels)):
-        if date and date.month in [3, 6, 9, 12]:
-            tickvals.append(i)
-            ticktext.append(f"{MONTH_NAMES[date.month]} {date.year}")
-    
-    # Check if the final label follows the same spacing pattern as other labels
-    if len(tickvals) > 2:
-        # Calculate the typical spacing between labels
-        spacings = []
-        for i in range(1, len(tickvals)):
-            spacing = tickvals[i] - tickvals[i-1]
-            spacings.append(spacing)
-        
-        if spacings:
-            # Calculate average spacing (excluding the last interval)
-            avg_spacing = sum(spacings[:-1]) / len(spacings[:-1]) if len(spacings) > 1 else spacings[0]
-            
-            # Check if the final spacing is significantly different from average
-            final_spacing = spacings[-1] if spacings else 0
-            if abs(final_spacing - avg_spacing) > avg_spacing * 0.5:  # If more than 50% different
-                # Remove the final label as it doesn't follow the pattern
-                tickvals.pop()
-                ticktext.pop()
-    
-    return {
-        'tickmode': 'array',
-        'tickvals': tickvals,
-        'ticktext': ticktext,
-        'tickangle': 0,
-        'showticklabels': True,
-        'showgrid': False,
-        'ticks': 'outside',
-        'ticklen': 8,
-        'tickwidth': 2,
-        'tickcolor': 'black',
-        'showline': True,
-        'linecolor': 'black',
-        'linewidth': 1
-    }
-
-def apply_quarterly_spacing(dates, x_labels):
-    """Show final quarter of each year"""
-    tickvals = []
-    ticktext = []
-    
-    # Filter out None dates
-    valid_dates = [(i, date) for i, date in enumerate(dates) if date]
-    
-    if len(valid_dates) < 2:
-        return apply_default_spacing(x_labels)
-    
-    # Group dates by year and find the final quarter of each year
-    year_groups = {}
-    for idx, date in valid_dates:
-        year = date.year
-        if year not in year_groups:
-            year_groups[year] = []
-        year_groups[year].append((idx, date))
-    
-    # For each year, find the latest quarter (highest month)
-    labeled_indices = set()
-    for year in sorted(year_groups.keys()):
-        year_dates = year_groups[year]
-        # Find the date with the highest month in this year
-        latest_date = max(year_dates, key=lambda x: x[1].month)
-        idx, date = latest_date
-        tickvals.append(idx)
-        ticktext.append(f"{MONTH_NAMES[date.month]} {date.year}")
-        labeled_indices.add(idx)
-    
-    # Drop the final label if it's not the final quarter of the year
-    if tickvals and len(tickvals) > 1:
-        last_idx = tickvals[-1]
-        last_date = None
-        for idx, date in valid_dates:
-            if idx == last_idx:
-                last_date = date
-                break
-        
-        if last_date:
-            # Check if this is actually the final quarter of the year
-            # Get all dates for this year
-            year_dates = [d for idx, d in valid_dates if d.year == last_date.year]
-            if year_dates:
-                actual_last_quarter = max(year_dates)
-                if last_date != actual_last_quarter:
-                    # Remove the final label if it's not the true final quarter
-                    tickvals.pop()
-                    ticktext.pop()
-                    labeled_indices.discard(last_idx)
-    
-    # Check if the final label follows the same spacing pattern as other labels
-    if len(tickvals) > 2:
-        # Calculate the typical spacing between labels
-        spacings = []
-        for i in range(1, len(tickvals)):
-            spacing = tickvals[i] - tickvals[i-1]
-            spacings.append(spacing)
-        
-        if spacings:
-            # Calculate average spacing (excluding the last interval)
-            avg_spacing = sum(spacings[:-1]) / len(spacings[:-1]) if len(spacings) > 1 else spacings[0]
-            
-            # Check if the final spacing is significantly different from average
-            final_spacing = spacings[-1] if spacings else 0
-            if abs(final_spacing - avg_spacing) > avg_spacing * 0.5:  # If more than 50% different
-                # Remove the final label as it doesn't follow the pattern
-                tickvals.pop()
-                ticktext.pop()
-                labeled_indices.discard(tickvals[-1] if tickvals else None)
-    
-    # Add all quarterly points for tick marks, but only show labels for final quarters
-    all_quarterly_indices = [idx for idx, date in valid_dates]
-    all_quarterly_texts = []
-    
-    for idx, date in valid_dates:
-        if idx in labeled_indices:
-            all_quarterly_texts.append(f"{MONTH_NAMES[date.month]} {date.year}")
-        else:
-            all_quarterly_texts.append("")  # Empty text for unlabeled ticks
-    
-    return {
-        'tickmode': 'array',
-        'tickvals': tickvals,
-        'ticktext': ticktext,
-        'tickangle': 0,
-        'showticklabels': True,
-        'showgrid': False,
-        'ticks': 'outside',
-        'ticklen': 8,
-        'tickwidth': 2,
-        'tickcolor': 'black',
-        'showline': True,
-        'linecolor': 'black',
-        'linewidth': 1,
-        'minor': {
-            'tickmode': 'array',
-            'tickvals': all_quarterly_indices,
-            'showgrid': False,
-            'ticks': 'outside',
-            'ticklen': 5,
-            'tickwidth': 1,
-            'tickcolor': 'black'
-        }
-    }
-
-def apply_yearly_spacing(dates, x_labels):
-    """Show evenly spaced years: 2, 4, 5, 10, 20, 50, 100 year intervals"""
-    if len(dates) < 2:
-        return apply_default_spacing(x_labels)
-    
-    # Find year range
-    valid_dates = [d for d in dates if d]
-    if len(valid_dates) < 2:
-        return apply_default_spacing(x_labels)
-    
-    min_year = min(d.year for d in valid_dates)
-    max_year = max(d.year for d in valid_dates)
-    year_span = max_year - min_year
-    
-    # Choose appropriate spacing
-    if year_span <= 5:
-        spacing = 1
-    elif year_span <= 20:
-        spacing = 2
-    elif year_span <= 50:
-        spacing = 5
-    elif year_span <= 100:
-        spacing = 10
-    else:
-        spacing = 20
-    
-    tickvals = []
-    ticktext = []
-    
-    for i, (date, label) in enumerate(zip(dates, x_labels)):
-        if date and (date.year - min_year) % spacing == 0:
-            tickvals.append(i)
-            ticktext.append(str(date.year))
-    
-    # Check if the final label follows the same spacing pattern as other labels
-    if len(tickvals) > 2:
-        # Calculate the typical spacing between labels
-        spacings = []
-        for i in range(1, len(tickvals)):
-            spacing = tickvals[i] - tickvals[i-1]
-            spacings.append(spacing)
-        
-        if spacings:
-            # Calculate average spacing (excluding the last interval)
-            avg_spacing = sum(spacings[:-1]) / len(spacings[:-1]) if len(spacings) > 1 else spacings[0]
-            
-            # Check if the final spacing is significantly different from average
-            final_spacing = spacings[-1] if spacings else 0
-            if abs(final_spacing - avg_spacing) > avg_spacing * 0.5:  # If more than 50% different
-                # Remove the final label as it doesn't follow the pattern
-                tickvals.pop()
-                ticktext.pop()
-    
-    return {
-        'tickmode': 'array',
-        'tickvals': tickvals,
-        'ticktext': ticktext,
-        'tickangle': 0,
-        'showticklabels': True,
-        'showgrid': False,
-        'ticks': 'outside',
-        'ticklen': 8,
-        'tickwidth': 2,
-        'tickcolor': 'black',
-        'showline': True,
-        'linecolor': 'black',
-        'linewidth': 1
-    }
-
-def apply_default_spacing(x_labels):
-    """Default spacing for non-time-series data"""
-    if len(x_labels) <= 20:
-        return {}  # No spacing needed
-    
-    # Show every nth label
-    n = max(1, len(x_labels) // 10)
-    tickvals = list(range(0, len(x_labels), n))
-    ticktext = [x_labels[i] for i in tickvals]
-    
-    return {
-        'tickmode': 'array',
-        'tickvals': tickvals,
-        'ticktext': ticktext,
-        'tickangle': 45
-    }
-
 def create_simple_title(title, subtitle, chart_width=800):
     """Simple title builder with proper wrapping and margin calculation"""
     # Calculate responsive wrap width
@@ -1038,15 +847,35 @@ def process_top_only():
             else:
                 tick_texts.append(formatted_val)
         
+        # Reduce large series to what the chart can show (ticks above use the full range)
+        max_points = target_points(options.get('maxPoints'), options.get('chartWidth'))
+        downsampling = None
+        if max_points is not None and len(data) > max_points:
+            indices = downsample_indices(axis_positions(None, len(data)),
+                                         numeric_values([row.get(y_column) for row in data]),
+                                         max_points, method_for_chart(chart_type))
+            downsampling = {'reduced': True, 'method': method_for_chart(chart_type),
+                            'original_points': len(data), 'returned_points': len(indices)}
+            data = [data[i] for i in indices]
+        
         # Create Plotly configuration based on chart type
         plotly_config = create_top_only_plotly_config(
             chart_type, data, options, tick_vals, tick_texts
         )
         
-        return jsonify({
+        response = {
             'success': True,
             'plotlyConfig': plotly_config
-        })
+        }
+        if downsampling is not None:
+            response['downsampling'] = downsampling
+        return jsonify(response)
+        
+    except InvalidDownsampleRequest as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
         
     except Exception as e:
         return jsonify({
@@ -1223,10 +1052,34 @@ def create_top_only_plotly_config(chart_type, data, options, tick_vals, tick_tex
 
 # Register API routes
 register_quarterly_stats_routes(app)
+register_chart_data_routes(app)
+register_range_stats_routes(app)
+
+def start_background_tasks(maintenance=True, reload_on_sighup=False):
+    """
+    Start a server process's background threads: tier config hot reload and,
+    with maintenance=True, periodic database cleanup. Nothing is started on
+    import. Under a WSGI server with several workers, call this from each
+    worker (e.g. gunicorn's post_fork hook) with maintenance=True in only one
+    process, and leave reload_on_sighup off so the server keeps its own SIGHUP
+    handling.
+    """
+    if maintenance:
+        # Periodic cleanup of expired sessions and orphaned files
+        maintenance_scheduler.start()
+    
+    # Pick up tier config changes without a restart
+    tier_manager.watch_config(install_signal_handler=reload_on_sighup)
 
 if __name__ == '__main__':
     print("🚀 Starting GetCharty Local Server...")
     print("📊 Server will be available at: http://localhost:5000")
     print("🌐 Client will be available at: http://localhost:8000")
     print("📁 Upload your CSV files to see the magic!")
-    app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
+    debug = True
+    # The debug reloader serves from a child process; set up only there
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        # Create missing tables and apply pending schema migrations
+        init_database()
+        start_background_tasks(reload_on_sighup=True)
+    app.run(debug=debug, host='0.0.0.0', port=5000) 
\ No newline at end of file
@@ -0,0 +1,90 @@
+# benchmarks/bench_concurrent_loads.py
+# 2026-10-18 12:40:00 UTC
+# Multi-threaded stress run of HybridStorageManager: checks that concurrent
+# reads and deletes stay consistent and reports parses saved by single-flight
+#
+# Usage (from server/): python benchmarks/bench_concurrent_loads.py
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+THREADS = 32
+FILES = 8
+ROUNDS = 20
+ROWS = 50_000
+
+
+def make_csv(seed):
+    rng = random.Random(seed)
+    lines = ['date,region,revenue']
+    for i in range(ROWS):
+        lines.append(f"2024-01-{i % 28 + 1:02d},{rng.choice('NSEW')},{rng.random() * 1000:.2f}")
+    return '\n'.join(lines)
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix='getcharty-stress-')
+    os.chdir(workdir)
+
+    from models import init_database
+    from utils.hybrid_storage import HybridStorageManager
+
+    init_database()
+    # No spill tier and a tiny cache, so every round goes back to the database
+    manager = HybridStorageManager(max_files_per_user=None, max_cache_bytes=FILES * ROWS * 200, spill_dir=None)
+
+    user_id = 'stress-user'
+    file_ids = [manager.store_file(user_id, make_csv(seed), f'file{seed}.csv') for seed in range(FILES)]
+    expected = {file_id: manager.get_file_df(user_id, file_id).copy() for file_id in file_ids}
+    deleted_id = file_ids[-1]
+
+    errors = []
+    barrier = threading.Barrier(THREADS)
+
+    def worker(worker_id):
+        rng = random.Random(worker_id)
+        for round_number in range(ROUNDS):
+            barrier.wait()
+            if worker_id == 0:
+                manager.in_memory_files.clear()
+                if round_number == ROUNDS // 2:
+                    manager.delete_file(user_id, deleted_id)
+            barrier.wait()
+
+            file_id = rng.choice(file_ids)
+            df = manager.get_file_df(user_id, file_id)
+            if file_id == deleted_id and round_number > ROUNDS // 2:
+                if df is not None:
+                    errors.append(f"deleted file {file_id} was still readable")
+            elif df is not None and not df.equals(expected[file_id]):
+                errors.append(f"file {file_id} came back with different contents")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    loads = manager.get_cache_stats()['loads']
+    requested = loads['executions'] + loads['shared']
+    print(f"threads={THREADS} files={FILES} rounds={ROUNDS} rows={ROWS}")
+    print(f"elapsed: {elapsed:.2f}s")
+    print(f"cache misses routed to the loader: {requested}")
+    print(f"loads executed: {loads['executions']}")
+    print(f"parses saved by single-flight: {loads['shared']}")
+    print(f"consistency errors: {len(errors)}")
+    for error in errors[:10]:
+        print(f"  {error}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
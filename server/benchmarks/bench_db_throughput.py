@@ -0,0 +1,113 @@
+# benchmarks/bench_db_throughput.py
+# 2026-10-18 13:40:00 UTC
+# Request throughput with concurrent readers and writers: a fresh
+# rollback-journal connection per call (old get_session) vs the WAL pool
+#
+# Usage (from server/): python benchmarks/bench_db_throughput.py
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+
+READERS = 8
+WRITERS = 2
+DURATION = 5.0
+SESSIONS = 1000
+
+
+def seed(get_conn):
+    conn = get_conn()
+    cursor = conn.cursor()
+    session_ids = [str(uuid.uuid4()) for _ in range(SESSIONS)]
+    cursor.executemany('INSERT INTO user_sessions (session_id, user_id) VALUES (?, ?)',
+                       [(sid, str(uuid.uuid4())) for sid in session_ids])
+    conn.commit()
+    conn.close()
+    return session_ids
+
+
+def read_request(get_conn, session_id):
+    """Session lookup followed by a file listing, each on its own connection like the app does"""
+    conn = get_conn()
+    cursor = conn.cursor()
+    cursor.execute('SELECT user_id FROM user_sessions WHERE session_id = ?', (session_id,))
+    row = cursor.fetchone()
+    conn.close()
+
+    conn = get_conn()
+    cursor = conn.cursor()
+    cursor.execute('SELECT file_id, filename FROM files WHERE user_id = ?', (row[0],))
+    cursor.fetchall()
+    conn.close()
+
+
+def write_request(get_conn, session_id):
+    conn = get_conn()
+    cursor = conn.cursor()
+    cursor.execute('UPDATE user_sessions SET last_activity = CURRENT_TIMESTAMP WHERE session_id = ?', (session_id,))
+    conn.commit()
+    conn.close()
+
+
+def run(label, get_conn):
+    session_ids = seed(get_conn)
+    counts = {'read': 0, 'write': 0, 'error': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + DURATION
+
+    def worker(kind, fn):
+        rng = random.Random()
+        done = errors = 0
+        while time.perf_counter() < deadline:
+            try:
+                fn(get_conn, rng.choice(session_ids))
+                done += 1
+            except sqlite3.OperationalError:
+                # "database is locked" under the rollback journal
+                errors += 1
+        with lock:
+            counts[kind] += done
+            counts['error'] += errors
+
+    threads = [threading.Thread(target=worker, args=('read', read_request)) for _ in range(READERS)]
+    threads += [threading.Thread(target=worker, args=('write', write_request)) for _ in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"{label:>10}: {counts['read'] / DURATION:>9.0f} reads/s {counts['write'] / DURATION:>8.0f} writes/s "
+          f"{counts['error']:>6} lock errors")
+
+
+def main():
+    print(f"readers={READERS} writers={WRITERS} duration={DURATION}s")
+
+    # Before: a new rollback-journal connection for every call
+    direct_path = os.path.join(tempfile.mkdtemp(prefix='getcharty-bench-'), 'direct.db')
+    models.configure_database(direct_path)
+    models.init_database()
+    models.configure_database(':memory:')
+    conn = sqlite3.connect(direct_path)
+    conn.execute('PRAGMA journal_mode=DELETE')
+    conn.close()
+    run('direct', lambda: sqlite3.connect(direct_path))
+
+    # After: pooled WAL connections through models.get_session
+    pooled_path = os.path.join(tempfile.mkdtemp(prefix='getcharty-bench-'), 'pooled.db')
+    models.configure_database(pooled_path)
+    models.init_database()
+    run('pooled', models.get_session)
+
+
+if __name__ == '__main__':
+    main()
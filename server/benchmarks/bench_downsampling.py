@@ -0,0 +1,106 @@
+# benchmarks/bench_downsampling.py
+# 2026-10-18 17:55:00 UTC
+# Time LTTB and min/max downsampling on large series and measure visual fidelity
+#
+# Usage (from server/): python benchmarks/bench_downsampling.py
+#
+# Fidelity is measured on a rasterized chart: the series is drawn into a
+# CHART_WIDTH x CHART_HEIGHT pixel grid and, for every pixel column, the
+# vertical extent covered by the full series is compared with the extent
+# covered by the reduced one, allowing a one-column horizontal shift (a
+# spike kept by the reduced series may be drawn one column over). "max px"
+# is the worst vertical gap in pixels and "exact cols" is the share of
+# columns drawn within that tolerance.
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.downsampling import lttb_indices, minmax_indices, target_points
+
+POINT_COUNTS = [1_000_000, 10_000_000]
+CHART_WIDTH = 1200
+CHART_HEIGHT = 500
+REPEATS = 3
+
+
+def make_series(n):
+    """Random walk with spikes, the hard case for downsampling"""
+    rng = np.random.default_rng(7)
+    y = np.cumsum(rng.normal(size=n))
+    spikes = rng.choice(n, size=max(n // 200_000, 5), replace=False)
+    y[spikes] += rng.choice([-1, 1], size=len(spikes)) * 40 * y.std()
+    return np.arange(n, dtype=np.float64), y
+
+
+def best_of(fn):
+    timings = []
+    result = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def column_extents(x, y, x_range, y_range):
+    """Per pixel column (low, high) pixel rows of a line through the points"""
+    cols = ((x - x_range[0]) / (x_range[1] - x_range[0]) * (CHART_WIDTH - 1)).astype(np.int64)
+    rows = (y - y_range[0]) / (y_range[1] - y_range[0]) * (CHART_HEIGHT - 1)
+
+    low = np.full(CHART_WIDTH, np.inf)
+    high = np.full(CHART_WIDTH, -np.inf)
+    np.minimum.at(low, cols, rows)
+    np.maximum.at(high, cols, rows)
+
+    # Line segments crossing between columns cover the rows in between
+    seg_low = np.minimum(rows[:-1], rows[1:])
+    seg_high = np.maximum(rows[:-1], rows[1:])
+    crosses = cols[1:] != cols[:-1]
+    np.minimum.at(low, cols[1:][crosses], seg_low[crosses])
+    np.maximum.at(high, cols[1:][crosses], seg_high[crosses])
+    return np.round(low), np.round(high)
+
+
+def fidelity(x, y, indices):
+    x_range = (x[0], x[-1])
+    y_range = (y.min(), y.max())
+    full_low, full_high = column_extents(x, y, x_range, y_range)
+    low, high = column_extents(x[indices], y[indices], x_range, y_range)
+
+    drawn = np.isfinite(full_low) & np.isfinite(low)
+    missing = np.maximum(np.maximum(dilate(low, np.minimum) - full_low, full_high - dilate(high, np.maximum)), 0)
+    extra = np.maximum(np.maximum(dilate(full_low, np.minimum) - low, high - dilate(full_high, np.maximum)), 0)
+    gap = np.maximum(missing, extra)[drawn]
+    return gap.max(), np.mean(gap == 0), y[indices].max() == y.max() and y[indices].min() == y.min()
+
+
+def dilate(extent, combine):
+    """Combine each pixel column with its neighbours"""
+    padded = np.concatenate(([extent[0]], extent, [extent[-1]]))
+    return combine(combine(padded[:-2], padded[1:-1]), padded[2:])
+
+
+def main():
+    n_out = target_points(chart_width=CHART_WIDTH)
+    print(f"chart {CHART_WIDTH}x{CHART_HEIGHT}px, target {n_out} points")
+    print(f"{'points':>11} {'method':>7} {'ms':>8} {'kept':>6} {'max px':>7} {'exact cols':>11} {'extremes':>9}")
+
+    for n in POINT_COUNTS:
+        x, y = make_series(n)
+        methods = [
+            ('lttb', lambda: lttb_indices(x, y, n_out)),
+            ('minmax', lambda: minmax_indices(y, n_out))
+        ]
+        for name, fn in methods:
+            elapsed_ms, indices = best_of(fn)
+            max_gap, exact, extremes = fidelity(x, y, indices)
+            print(f"{n:>11} {name:>7} {elapsed_ms:>8.1f} {len(indices):>6} {max_gap:>7.0f} "
+                  f"{exact:>10.1%} {'kept' if extremes else 'lost':>9}")
+
+
+if __name__ == '__main__':
+    main()
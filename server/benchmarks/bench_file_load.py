@@ -0,0 +1,56 @@
+# benchmarks/bench_file_load.py
+# 2026-10-18 10:40:00 UTC
+# Compare reload latency of legacy CSV BLOBs against columnar storage
+#
+# Usage (from server/): python benchmarks/bench_file_load.py
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.columnar import encode_frame, decode_frame, FORMAT_CSV
+
+ROW_COUNTS = [10_000, 1_000_000]
+REPEATS = 5
+
+
+def make_frame(rows):
+    """Build a frame resembling a typical upload: dates, text, and numbers"""
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'date': pd.date_range('2000-01-01', periods=rows, freq='h').strftime('%Y-%m-%d %H:%M:%S'),
+        'region': rng.choice(['North', 'South', 'East', 'West'], rows),
+        'revenue': rng.normal(10_000, 2_500, rows).round(2),
+        'units': rng.integers(0, 500, rows)
+    })
+
+
+def best_of(fn):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    print(f"{'rows':>10} {'format':>8} {'size MB':>9} {'load ms':>9}")
+    for rows in ROW_COUNTS:
+        df = make_frame(rows)
+        csv_blob = df.to_csv(index=False).encode('utf-8')
+        columnar_blob, data_format, dtypes_json = encode_frame(df)
+
+        csv_ms = best_of(lambda: decode_frame(csv_blob, FORMAT_CSV, None))
+        columnar_ms = best_of(lambda: decode_frame(columnar_blob, data_format, dtypes_json))
+
+        print(f"{rows:>10} {FORMAT_CSV:>8} {len(csv_blob) / 1e6:>9.1f} {csv_ms:>9.1f}")
+        print(f"{rows:>10} {data_format:>8} {len(columnar_blob) / 1e6:>9.1f} {columnar_ms:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_response_formats.py
+# 2026-10-18 16:40:00 UTC
+# Compare payload size and encode time of the file data response formats
+#
+# Usage (from server/): python benchmarks/bench_response_formats.py
+
+import gzip
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import json as flask_json
+from utils.serializers import available_formats, encode_frame_payload, HAS_ORJSON
+
+SHAPES = [(10_000, 8), (200_000, 24)]  # (rows, numeric columns) for narrow and wide files
+REPEATS = 3
+
+
+def make_frame(rows, numeric_columns):
+    """Build a frame like a cleaned upload: a date label, a category and many numeric series"""
+    rng = np.random.default_rng(42)
+    data = {
+        'date': pd.date_range('2000-01-01', periods=rows, freq='h').strftime('%Y-%m-%d %H:%M'),
+        'region': rng.choice(['North', 'South', 'East', 'West'], rows)
+    }
+    for i in range(numeric_columns):
+        if i % 2:
+            data[f'units_{i}'] = rng.integers(0, 50_000, rows)
+        else:
+            data[f'revenue_{i}'] = rng.normal(10_000, 2_500, rows).round(2)
+    return pd.DataFrame(data)
+
+
+def best_of(fn):
+    timings = []
+    result = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def main():
+    payload = {'chart_elements': {'title': 'Revenue by Date'}, 'file_id': 'bench'}
+    print(f"orjson: {'yes' if HAS_ORJSON else 'no'}; formats: {', '.join(available_formats())}")
+    print(f"{'rows':>8} {'cols':>5} {'format':>18} {'encode ms':>10} {'size MB':>8} {'gzip MB':>8}")
+
+    for rows, numeric_columns in SHAPES:
+        df = make_frame(rows, numeric_columns)
+        width = len(df.columns)
+
+        # The previous implementation: to_dict('records') through Flask's JSON provider
+        baseline_ms, baseline = best_of(
+            lambda: flask_json.dumps(dict(payload, data=df.to_dict('records'))).encode('utf-8'))
+        results = [('records (jsonify)', baseline_ms, baseline)]
+
+        for fmt in available_formats():
+            encode_ms, (body, _) = best_of(lambda: encode_frame_payload(df, payload, fmt))
+            results.append((fmt, encode_ms, body))
+
+        for name, encode_ms, body in results:
+            print(f"{rows:>8} {width:>5} {name:>18} {encode_ms:>10.1f} "
+                  f"{len(body) / 1e6:>8.2f} {len(gzip.compress(body, 6)) / 1e6:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
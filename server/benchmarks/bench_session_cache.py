@@ -0,0 +1,88 @@
+# benchmarks/bench_session_cache.py
+# 2026-10-18 21:50:00 UTC
+# p50/p99 latency of session lookups and of GET /api/files (lookup + file
+# listing) with a write per request (cache_ttl=0, the old behaviour) vs the
+# session cache with batched last_activity flushes
+#
+# Usage (from server/): python benchmarks/bench_session_cache.py
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import models
+
+THREADS = 8
+REQUESTS = 2000
+SESSIONS = 200
+
+
+def percentiles(seconds):
+    ms = np.array(seconds) * 1000
+    return f"p50 {np.percentile(ms, 50):6.3f} ms  p99 {np.percentile(ms, 99):6.3f} ms"
+
+
+def timed(fn, count, rng, session_ids):
+    latencies = []
+    for _ in range(count):
+        session_id = rng.choice(session_ids)
+        start = time.perf_counter()
+        fn(session_id)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(label, manager):
+    import app as app_module
+    app_module.user_manager = manager
+    client = app_module.app.test_client()
+
+    session_ids = [f'bench-{label}-{i}' for i in range(SESSIONS)]
+    for session_id in session_ids:
+        manager.get_or_create_user_id(session_id)
+
+    def request(session_id):
+        response = client.get(f'/api/files?session_id={session_id}')
+        assert response.status_code == 200, response.get_json()
+
+    # Latency is measured single-threaded so GIL scheduling doesn't dominate it
+    rng = random.Random(0)
+    lookups = timed(manager.get_or_create_user_id, REQUESTS, rng, session_ids)
+    requests = timed(request, REQUESTS, rng, session_ids)
+
+    # Throughput with concurrent request threads
+    def worker(seed):
+        timed(request, REQUESTS // THREADS, random.Random(seed), session_ids)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    throughput = REQUESTS / (time.perf_counter() - started)
+
+    manager.stop()
+    print(f"{label:>9}: lookup {percentiles(lookups)} | request {percentiles(requests)} | "
+          f"{throughput:6.0f} req/s with {THREADS} threads | flushes={manager.flushes}")
+
+
+def main():
+    from utils.user_manager import UserManager
+
+    models.configure_database(os.path.join(tempfile.mkdtemp(prefix='getcharty-bench-'), 'sessions.db'))
+    models.init_database()
+    print(f"requests={REQUESTS} sessions={SESSIONS}")
+
+    run('uncached', UserManager(cache_ttl=0))
+    run('cached', UserManager(flush_interval=1.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_tick_spacing.py
+# 2026-10-18 19:45:00 UTC
+# Time label parsing and tick selection for /api/auto-spacing on long time axes
+#
+# Usage (from server/): python benchmarks/bench_tick_spacing.py
+
+import os
+import sys
+import time
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.date_parsing import parse_date_labels
+from utils.tick_spacing import time_spacing
+
+LABEL_COUNTS = [10_000, 100_000, 1_000_000]
+REPEATS = 3
+
+# interval type -> (pandas frequency, label format)
+AXES = {
+    'hour': ('h', '%Y-%m-%d %H:%M'),
+    'day': ('D', '%Y-%m-%d'),
+    'week': ('W', '%d-%b-%Y'),
+    'month': ('MS', '%b %d, %Y'),
+    'quarter': ('QS', '%m/%d/%Y'),
+    'year': ('YS', '%Y-%m')
+}
+
+
+# Longest run of each frequency that stays within years 1000-9999; longer axes repeat it
+MAX_PERIODS = {'W': 400_000, 'MS': 100_000, 'QS': 30_000, 'YS': 8_000}
+
+
+def make_labels(n, freq, fmt):
+    periods = min(n, MAX_PERIODS.get(freq, n))
+    labels = pd.date_range('1000-01-01', periods=periods, freq=freq, unit='s').strftime(fmt).tolist()
+    return (labels * (n // periods + 1))[:n]
+
+
+def best_of(fn):
+    timings = []
+    result = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def main():
+    print(f"{'labels':>9} {'interval':>9} {'parse ms':>9} {'ticks ms':>9} {'ticks':>7}")
+    for n in LABEL_COUNTS:
+        for interval, (freq, fmt) in AXES.items():
+            labels = make_labels(n, freq, fmt)
+            parse_ms, dates = best_of(lambda: parse_date_labels(labels))
+            ticks_ms, config = best_of(lambda: time_spacing(dates, labels, interval))
+            print(f"{n:>9} {interval:>9} {parse_ms:>9.1f} {ticks_ms:>9.1f} {len(config['tickvals']):>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/bench_usage_limiter.py
+# 2026-10-18 22:30:00 UTC
+# Per-check latency of IP usage limits with 1M distinct IPs: the old
+# dict-of-months scan (_cleanup_old_usage walked every IP on every check)
+# vs the sliding-window counter, plus memory use and reclaiming of idle IPs
+#
+# Usage (from server/): python benchmarks/bench_usage_limiter.py
+
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+IPS = 1_000_000
+CHECKS = 200_000
+LEGACY_CHECKS = 20
+THREADS = 8
+WINDOW = 30 * 24 * 60 * 60
+BUCKETS = 30
+
+
+def ip(i):
+    return f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}'
+
+
+def percentiles(seconds):
+    us = np.array(seconds) * 1e6
+    return f"p50 {np.percentile(us, 50):9.2f} us  p99 {np.percentile(us, 99):9.2f} us"
+
+
+def legacy(ips):
+    """The old TierManager bookkeeping: one dict entry per IP and month, fully scanned per check"""
+    now = time.time()
+    month = time.strftime('%Y-%m')
+    ip_usage = {f'{address}:{month}': {'charts': 1, 'last_used': now} for address in ips}
+
+    def check(address):
+        cutoff = time.time() - 90 * 24 * 60 * 60
+        stale = [key for key, usage in ip_usage.items() if usage['last_used'] < cutoff]
+        for key in stale:
+            del ip_usage[key]
+        return ip_usage.get(f'{address}:{month}', {'charts': 0})['charts'] < 10
+
+    rng = random.Random(0)
+    latencies = []
+    for _ in range(LEGACY_CHECKS):
+        address = rng.choice(ips)
+        start = time.perf_counter()
+        check(address)
+        latencies.append(time.perf_counter() - start)
+    print(f"   legacy: check {percentiles(latencies)}  ({LEGACY_CHECKS} checks)")
+
+
+def sliding_window(ips):
+    from utils.usage_limiter import SlidingWindowCounter
+
+    now = [time.time()]
+    counter = SlidingWindowCounter(WINDOW, BUCKETS, clock=lambda: now[0])
+
+    start = time.perf_counter()
+    for address in ips:
+        counter.add(address)
+    fill = time.perf_counter() - start
+
+    rng = random.Random(0)
+    adds, checks = [], []
+    for i in range(CHECKS):
+        address = rng.choice(ips)
+        if i % 2:
+            start = time.perf_counter()
+            counter.add(address)
+            adds.append(time.perf_counter() - start)
+        else:
+            start = time.perf_counter()
+            counter.count(address) < 10
+            checks.append(time.perf_counter() - start)
+    print(f"   window: check {percentiles(checks)} | add {percentiles(adds)} | "
+          f"{len(ips) / fill:,.0f} new IPs/s | {counter.nbytes / 2**20:.0f} MB of counters")
+
+    # Throughput with concurrent request threads
+    def worker(seed):
+        worker_rng = random.Random(seed)
+        for _ in range(CHECKS // THREADS):
+            counter.add(worker_rng.choice(ips))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"           {CHECKS / (time.perf_counter() - start):,.0f} adds/s with {THREADS} threads")
+
+    # A window later only a few IPs are active; idle ones are freed as calls come in
+    now[0] += WINDOW + 1
+    active = ips[:1000]
+    calls = 0
+    start = time.perf_counter()
+    while len(counter) > len(active):
+        counter.add(active[calls % len(active)])
+        calls += 1
+    print(f"           reclaimed {IPS - len(active):,} idle IPs over {calls:,} calls "
+          f"({(time.perf_counter() - start) / calls * 1e6:.2f} us per call)")
+
+
+def main():
+    ips = [ip(i) for i in range(IPS)]
+    print(f"ips={IPS:,} window={WINDOW // 86400} days in {BUCKETS} buckets")
+    legacy(ips)
+    sliding_window(ips)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,13 +2,30 @@
 # filename: config.py
 # date: 2025-07-31 17:17:59
 # Configuration file for date formats and quarter definitions
+import os
+
 DATE_FORMATS = [
     '%Y-%m-%d',
     '%m/%d/%Y',
     '%d/%m/%Y',
     '%Y/%m/%d',
     '%d-%m-%Y',
-    '%m-%d-%Y'
+    '%m-%d-%Y',
+    '%Y-%m-%d %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m',
+    '%d-%b-%y',
+    '%d-%b-%Y',
+    '%b %d, %Y',
+    '%B %d, %Y',
+    '%d %b %Y',
+    '%d %B %Y'
+]
+
+# Axis labels may also be times of day, which have no calendar date to profile or summarize by quarter
+TIME_FORMATS = [
+    '%H:%M'
 ]
 
 QUARTER_DEFINITIONS = {
@@ -16,4 +33,61 @@ QUARTER_DEFINITIONS = {
     'Q2': {'start': '04-01', 'end': '06-30'},
     'Q3': {'start': '07-01', 'end': '09-30'},
     'Q4': {'start': '10-01', 'end': '12-31'}
-}
\ No newline at end of file
+}
+
+# In-memory DataFrame cache shared by all users (see utils/frame_cache.py)
+FRAME_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 512 MB across the whole process
+FRAME_CACHE_MAX_FILES_PER_USER = 3  # None disables the per-user cap
+DERIVED_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Cleaned frames and chart elements per file
+
+# Windowed file data requests (see utils/pagination.py)
+FILE_PAGE_MAX_ROWS = 100_000  # Largest 'limit' a single request may ask for
+
+# Server-side downsampling of large charts (see utils/downsampling.py)
+DOWNSAMPLE_POINTS_PER_PIXEL = 2  # Points kept per pixel column when a chart width is given
+DOWNSAMPLE_MIN_POINTS = 100  # Never reduce a series below this many points
+
+# Top-N category aggregation for bar and pie charts (see api/chart_data.py)
+TOP_N_DEFAULT = 20  # Categories shown before the rest are folded into "Other"
+TOP_N_MAX = 500
+
+# Cache of values computed from files: quarterly stats, chart data (see utils/cache_manager.py)
+DATA_CACHE_BACKEND = os.environ.get('GETCHARTY_DATA_CACHE', 'memory')  # 'memory', 'disk' or 'redis'
+DATA_CACHE_TTL_SECONDS = 3600
+DATA_CACHE_MAX_ENTRIES = 4096  # Memory backend only
+DATA_CACHE_DIR = 'cache/data'  # Disk backend only
+DATA_CACHE_REDIS_URL = os.environ.get('GETCHARTY_REDIS_URL', 'redis://localhost:6379/0')
+
+# Date-range statistics (see api/range_stats.py)
+RANGE_STATS_MAX_PERIODS = 5000  # Most months, weeks, quarters or years one request may break a range into
+
+# Approximate percentiles from per-quarter quantile sketches (see utils/quantile_sketch.py)
+QUANTILE_SKETCH_K = 200  # Larger is more accurate: merged percentiles are within 3/k in rank (1.5% at 200)
+QUARTERLY_PERCENTILES = [50, 90, 99]  # Reported by /api/quarterly-stats as median, p90 and p99
+
+# On-disk spill tier for frames evicted from memory (see utils/spill_store.py)
+SPILL_CACHE_DIR = 'cache/spill'  # None disables the spill tier
+SPILL_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB of spill files
+
+# Session lookups (see utils/user_manager.py)
+SESSION_CACHE_TTL_SECONDS = 300  # Re-check a cached session against the database after this long; 0 disables caching
+SESSION_CACHE_MAX_ENTRIES = 100_000
+SESSION_ACTIVITY_FLUSH_SECONDS = 5.0  # How often buffered last_activity timestamps are written
+
+# Background maintenance (see utils/maintenance.py)
+MAINTENANCE_INTERVAL_SECONDS = 3600  # None disables the scheduler
+MAINTENANCE_VACUUM_PAGES = 10_000  # Free pages returned to the OS per run by incremental VACUUM
+
+# SQLite database (see utils/db_pool.py)
+DATABASE_PATH = os.environ.get('GETCHARTY_DB_PATH', 'getcharty.db')
+DB_POOL_SIZE = 8  # Maximum open connections per process
+DB_POOL_TIMEOUT = 30.0  # Seconds to wait for a free connection
+
+# Per-IP chart usage limits (see utils/usage_limiter.py)
+USAGE_WINDOW_DAYS = 30  # 'monthlyCharts' limits count charts generated over this sliding window
+USAGE_WINDOW_BUCKETS = 30  # Counts leave the window one bucket (here a day) at a time
+USAGE_COUNTER_BACKEND = os.environ.get('GETCHARTY_USAGE_COUNTERS', 'sqlite')  # 'sqlite' (shared by all workers) or 'memory' (per process)
+USAGE_FLUSH_SECONDS = 1.0  # How often buffered increments are written; other workers see them within this long
+
+# Tier configuration hot reload (see utils/tier_config.py)
+TIER_CONFIG_RELOAD_SECONDS = 2.0  # How often config/tiers.json is checked for changes; None reloads only on SIGHUP
@@ -3,18 +3,30 @@
 # Database initialization script for hybrid storage system
 
 from models import init_database
+from config import DATABASE_PATH
 import os
 
+def migrate_file_storage():
+    """Convert files stored as raw CSV BLOBs to typed columnar storage"""
+    from utils.hybrid_storage import storage_manager
+    
+    migrated = storage_manager.migrate_csv_blobs()
+    print(f"📦 Migrated {migrated} CSV file(s) to columnar storage")
+    
+    removed = storage_manager.cleanup_orphaned_spills()
+    print(f"🧹 Removed {removed} orphaned spill file(s)")
+
 def init_database_tables():
     """Initialize the database and create all tables"""
     print("🔧 Initializing GetCharty database...")
     
     # Initialize database
     init_database()
+    migrate_file_storage()
     
     print("✅ Database initialized successfully!")
-    print("📁 Database file: getcharty.db")
-    print("🗂️  Tables created: files, user_sessions")
+    print(f"📁 Database file: {DATABASE_PATH}")
+    print("🗂️  Tables created: files, file_blobs, user_sessions")
 
 if __name__ == '__main__':
     init_database_tables() 
\ No newline at end of file
@@ -4,12 +4,18 @@
 
 import sqlite3
 import json
+import time
 from datetime import datetime
 import uuid
+from config import DATABASE_PATH, DB_POOL_SIZE, DB_POOL_TIMEOUT
+from utils.db_pool import ConnectionPool
+
+# Shared connection pool, see configure_database() to point it elsewhere
+_pool = ConnectionPool(DATABASE_PATH, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, auto_vacuum='INCREMENTAL')
 
 def init_database():
-    """Initialize the database and create tables"""
-    conn = sqlite3.connect('getcharty.db')
+    """Initialize the database, create tables and apply pending schema migrations"""
+    conn = get_session()
     cursor = conn.cursor()
     
     # Create files table
@@ -22,10 +28,82 @@ def init_database():
             data BLOB NOT NULL,
             file_size INTEGER NOT NULL,
             total_records INTEGER NOT NULL,
-            columns TEXT NOT NULL
+            columns TEXT NOT NULL,
+            data_format TEXT NOT NULL DEFAULT 'csv',
+            dtypes TEXT,
+            content_hash TEXT,
+            profile TEXT
+        )
+    ''')
+    
+    # Upgrade files tables created before columnar storage and deduplication
+    _add_missing_columns(cursor, 'files', {
+        'data_format': "TEXT NOT NULL DEFAULT 'csv'",
+        'dtypes': 'TEXT',
+        'content_hash': 'TEXT',
+        'profile': 'TEXT'
+    })
+    
+    # Create file_blobs table: one row per distinct upload content, shared by
+    # every files row with the same content_hash (files.data is then empty)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS file_blobs (
+            content_hash TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            data_format TEXT NOT NULL,
+            dtypes TEXT,
+            total_records INTEGER NOT NULL,
+            columns TEXT NOT NULL,
+            profile TEXT,
+            ref_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    _add_missing_columns(cursor, 'file_blobs', {
+        'profile': 'TEXT'
+    })
+    
+    # Create quarterly_summaries table: per-quarter statistics of each date
+    # column, computed at upload (year = quarter = 0 holds whole-file totals)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS quarterly_summaries (
+            file_id TEXT NOT NULL,
+            date_column TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            quarter INTEGER NOT NULL,
+            record_count INTEGER NOT NULL,
+            summary_data TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (file_id, date_column, year, quarter)
         )
     ''')
     
+    # Create quarterly_sketches table: mergeable quantile sketch of each numeric
+    # column per quarter of each date column (see utils/quantile_sketch.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS quarterly_sketches (
+            file_id TEXT NOT NULL,
+            date_column TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            quarter INTEGER NOT NULL,
+            column_name TEXT NOT NULL,
+            sketch BLOB NOT NULL,
+            PRIMARY KEY (file_id, date_column, year, quarter, column_name)
+        )
+    ''')
+    
+    # Create usage_counters table: per-bucket event counts of the sliding-window
+    # usage counters shared by all worker processes (see utils/usage_store.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS usage_counters (
+            counter TEXT NOT NULL,
+            key TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            last_used REAL NOT NULL,
+            PRIMARY KEY (counter, key, bucket)
+        ) WITHOUT ROWID
+    ''')
+    
     # Create user_sessions table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS user_sessions (
@@ -37,17 +115,67 @@ def init_database():
     ''')
     
     conn.commit()
+    _migrate(conn)
     conn.close()
     print("✅ Database initialized successfully!")
-    print("📁 Database file: getcharty.db")
-    print("🗂️  Tables created: files, user_sessions")
+    print(f"📁 Database file: {_pool.path}")
+    print("🗂️  Tables created: files, file_blobs, quarterly_summaries, quarterly_sketches, usage_counters, user_sessions")
+
+def _migration_indexes(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_files_user_id ON files (user_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_files_content_hash ON files (content_hash)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_user_sessions_last_activity ON user_sessions (last_activity)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_user_sessions_user_id ON user_sessions (user_id)')
+
+def _migration_incremental_vacuum(conn):
+    # New databases get auto-vacuum from the pool; older ones need a full VACUUM once
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+        conn.commit()
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+
+# Schema changes applied once per database, in order; PRAGMA user_version
+# records the last one applied. Append new migrations, never edit old ones.
+SCHEMA_MIGRATIONS = [
+    (1, 'index file listings, blob references and session expiry', _migration_indexes),
+    (2, 'enable incremental auto-vacuum', _migration_incremental_vacuum)
+]
+
+def _migrate(conn):
+    """Apply the SCHEMA_MIGRATIONS newer than the database's user_version"""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for target, description, migration in SCHEMA_MIGRATIONS:
+        if version >= target:
+            continue
+        started = time.perf_counter()
+        migration(conn)
+        conn.execute(f'PRAGMA user_version = {int(target)}')
+        conn.commit()
+        version = target
+        print(f"🔧 Schema migration {target} ({description}) applied in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+def _add_missing_columns(cursor, table, columns):
+    """Add columns to an existing table if they are not present yet"""
+    cursor.execute(f'PRAGMA table_info({table})')
+    existing = {row[1] for row in cursor.fetchall()}
+    for name, definition in columns.items():
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+
+def configure_database(path, pool_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT):
+    """Point get_session() at a different database file"""
+    global _pool
+    old_pool = _pool
+    _pool = ConnectionPool(path, max_size=pool_size, timeout=timeout, auto_vacuum='INCREMENTAL')
+    old_pool.close_all()
 
 def get_session():
-    """Get a database connection"""
-    return sqlite3.connect('getcharty.db')
+    """Get a pooled database connection; close() returns it to the pool"""
+    return _pool.acquire()
 
 class FileRecord:
-    def __init__(self, file_id, user_id, filename, data, file_size, total_records, columns):
+    def __init__(self, file_id, user_id, filename, data, file_size, total_records, columns,
+                 data_format='csv', dtypes=None, content_hash=None, profile=None):
         self.file_id = file_id
         self.user_id = user_id
         self.filename = filename
@@ -55,6 +183,10 @@ class FileRecord:
         self.file_size = file_size
         self.total_records = total_records
         self.columns = columns
+        self.data_format = data_format
+        self.dtypes = dtypes
+        self.content_hash = content_hash
+        self.profile = profile
 
 class UserSession:
     def __init__(self, session_id, user_id):
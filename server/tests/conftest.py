@@ -0,0 +1,26 @@
+# tests/conftest.py
+# 2026-10-18 23:30:00 UTC
+# Shared pytest setup: server modules importable, and an isolated database per test
+#
+# Usage (from server/): python -m pytest tests
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Point the connection pool at a fresh database for one test"""
+    import models
+    from config import DATABASE_PATH
+    models.configure_database(str(tmp_path / 'test.db'))
+    models.init_database()
+    yield
+    # Write buffered session activity to this database, not the real one at exit
+    from utils.user_manager import user_manager
+    user_manager.flush_activity()
+    models.configure_database(DATABASE_PATH)
@@ -0,0 +1,77 @@
+# tests/golden/generate_tick_spacing.py
+# 2026-10-19 00:10:00 UTC
+# Regenerates tick_spacing.json from the apply_*_spacing functions that app.py
+# had before utils/tick_spacing.py replaced them (commit 58a2ed6)
+#
+# Usage (from the repo root):
+#   git worktree add /tmp/getcharty-58a2ed6 58a2ed6
+#   python server/tests/golden/generate_tick_spacing.py /tmp/getcharty-58a2ed6/server
+
+import json
+import os
+import random
+import sys
+
+import pandas as pd
+
+# interval type -> (pandas frequency, label format, periods)
+AXES = {
+    'hour': ('h', '%Y-%m-%d %H:%M', 60),
+    'day': ('D', '%Y-%m-%d', 45),
+    'week': ('W', '%d-%b-%Y', 40),
+    'month': ('MS', '%b %d, %Y', 40),
+    'quarter': ('QS', '%m/%d/%Y', 30),
+    'year': ('YS', '%Y-%m', 30)
+}
+
+
+def make_cases():
+    rng = random.Random(15)
+    cases = []
+    for interval, (freq, fmt, periods) in AXES.items():
+        labels = pd.date_range('1998-11-02', periods=periods, freq=freq).strftime(fmt).tolist()
+        cases.append((f'{interval}-regular', interval, labels))
+
+        shuffled = labels[:]
+        rng.shuffle(shuffled)
+        cases.append((f'{interval}-shuffled', interval, shuffled))
+
+        cases.append((f'{interval}-header-row', interval, ['Date'] + labels))
+
+        # Labels that aren't dates (parsed as NaT) in the middle and at the end
+        with_gaps = labels[:]
+        for position in sorted(rng.sample(range(1, len(labels)), 3), reverse=True):
+            with_gaps.insert(position, rng.choice(['n/a', '', 'TBD', 'Total']))
+        cases.append((f'{interval}-nat', interval, with_gaps + ['Grand total']))
+
+        cases.append((f'{interval}-duplicates', interval, sorted(labels * 2, key=labels.index)))
+
+    cases.append(('quarter-single-year', 'quarter', ['01/01/2020', '04/01/2020', '07/01/2020', '10/01/2020']))
+    cases.append(('year-long-span', 'year', [str(year) for year in range(1900, 2011)]))
+    cases.append(('other-default', 'other', [f'Item {i}' for i in range(25)]))
+    return cases
+
+
+def main(old_server_dir):
+    sys.path.insert(0, old_server_dir)
+    import app as old_app
+    from utils.date_parsing import parse_date_labels
+
+    golden = []
+    for name, interval, labels in make_cases():
+        dates = parse_date_labels(labels)
+        golden.append({
+            'name': name,
+            'interval_type': interval,
+            'x_labels': labels,
+            'xaxis_config': old_app.apply_time_spacing(labels, interval, dates)
+        })
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tick_spacing.json')
+    with open(path, 'w') as f:
+        json.dump(golden, f, indent=1, default=int)
+    print(f"Wrote {len(golden)} cases to {path}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1])
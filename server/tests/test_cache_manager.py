@@ -0,0 +1,226 @@
+# tests/test_cache_manager.py
+# 2026-10-19 01:30:00 UTC
+# DataCache keys, backends (memory, disk, Redis via a fake client), payloads and single-flight computes
+
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from utils import cache_manager
+from utils.cache_manager import (DataCache, DiskBackend, MemoryBackend, RedisBackend, cache_key,
+                                 deserialize, serialize)
+
+SERVER_DIR = __file__.rsplit('/tests/', 1)[0]
+
+
+class FakeClock:
+    """Stands in for the time module inside cache_manager"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeRedis:
+    """The redis-py subset RedisBackend uses, with expiry on a fake clock"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.entries = {}
+        self.setex_calls = []
+
+    def get(self, name):
+        entry = self.entries.get(name)
+        if entry is None or entry[0] <= self.clock.now:
+            self.entries.pop(name, None)
+            return None
+        return entry[1]
+
+    def setex(self, name, seconds, value):
+        assert isinstance(seconds, int) and seconds >= 1
+        assert isinstance(value, bytes)
+        self.setex_calls.append((name, seconds))
+        self.entries[name] = (self.clock.now + seconds, value)
+
+    def delete(self, *names):
+        return sum(self.entries.pop(name, None) is not None for name in names)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_manager, 'time', fake)
+    return fake
+
+
+@pytest.fixture(params=['memory', 'disk', 'redis'])
+def backend(request, clock, tmp_path):
+    if request.param == 'memory':
+        return MemoryBackend()
+    if request.param == 'disk':
+        return DiskBackend(str(tmp_path / 'cache'))
+    return RedisBackend(FakeRedis(clock))
+
+
+def sample_frame():
+    return pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=5, freq='D'),
+        'region': ['north', 'south', None, 'east', 'west'],
+        'revenue': [1.5, np.nan, 3.25, 4.0, 5.0],
+        'units': np.arange(5, dtype=np.int64)
+    })
+
+
+def test_cache_key_is_stable_across_processes():
+    params = {'b': [1, 2], 'a': 'x', 'when': pd.Timestamp('2024-01-01')}
+    expected = cache_key('filtered', 'hash-1', params)
+    script = ("import sys, pandas as pd; sys.path.insert(0, sys.argv[1]); "
+              "from utils.cache_manager import cache_key; "
+              "print(cache_key('filtered', 'hash-1', {'a': 'x', 'when': pd.Timestamp('2024-01-01'), 'b': [1, 2]}))")
+    for seed in ('1', '2'):
+        result = subprocess.run([sys.executable, '-c', script, SERVER_DIR], capture_output=True, text=True,
+                                check=True, env={'PYTHONHASHSEED': seed, 'PATH': ''}, cwd=SERVER_DIR)
+        assert result.stdout.strip() == expected
+
+
+def test_cache_key_depends_on_every_part():
+    key = cache_key('filtered', 'hash-1', {'a': 1})
+    assert cache_key('stats', 'hash-1', {'a': 1}) != key
+    assert cache_key('filtered', 'hash-2', {'a': 1}) != key
+    assert cache_key('filtered', 'hash-1', {'a': 2}) != key
+    assert key.startswith('filtered:')
+
+
+def test_memory_backend_expires_entries(clock):
+    backend = MemoryBackend()
+    backend.set('ns:a', b'payload', ttl=10)
+    clock.now += 9
+    assert backend.get('ns:a') == b'payload'
+    clock.now += 1
+    assert backend.get('ns:a') is None
+
+
+def test_memory_backend_evicts_least_recently_used(clock):
+    backend = MemoryBackend(max_entries=2)
+    backend.set('ns:a', b'a', ttl=60)
+    backend.set('ns:b', b'b', ttl=60)
+    assert backend.get('ns:a') == b'a'  # b is now least recently used
+    backend.set('ns:c', b'c', ttl=60)
+    assert backend.get('ns:b') is None
+    assert backend.get('ns:a') == b'a'
+    assert backend.get('ns:c') == b'c'
+
+
+def test_disk_backend_round_trip_and_expiry(clock, tmp_path):
+    directory = tmp_path / 'cache'
+    backend = DiskBackend(str(directory))
+    key = cache_key('filtered', 'hash-1', {'a': 1})
+    backend.set(key, b'\x00payload\xff', ttl=10)
+
+    # Another worker on the same host sees the entry
+    assert DiskBackend(str(directory)).get(key) == b'\x00payload\xff'
+    assert not list(directory.rglob('*.tmp-*'))
+
+    clock.now += 10
+    assert backend.get(key) is None
+    assert not [path for path in directory.rglob('*') if path.is_file()]
+
+
+def test_redis_backend_prefixes_keys_and_sets_expiry(clock):
+    client = FakeRedis(clock)
+    backend = RedisBackend(client)
+    backend.set('ns:a', b'payload', ttl=0.2)
+    assert client.setex_calls == [('getcharty:ns:a', 1)]
+    assert backend.get('ns:a') == b'payload'
+
+    backend.delete('ns:a')
+    assert backend.get('ns:a') is None
+    assert client.entries == {}
+
+
+@pytest.mark.parametrize('value', [{'total': 3, 'labels': ['a', None]}, [1, 2.5, 'x'], 'text', 0])
+def test_json_values_round_trip(value):
+    assert deserialize(serialize(value)) == value
+
+
+def test_dataframes_round_trip_through_every_backend(backend):
+    cache = DataCache(backend, ttl=60)
+    df = sample_frame()
+    cache.set('filtered', 'hash-1', {'region': 'north'}, df)
+
+    restored = cache.get('filtered', 'hash-1', {'region': 'north'})
+    pd.testing.assert_frame_equal(restored, df)
+    assert cache.get('filtered', 'hash-1', {'region': 'south'}) is None
+    assert cache.get_stats()['hits'] == 1
+    assert cache.get_stats()['misses'] == 1
+
+
+def test_unknown_payload_tag_is_rejected():
+    with pytest.raises(ValueError):
+        deserialize(b'Xwhatever')
+
+
+def test_get_or_compute_runs_one_computation_for_concurrent_misses(backend):
+    cache = DataCache(backend, ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {'total': 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        cache.get_or_compute('stats', 'hash-1', {'q': 1}, compute))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Give every thread time to miss and join the in-flight computation
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [({'total': 42}, False)] * 8
+    assert cache.get_or_compute('stats', 'hash-1', {'q': 1}, compute) == ({'total': 42}, True)
+    assert len(calls) == 1
+
+
+def test_get_or_compute_does_not_cache_none(backend):
+    cache = DataCache(backend, ttl=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None
+
+    assert cache.get_or_compute('stats', 'hash-1', {}, compute) == (None, False)
+    assert cache.get_or_compute('stats', 'hash-1', {}, compute) == (None, False)
+    assert len(calls) == 2
+
+
+def test_hit_and_miss_counters_are_exact_under_concurrency():
+    cache = DataCache(MemoryBackend(), ttl=60)
+    cache.set('stats', 'hash-1', {}, {'total': 1})
+
+    def lookups():
+        for i in range(2000):
+            cache.get('stats', 'hash-1', {} if i % 2 else {'missing': True})
+
+    threads = [threading.Thread(target=lookups) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.get_stats()
+    assert stats['hits'] == stats['misses'] == 8000
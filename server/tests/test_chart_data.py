@@ -0,0 +1,102 @@
+# tests/test_chart_data.py
+# 2026-10-19 01:50:00 UTC
+# Top-N aggregation through /api/chart-data, /process-file and /api/files, with cleaned or raw column names
+
+import pytest
+from app import app
+
+REGIONS = 30
+
+
+def make_csv():
+    lines = ['Sales Region,Revenue ($)']
+    for i in range(REGIONS):
+        # Region i has revenue i + 1, twice
+        lines.extend([f'region-{i:02d},{i + 1}'] * 2)
+    return '\n'.join(lines)
+
+
+@pytest.fixture
+def client(database):
+    return app.test_client()
+
+
+@pytest.fixture
+def uploaded(client):
+    response = client.post('/process-file', json={
+        'filename': 'regions.csv', 'content': make_csv(), 'session_id': 'chart-data-test'
+    })
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def chart_data(client, uploaded, **params):
+    return client.post('/api/chart-data', json=dict(params, fileId=uploaded['file_id'],
+                                                    sessionId='chart-data-test'))
+
+
+def test_chart_data_accepts_the_cleaned_names_clients_receive(client, uploaded):
+    assert uploaded['columns'] == ['sales_region', 'revenue']
+
+    response = chart_data(client, uploaded, xColumn='sales_region', yColumn='revenue', topN=3)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['x'] == ['region-29', 'region-28', 'region-27', 'Other']
+    assert body['y'] == [60.0, 58.0, 56.0, float(sum(2 * (i + 1) for i in range(REGIONS - 3)))]
+    assert (body['xColumn'], body['yColumn']) == ('sales_region', 'revenue')
+
+
+def test_chart_data_still_accepts_raw_names_and_shares_their_cache_entry(client, uploaded):
+    cleaned = chart_data(client, uploaded, xColumn='sales_region', yColumn='revenue', topN=4)
+    raw = chart_data(client, uploaded, xColumn='Sales Region', yColumn='Revenue ($)', topN=4)
+    assert raw.status_code == 200
+    assert raw.get_json()['x'] == cleaned.get_json()['x']
+    assert raw.headers['X-Cache'] == 'HIT'
+
+
+def test_chart_data_rejects_unknown_columns(client, uploaded):
+    response = chart_data(client, uploaded, xColumn='country', yColumn='revenue')
+    assert response.status_code == 400
+    assert 'country' in response.get_json()['error']
+
+
+def test_process_file_sends_top_n_for_bar_charts(client):
+    response = client.post('/process-file', json={
+        'filename': 'regions.csv', 'content': make_csv(), 'session_id': 'chart-data-test',
+        'chart_config': {'chart_type': 'bar', 'top_n': 5}
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['data']) == 6
+    assert body['data'][0] == {'sales_region': 'region-29', 'revenue': 60.0}
+    assert body['data'][-1]['sales_region'] == 'Other'
+    assert body['aggregation'] == {'agg': 'sum', 'topN': 5, 'totalCategories': REGIONS,
+                                   'otherCategories': REGIONS - 5}
+    assert body['processing_info']['rows_processed'] == 2 * REGIONS
+
+
+def test_file_data_sends_top_n_for_pie_charts_only(client, uploaded):
+    url = f"/api/files/{uploaded['file_id']}"
+    pie = client.get(url, query_string={'session_id': 'chart-data-test', 'chart_type': 'pie',
+                                        'top_n': 3, 'agg': 'mean'})
+    assert pie.status_code == 200
+    body = pie.get_json()
+    assert [row['sales_region'] for row in body['data']] == ['region-29', 'region-28', 'region-27', 'Other']
+    assert [row['revenue'] for row in body['data']][:3] == [30.0, 29.0, 28.0]
+    assert body['aggregation']['agg'] == 'mean'
+
+    line = client.get(url, query_string={'session_id': 'chart-data-test', 'chart_type': 'line', 'top_n': 3})
+    assert len(line.get_json()['data']) == 2 * REGIONS
+    assert 'aggregation' not in line.get_json()
+
+
+def test_without_top_n_every_row_is_sent(client, uploaded):
+    assert len(uploaded['data']) == 2 * REGIONS
+    assert 'aggregation' not in uploaded
+
+
+@pytest.mark.parametrize('params', [{'top_n': 0}, {'top_n': 'many'}, {'top_n': 3, 'agg': 'median'}])
+def test_invalid_top_n_requests_are_rejected(client, uploaded, params):
+    response = client.get(f"/api/files/{uploaded['file_id']}",
+                          query_string=dict(params, session_id='chart-data-test', chart_type='bar'))
+    assert response.status_code == 400
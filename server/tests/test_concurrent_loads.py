@@ -0,0 +1,171 @@
+# tests/test_concurrent_loads.py
+# 2026-10-19 00:40:00 UTC
+# Concurrency of the file cache: single-flight loads, byte budget under
+# concurrent eviction, and reads racing a delete (a smaller, asserting
+# version of benchmarks/bench_concurrent_loads.py)
+
+import random
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from utils.frame_cache import FrameCache
+from utils.hybrid_storage import HybridStorageManager
+from utils.single_flight import SingleFlight
+
+THREADS = 16
+
+
+def run_threads(target, count=THREADS):
+    errors = []
+
+    def guarded(i):
+        try:
+            target(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=guarded, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+
+
+def make_csv(seed, rows=2000):
+    rng = random.Random(seed)
+    lines = ['date,region,revenue']
+    for i in range(rows):
+        lines.append(f"2024-01-{i % 28 + 1:02d},{rng.choice('NSEW')},{rng.random() * 1000:.2f}")
+    return '\n'.join(lines)
+
+
+@pytest.fixture
+def manager(database):
+    return HybridStorageManager(max_files_per_user=None, spill_dir=None)
+
+
+def test_single_flight_runs_concurrent_calls_once():
+    flight = SingleFlight()
+    calls = []
+    barrier = threading.Barrier(THREADS)
+    results = [None] * THREADS
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)  # Keep the call in flight while the others arrive
+        return object()
+
+    def worker(i):
+        barrier.wait()
+        results[i] = flight.do('key', load)
+
+    run_threads(worker)
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {'executions': 1, 'shared': THREADS - 1}
+
+
+def test_single_flight_shares_errors():
+    flight = SingleFlight()
+    barrier = threading.Barrier(THREADS)
+    failures = []
+
+    def load():
+        time.sleep(0.05)
+        raise ValueError('load failed')
+
+    def worker(i):
+        barrier.wait()
+        try:
+            flight.do('key', load)
+        except ValueError:
+            failures.append(i)
+
+    run_threads(worker)
+    assert len(failures) == THREADS
+    assert flight.stats()['executions'] == 1
+
+
+def test_concurrent_reads_of_one_file_load_it_once(manager, monkeypatch):
+    file_id = manager.store_file('user', make_csv(1), 'sales.csv')
+    manager.in_memory_files.clear()
+
+    loads = []
+    load_from_db = manager._load_from_db
+
+    def counting_load(user_id, file_id):
+        loads.append(file_id)
+        time.sleep(0.05)
+        return load_from_db(user_id, file_id)
+
+    monkeypatch.setattr(manager, '_load_from_db', counting_load)
+    barrier = threading.Barrier(THREADS)
+    frames = [None] * THREADS
+
+    def worker(i):
+        barrier.wait()
+        frames[i] = manager.get_file_df('user', file_id)
+
+    run_threads(worker)
+    assert loads == [file_id]
+    assert all(frame is frames[0] for frame in frames)
+    assert len(frames[0]) == 2000
+
+
+def test_frame_cache_stays_within_budget_under_concurrent_puts():
+    frame_bytes = pd.DataFrame({'value': np.zeros(1000)}).memory_usage(deep=True, index=True).sum()
+    cache = FrameCache(int(frame_bytes * 10.5))
+    evicted = []
+    cache.on_evict = lambda owner, key, value: evicted.append((owner, key))
+    over_budget = []
+
+    def worker(i):
+        rng = random.Random(i)
+        for n in range(200):
+            cache.put(f'user{i % 4}', f'file{rng.randrange(40)}', pd.DataFrame({'value': np.zeros(1000)}))
+            cache.get(f'user{rng.randrange(4)}', f'file{rng.randrange(40)}')
+            if cache.current_bytes > cache.max_bytes:
+                over_budget.append(cache.current_bytes)
+
+    run_threads(worker)
+    stats = cache.stats()
+    assert not over_budget
+    assert 0 < stats['current_bytes'] <= stats['max_bytes']
+    assert stats['entries'] <= 10
+    assert evicted
+
+
+def test_reads_racing_a_delete_stay_consistent(manager):
+    file_ids = [manager.store_file('user', make_csv(seed), f'file{seed}.csv') for seed in range(4)]
+    expected = {file_id: manager.get_file_df('user', file_id).copy() for file_id in file_ids}
+    deleted_id = file_ids[-1]
+    rounds = 10
+    barrier = threading.Barrier(THREADS)
+    problems = []
+
+    def worker(i):
+        rng = random.Random(i)
+        for round_number in range(rounds):
+            barrier.wait()
+            if i == 0:
+                manager.in_memory_files.clear()
+                if round_number == rounds // 2:
+                    manager.delete_file('user', deleted_id)
+            barrier.wait()
+
+            file_id = rng.choice(file_ids)
+            df = manager.get_file_df('user', file_id)
+            if file_id == deleted_id and round_number > rounds // 2:
+                if df is not None:
+                    problems.append(f'deleted file read in round {round_number}')
+            elif df is not None and not df.equals(expected[file_id]):
+                problems.append(f'{file_id} changed in round {round_number}')
+            elif df is None and file_id != deleted_id:
+                problems.append(f'{file_id} missing in round {round_number}')
+
+    run_threads(worker)
+    assert not problems, problems
+    assert manager.get_file_df('user', deleted_id) is None
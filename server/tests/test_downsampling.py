@@ -0,0 +1,97 @@
+# tests/test_downsampling.py
+# 2026-10-19 00:25:00 UTC
+# Visual fidelity of LTTB and min/max downsampling on a rasterized chart
+# (the same measure as benchmarks/bench_downsampling.py, at a smaller size)
+
+import numpy as np
+import pytest
+from utils.downsampling import lttb_indices, minmax_indices, target_points
+
+CHART_WIDTH = 1200
+CHART_HEIGHT = 500
+POINTS = 300_000
+
+# Worst vertical gap, in pixels, between the full and the reduced line in any pixel column
+MAX_PIXEL_GAP = {'lttb': 1, 'minmax': 0}
+
+
+def make_series(n, seed):
+    """Random walk with spikes, the hard case for downsampling"""
+    rng = np.random.default_rng(seed)
+    y = np.cumsum(rng.normal(size=n))
+    spikes = rng.choice(n, size=5, replace=False)
+    y[spikes] += rng.choice([-1, 1], size=len(spikes)) * 40 * y.std()
+    return np.arange(n, dtype=np.float64), y
+
+
+def column_extents(x, y, x_range, y_range):
+    """Per pixel column (low, high) pixel rows of a line through the points"""
+    cols = ((x - x_range[0]) / (x_range[1] - x_range[0]) * (CHART_WIDTH - 1)).astype(np.int64)
+    rows = (y - y_range[0]) / (y_range[1] - y_range[0]) * (CHART_HEIGHT - 1)
+
+    low = np.full(CHART_WIDTH, np.inf)
+    high = np.full(CHART_WIDTH, -np.inf)
+    np.minimum.at(low, cols, rows)
+    np.maximum.at(high, cols, rows)
+
+    # Line segments crossing between columns cover the rows in between
+    seg_low = np.minimum(rows[:-1], rows[1:])
+    seg_high = np.maximum(rows[:-1], rows[1:])
+    crosses = cols[1:] != cols[:-1]
+    np.minimum.at(low, cols[1:][crosses], seg_low[crosses])
+    np.maximum.at(high, cols[1:][crosses], seg_high[crosses])
+    return np.round(low), np.round(high)
+
+
+def dilate(extent, combine):
+    """Combine each pixel column with its neighbours"""
+    padded = np.concatenate(([extent[0]], extent, [extent[-1]]))
+    return combine(combine(padded[:-2], padded[1:-1]), padded[2:])
+
+
+def max_pixel_gap(x, y, indices):
+    """Largest vertical difference between the two drawn lines, allowing a one-column shift"""
+    x_range = (x[0], x[-1])
+    y_range = (y.min(), y.max())
+    full_low, full_high = column_extents(x, y, x_range, y_range)
+    low, high = column_extents(x[indices], y[indices], x_range, y_range)
+
+    drawn = np.isfinite(full_low) & np.isfinite(low)
+    missing = np.maximum(np.maximum(dilate(low, np.minimum) - full_low, full_high - dilate(high, np.maximum)), 0)
+    extra = np.maximum(np.maximum(dilate(full_low, np.minimum) - low, high - dilate(full_high, np.maximum)), 0)
+    return np.maximum(missing, extra)[drawn].max()
+
+
+def downsample(method, x, y, n_out):
+    return lttb_indices(x, y, n_out) if method == 'lttb' else minmax_indices(y, n_out)
+
+
+@pytest.mark.parametrize('seed', [7, 11, 23])
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_visual_fidelity(method, seed):
+    x, y = make_series(POINTS, seed)
+    n_out = target_points(chart_width=CHART_WIDTH)
+    indices = downsample(method, x, y, n_out)
+
+    assert len(indices) <= n_out + 2
+    assert np.all(np.diff(indices) > 0)
+    assert indices[0] == 0 and indices[-1] == POINTS - 1
+    assert y[indices].max() == y.max()
+    assert y[indices].min() == y.min()
+    assert max_pixel_gap(x, y, indices) <= MAX_PIXEL_GAP[method]
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_missing_values_are_not_chosen_over_real_ones(method):
+    x, y = make_series(50_000, 3)
+    y[::7] = np.nan
+    indices = downsample(method, x, y, 1000)
+    assert np.isfinite(y[indices[1:-1]]).all()
+    assert np.nanmax(y[indices]) == np.nanmax(y)
+    assert np.nanmin(y[indices]) == np.nanmin(y)
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_short_series_are_kept_whole(method):
+    x, y = make_series(100, 5)
+    assert np.array_equal(downsample(method, x, y, 2400), np.arange(100))
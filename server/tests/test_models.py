@@ -0,0 +1,68 @@
+# tests/test_models.py
+# 2026-10-19 03:00:00 UTC
+# New databases start with incremental auto-vacuum; older ones are converted by migration
+
+import sqlite3
+import models
+from config import DATABASE_PATH
+from utils.db_pool import ConnectionPool
+from utils.maintenance import MaintenanceScheduler
+
+
+def test_pool_creates_databases_with_auto_vacuum_despite_wal(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'new.db'), auto_vacuum='INCREMENTAL')
+    conn = pool.acquire()
+    try:
+        conn.execute('CREATE TABLE first (value TEXT)')
+        conn.commit()
+        assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    finally:
+        conn.close()
+        pool.close_all()
+
+
+def test_new_database_uses_incremental_auto_vacuum(database):
+    conn = models.get_session()
+    try:
+        assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == len(models.SCHEMA_MIGRATIONS)
+    finally:
+        conn.close()
+
+
+def test_migration_converts_databases_created_without_auto_vacuum(tmp_path):
+    path = str(tmp_path / 'old.db')
+    old = sqlite3.connect(path)
+    old.execute('CREATE TABLE legacy (value TEXT)')
+    old.commit()
+    old.close()
+
+    models.configure_database(path)
+    try:
+        models.init_database()
+        conn = models.get_session()
+        try:
+            assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+        finally:
+            conn.close()
+    finally:
+        models.configure_database(DATABASE_PATH)
+
+
+def test_incremental_vacuum_returns_free_pages(database):
+    conn = models.get_session()
+    try:
+        conn.execute('CREATE TABLE scratch (data BLOB)')
+        conn.executemany('INSERT INTO scratch VALUES (?)', [(b'x' * 4000,) for _ in range(200)])
+        conn.commit()
+        conn.execute('DROP TABLE scratch')
+        conn.commit()
+        freed = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    finally:
+        conn.close()
+    assert freed > 100
+
+    assert MaintenanceScheduler(interval=0, vacuum_pages=50)._incremental_vacuum() == 50
+    assert MaintenanceScheduler(interval=0, vacuum_pages=10_000)._incremental_vacuum() == freed - 50
@@ -0,0 +1,110 @@
+# tests/test_quantile_sketch.py
+# 2026-10-19 02:10:00 UTC
+# KLL sketch accuracy (single, merged), serialization, and null percentiles for empty periods
+
+import json
+import numpy as np
+import pytest
+from app import app
+from utils import quantile_sketch
+from utils.quantile_sketch import QuantileSketch, rank_error_bound, sketch_groups
+
+K = 200
+QS = np.linspace(0.01, 0.99, 99)
+
+
+@pytest.fixture(autouse=True)
+def seeded(monkeypatch):
+    # Compaction picks odd or even items at random; fix the choices so failures reproduce
+    monkeypatch.setattr(quantile_sketch, '_rng', np.random.default_rng(1234))
+
+
+def rank_errors(sorted_values, estimates, qs):
+    """|rank of each estimate - target rank| as a fraction of the count"""
+    n = len(sorted_values)
+    low = np.searchsorted(sorted_values, estimates, side='left')
+    high = np.searchsorted(sorted_values, estimates, side='right')
+    target = qs * n
+    # Any rank the estimate's value occupies counts as exact
+    return np.maximum(0, np.maximum(low - target, target - high)) / n
+
+
+def test_sketch_of_a_large_array_is_within_two_over_k():
+    values = np.random.default_rng(7).lognormal(size=1_000_000)
+    sketch = QuantileSketch.from_values(values, K)
+
+    errors = rank_errors(np.sort(values), np.array(sketch.quantiles(QS)), QS)
+    assert errors.max() <= 2 / K
+    assert sketch.count == len(values)
+    assert (sketch.min, sketch.max) == (values.min(), values.max())
+    assert sketch.nbytes < 50 * K * 8
+
+
+def test_merging_many_sketches_is_within_the_rank_error_bound():
+    rng = np.random.default_rng(11)
+    parts = [rng.normal(loc=i % 7, size=rng.integers(1, 20_000)) for i in range(300)]
+    merged = QuantileSketch(K)
+    for part in parts:
+        merged.merge(QuantileSketch.from_values(part, K))
+
+    values = np.sort(np.concatenate(parts))
+    errors = rank_errors(values, np.array(merged.quantiles(QS)), QS)
+    assert errors.max() <= rank_error_bound(K)
+    assert merged.count == len(values)
+    assert (merged.min, merged.max) == (values[0], values[-1])
+    assert merged.nbytes < 50 * K * 8
+
+
+def test_sketch_groups_matches_sketching_each_group():
+    rng = np.random.default_rng(3)
+    values = rng.normal(size=50_000)
+    values[::97] = np.nan
+    groups = rng.integers(0, 5, size=len(values))
+
+    sketches = sketch_groups(values, groups, 6)
+    assert len(sketches) == 6
+    assert sketches[5].count == 0
+    for g in range(5):
+        group = np.sort(values[(groups == g) & np.isfinite(values)])
+        assert sketches[g].count == len(group)
+        assert rank_errors(group, np.array(sketches[g].quantiles(QS)), QS).max() <= 2 / K
+
+
+@pytest.mark.parametrize('values', [np.arange(100_000, dtype=float), np.arange(50, dtype=float), np.array([])])
+def test_bytes_round_trip(values):
+    sketch = QuantileSketch.from_values(values, K)
+    restored = QuantileSketch.from_bytes(sketch.to_bytes())
+
+    assert (restored.k, restored.count) == (sketch.k, sketch.count)
+    assert restored.quantiles(QS) == sketch.quantiles(QS)
+    assert [level.tolist() for level in restored.levels] == [level.tolist() for level in sketch.levels]
+    if len(values):
+        assert (restored.min, restored.max) == (sketch.min, sketch.max)
+    else:
+        assert restored.quantiles([0.5]) == [None]
+
+
+def test_empty_periods_report_null_percentiles(database):
+    client = app.test_client()
+    # units has no values in Q2 2024
+    csv = '\n'.join(['date,revenue,units'] + [f'2024-01-{d:02d},{d},{d}' for d in range(1, 29)]
+                    + [f'2024-04-{d:02d},{d},' for d in range(1, 29)])
+    upload = client.post('/process-file', json={'filename': 'q.csv', 'content': csv, 'session_id': 'sketch-test'})
+    file_id = upload.get_json()['file_id']
+
+    response = client.post('/api/quarterly-stats', json={'fileId': file_id, 'sessionId': 'sketch-test',
+                                                          'dateColumn': 'date', 'year': 2024, 'quarter': 2})
+    assert response.status_code == 200
+    # Strict JSON: NaN would make this raise
+    body = json.loads(response.get_data(as_text=True), parse_constant=pytest.fail)
+    units = body['numericColumns']['units']
+    assert units['median'] is None and units['p90'] is None
+    assert units['average'] is None
+    assert body['numericColumns']['revenue']['median'] == pytest.approx(14.5, abs=1)
+
+    response = client.post('/api/quarterly-percentiles', json={'fileId': file_id, 'sessionId': 'sketch-test',
+                                                               'quarters': [{'year': 2024, 'quarter': 2}]})
+    body = json.loads(response.get_data(as_text=True), parse_constant=pytest.fail)
+    assert body['percentiles']['units'] == {'median': None, 'p90': None, 'p99': None}
+    assert body['counts']['units'] == 0
+    assert body['rankError'] == rank_error_bound()
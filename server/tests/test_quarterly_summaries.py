@@ -0,0 +1,91 @@
+# tests/test_quarterly_summaries.py
+# 2026-10-19 00:50:00 UTC
+# Quarterly summaries stored at upload
+
+import numpy as np
+import pandas as pd
+import pytest
+from models import get_session
+from utils.hybrid_storage import HybridStorageManager
+from utils.quarterly_summaries import TOTALS_PERIOD
+
+
+@pytest.fixture
+def manager(database):
+    return HybridStorageManager(spill_dir=None)
+
+
+def sales_csv():
+    rng = np.random.default_rng(5)
+    dates = pd.date_range('2023-11-01', '2024-09-30', freq='D')
+    revenue = rng.normal(100, 25, len(dates)).round(2)
+    units = rng.integers(0, 50, len(dates)).astype(float)
+    units[::9] = np.nan
+    df = pd.DataFrame({'date': dates.strftime('%Y-%m-%d'), 'revenue': revenue, 'units': units})
+    return df, df.to_csv(index=False)
+
+
+def summary_rows(file_id):
+    conn = get_session()
+    try:
+        return [conn.execute(f'SELECT COUNT(*) FROM {table} WHERE file_id = ?', (file_id,)).fetchone()[0]
+                for table in ('quarterly_summaries', 'quarterly_sketches')]
+    finally:
+        conn.close()
+
+
+def test_stored_statistics_match_the_frame(manager):
+    df, csv = sales_csv()
+    file_id = manager.store_file('user', csv, 'sales.csv')
+    dates = pd.to_datetime(df['date'])
+
+    periods = [(int(year), int(quarter)) for year, quarter in
+               sorted(set(zip(dates.dt.year, dates.dt.quarter)))]
+    assert manager.get_available_quarters('user', file_id, 'date') == periods
+
+    for period in periods + [TOTALS_PERIOD]:
+        rows = df if period == TOTALS_PERIOD else df[(dates.dt.year == period[0]) & (dates.dt.quarter == period[1])]
+        count, summary = manager.get_quarter_summary('user', file_id, 'date', *period)
+        assert count == len(rows)
+        assert set(summary) == {'revenue', 'units'}
+        for col, stats in summary.items():
+            assert stats['sum'] == pytest.approx(rows[col].sum())
+            assert stats['average'] == pytest.approx(rows[col].mean())
+            assert stats['min'] == rows[col].min()
+            assert stats['max'] == rows[col].max()
+
+
+def test_quarter_without_rows_has_empty_statistics(manager):
+    _, csv = sales_csv()
+    file_id = manager.store_file('user', csv, 'sales.csv')
+
+    count, summary = manager.get_quarter_summary('user', file_id, 'date', 2020, 1)
+    assert count == 0
+    assert summary['revenue']['sum'] == 0.0
+    assert np.isnan(summary['revenue']['average'])
+
+
+def test_deleting_a_file_removes_its_summaries(manager):
+    df, csv = sales_csv()
+    first = manager.store_file('user', csv, 'sales.csv')
+    # Same content again: the summaries are copied for the second file
+    second = manager.store_file('user', csv, 'sales-copy.csv')
+    assert all(summary_rows(first)) and summary_rows(second) == summary_rows(first)
+
+    manager.delete_file('user', first)
+    assert summary_rows(first) == [0, 0]
+    assert manager.get_quarter_summary('user', first, 'date', *TOTALS_PERIOD) is None
+
+    # The other file with the same content keeps its own
+    assert all(summary_rows(second))
+    assert manager.get_quarter_summary('user', second, 'date', *TOTALS_PERIOD)[0] == len(df)
+
+
+def test_upload_with_dates_and_no_numeric_columns(manager):
+    csv = 'date,region\n2024-01-15,N\n2024-05-01,S\n2024-05-20,E\n'
+    file_id = manager.store_file('user', csv, 'regions.csv')
+
+    assert manager.get_available_quarters('user', file_id, 'date') == [(2024, 1), (2024, 2)]
+    count, summary = manager.get_quarter_summary('user', file_id, 'date', 2024, 2)
+    assert count == 2 and summary == {}
+    assert manager.get_quarter_summary('user', file_id, 'date', *TOTALS_PERIOD)[0] == 3
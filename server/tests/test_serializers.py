@@ -0,0 +1,73 @@
+# tests/test_serializers.py
+# 2026-10-18 23:30:00 UTC
+# JSON response encodings must be strict JSON with or without orjson
+
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from flask import request
+from app import app
+from utils import serializers
+
+
+def _strict_loads(body):
+    def reject(constant):
+        raise ValueError(f'Invalid JSON constant {constant}')
+    return json.loads(body, parse_constant=reject)
+
+
+@pytest.fixture(params=[True, False], ids=['orjson', 'stdlib'])
+def json_encoder(request, monkeypatch):
+    if request.param and not serializers.HAS_ORJSON:
+        pytest.skip('orjson is not installed')
+    monkeypatch.setattr(serializers, 'HAS_ORJSON', request.param)
+
+
+@pytest.fixture
+def frame_with_missing_values():
+    return pd.DataFrame({
+        'value': [1.5, np.nan],
+        'label': pd.Series(['a', None], dtype='str'),
+        'mixed': pd.Series([1, None], dtype=object),
+        'when': pd.to_datetime(['2024-01-01', None]),
+        'count': pd.array([3, None], dtype='Int64')
+    })
+
+
+def test_records_encode_missing_values_as_null(json_encoder, frame_with_missing_values):
+    body, mimetype = serializers.encode_frame_payload(frame_with_missing_values, {'fileId': 'f'},
+                                                      serializers.FORMAT_RECORDS)
+    data = _strict_loads(body)['data']
+    assert mimetype == 'application/json'
+    assert data[0] == {'value': 1.5, 'label': 'a', 'mixed': 1, 'when': '2024-01-01T00:00:00', 'count': 3}
+    assert data[1] == {'value': None, 'label': None, 'mixed': None, 'when': None, 'count': None}
+
+
+def test_columns_encode_missing_values_as_null(json_encoder, frame_with_missing_values):
+    body, _ = serializers.encode_frame_payload(frame_with_missing_values, {}, serializers.FORMAT_COLUMNS)
+    data = _strict_loads(body)['data']
+    assert data['label'] == ['a', None]
+    assert data['mixed'] == [1, None]
+    assert data['when'] == ['2024-01-01T00:00:00', None]
+    assert data['count'] == [3, None]
+    assert data['value']['dtype'] == 'f8'
+
+
+@pytest.mark.parametrize('accept, expected', [
+    (None, serializers.FORMAT_RECORDS),
+    ('*/*', serializers.FORMAT_RECORDS),
+    ('text/plain', serializers.FORMAT_RECORDS),
+    ('text/html,application/xhtml+xml', serializers.FORMAT_RECORDS),
+    ('application/vnd.getcharty.columns+json', serializers.FORMAT_COLUMNS)
+])
+def test_accept_header_falls_back_to_records(accept, expected):
+    headers = {'Accept': accept} if accept else {}
+    with app.test_request_context('/', headers=headers):
+        assert serializers.negotiate_format(request) == expected
+
+
+def test_explicit_unsupported_format_is_rejected():
+    with app.test_request_context('/', query_string={'format': 'xml'}, headers={'Accept': 'text/plain'}):
+        with pytest.raises(serializers.UnsupportedFormat):
+            serializers.negotiate_format(request)
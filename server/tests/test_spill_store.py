@@ -0,0 +1,47 @@
+# tests/test_spill_store.py
+# 2026-10-18 23:55:00 UTC
+# Evicting a frame the spill tier can't write must not fail the request that evicted it
+
+import os
+import pandas as pd
+import pytest
+from utils.hybrid_storage import HybridStorageManager
+
+
+@pytest.fixture
+def manager(database, tmp_path):
+    return HybridStorageManager(max_files_per_user=1, spill_dir=str(tmp_path / 'spill'))
+
+
+def _store(manager, name, df):
+    return manager.store_upload('user', f'{name}.csv', f'hash-{name}', 100, lambda: df)
+
+
+def test_evicting_an_unspillable_frame_keeps_serving(manager, tmp_path):
+    # tz-aware datetimes only convert to object arrays, which np.save refuses without pickling
+    unspillable = pd.DataFrame({
+        'when': pd.date_range('2024-01-01', periods=3, tz='UTC'),
+        'label': pd.Series(['a', 1, None], dtype=object),
+        'value': [1.0, 2.0, 3.0]
+    })
+    first = _store(manager, 'first', unspillable)
+
+    # Storing a second file evicts the first (one file per user)
+    second = _store(manager, 'second', pd.DataFrame({'value': [4.0, 5.0]}))
+    assert not manager.spilled_files.contains('user', first)
+    assert manager.get_file_df('user', second) is not None
+
+    reloaded = manager.get_file_df('user', first)
+    assert reloaded['when'].tolist() == unspillable['when'].tolist()
+    assert reloaded['value'].tolist() == [1.0, 2.0, 3.0]
+
+    # The failed spill leaves no temporary directory behind
+    owner_dir = tmp_path / 'spill' / 'user'
+    leftovers = os.listdir(owner_dir) if owner_dir.exists() else []
+    assert not [entry for entry in leftovers if entry.startswith('.tmp-')]
+
+
+def test_numeric_frames_are_spilled(manager):
+    first = _store(manager, 'first', pd.DataFrame({'value': [1.0, 2.0]}))
+    _store(manager, 'second', pd.DataFrame({'value': [3.0]}))
+    assert manager.spilled_files.contains('user', first)
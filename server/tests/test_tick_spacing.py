@@ -0,0 +1,29 @@
+# tests/test_tick_spacing.py
+# 2026-10-19 00:10:00 UTC
+# Golden outputs: the vectorized tick engine must match the apply_*_spacing
+# functions it replaced (see golden/generate_tick_spacing.py)
+
+import json
+import os
+import pytest
+from utils.date_parsing import parse_date_labels
+from utils.tick_spacing import time_spacing
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden', 'tick_spacing.json')
+
+with open(GOLDEN_PATH) as f:
+    GOLDEN = json.load(f)
+
+
+def test_golden_cases_cover_every_interval():
+    assert {case['interval_type'] for case in GOLDEN} == {'hour', 'day', 'week', 'month', 'quarter', 'year', 'other'}
+    for suffix in ('shuffled', 'header-row', 'nat', 'duplicates'):
+        assert sum(case['name'].endswith(suffix) for case in GOLDEN) == 6
+
+
+@pytest.mark.parametrize('case', GOLDEN, ids=[case['name'] for case in GOLDEN])
+def test_matches_golden_xaxis_config(case):
+    labels = case['x_labels']
+    config = time_spacing(parse_date_labels(labels), labels, case['interval_type'])
+    # Round-trip through JSON like the /api/auto-spacing response does
+    assert json.loads(json.dumps(config, default=int)) == case['xaxis_config']
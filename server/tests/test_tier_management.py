@@ -0,0 +1,83 @@
+# tests/test_tier_management.py
+# 2026-10-18 23:40:00 UTC
+# Tier config accessors return JSON-serializable copies; hot reload keeps the last valid config
+
+import json
+import os
+import shutil
+import pytest
+from flask import Flask, jsonify
+import tier_management
+from tier_management import TierManager
+
+TIERS_JSON = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                          'config', 'tiers.json')
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / 'tiers.json'
+    shutil.copy(TIERS_JSON, path)
+    return str(path)
+
+
+@pytest.fixture
+def manager(config_path, monkeypatch):
+    manager = TierManager(config_path)
+    monkeypatch.setattr(tier_management, 'tier_manager', manager)
+    return manager
+
+
+def test_accessors_are_jsonifiable(manager):
+    app = Flask(__name__)
+    values = {
+        'tier_config': manager.tier_config,
+        'get_tier_config': manager.get_tier_config('noob'),
+        'get_upgrade_info': manager.get_upgrade_info('noob'),
+        'get_tier_features': tier_management.get_tier_features('viper'),
+        'get_feature_value': manager.get_feature_value('noob', 'watermarkPosition'),
+        'is_feature_available': manager.is_feature_available('registered', 'autoSpacing'),
+        'get_max_file_size_mb': manager.get_max_file_size_mb('viper')
+    }
+    with app.app_context():
+        for name, value in values.items():
+            decoded = jsonify(value).get_json()
+            assert decoded == value, name
+
+    assert values['get_tier_config']['features']['watermark'] is True
+    assert values['get_upgrade_info']['requirements'] == ['email_verification']
+    assert values['get_tier_features']['customBranding'] is True
+
+
+def test_accessor_copies_do_not_change_the_config(manager):
+    manager.get_tier_config('noob')['features']['autoSpacing'] = True
+    manager.tier_config['tiers']['noob']['limits']['fileSizeMB'] = 100
+    assert manager.is_feature_available('noob', 'autoSpacing') is False
+    assert manager.get_max_file_size_mb('noob') == 5
+
+
+def _write(path, config):
+    with open(path, 'w') as f:
+        json.dump(config, f)
+    # Make sure the (mtime, size) version changes even on coarse clocks
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000_000))
+
+
+def test_reload_picks_up_changes_and_rejects_invalid_configs(manager, config_path):
+    with open(config_path) as f:
+        config = json.load(f)
+
+    config['tiers']['noob']['features']['autoSpacing'] = True
+    _write(config_path, config)
+    assert manager.reload_config()
+    assert manager.is_feature_available('noob', 'autoSpacing') is True
+
+    config['tiers']['noob']['limits']['monthlyCharts'] = 'ten'
+    _write(config_path, config)
+    assert not manager.reload_config()
+    assert manager.get_tier_config('noob')['limits']['monthlyCharts'] == 10
+
+    with open(config_path, 'w') as f:
+        f.write('{not json')
+    assert not manager.reload_config(force=True)
+    assert manager.is_feature_available('noob', 'autoSpacing') is True
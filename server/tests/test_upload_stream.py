@@ -0,0 +1,109 @@
+# tests/test_upload_stream.py
+# 2026-10-19 02:40:00 UTC
+# Multipart uploads are spooled as they arrive and stopped at the tier limit, with or without Content-Length
+
+import hashlib
+import io
+import pytest
+from app import app
+from utils.upload_stream import MULTIPART_OVERHEAD_BYTES, UploadTooLarge, spool_multipart
+
+BOUNDARY = 'test-boundary'
+
+
+class CountingStream(io.BytesIO):
+    """Request body that records how much of it was read"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+    def readline(self, size=-1):
+        line = super().readline(size)
+        self.bytes_read += len(line)
+        return line
+
+
+def multipart_body(parts):
+    """parts: [(field, filename or None, bytes)]"""
+    body = b''
+    for field, filename, content in parts:
+        disposition = f'form-data; name="{field}"' + (f'; filename="{filename}"' if filename else '')
+        body += (f'--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n'
+                 f'Content-Type: text/csv\r\n\r\n').encode() + content + b'\r\n'
+    return body + f'--{BOUNDARY}--\r\n'.encode()
+
+
+def chunked_environ(body):
+    """A chunked request as the WSGI server presents it: no CONTENT_LENGTH, input terminated"""
+    return {
+        'REQUEST_METHOD': 'POST',
+        'CONTENT_TYPE': f'multipart/form-data; boundary={BOUNDARY}',
+        'wsgi.input': CountingStream(body),
+        'wsgi.input_terminated': True
+    }
+
+
+def test_file_part_is_spooled_with_its_hash():
+    content = b'date,revenue\n' + b'2024-01-01,1\n' * 1000
+    environ = chunked_environ(multipart_body([('note', None, b'hello'), ('file', 'sales.csv', content)]))
+
+    spool, size, content_hash, filename = spool_multipart(environ, 'file', max_bytes=len(content))
+    with spool:
+        assert spool.read() == content
+    assert size == len(content)
+    assert content_hash == hashlib.blake2b(content, digest_size=32).hexdigest()
+    assert filename == 'sales.csv'
+
+
+def test_missing_file_part_returns_none():
+    environ = chunked_environ(multipart_body([('other', 'x.csv', b'a,b\n1,2\n')]))
+    assert spool_multipart(environ, 'file', max_bytes=1024) is None
+
+
+def test_oversized_chunked_file_is_rejected_before_the_body_is_read():
+    max_bytes = 64 * 1024
+    body = multipart_body([('file', 'big.csv', b'x' * (50 * max_bytes))])
+    environ = chunked_environ(body)
+
+    with pytest.raises(UploadTooLarge):
+        spool_multipart(environ, 'file', max_bytes)
+    assert environ['wsgi.input'].bytes_read < len(body) / 4
+
+
+def test_oversized_chunked_body_without_a_file_is_rejected():
+    max_bytes = 1024
+    body = multipart_body([('note', None, b'y' * (max_bytes + 2 * MULTIPART_OVERHEAD_BYTES))])
+    with pytest.raises(UploadTooLarge):
+        spool_multipart(chunked_environ(body), 'file', max_bytes)
+
+
+def test_upload_endpoint_accepts_multipart(database):
+    client = app.test_client()
+    content = b'region,revenue\nnorth,1\nsouth,2\n'
+    response = client.post('/process-file/upload', query_string={'session_id': 'upload-test'},
+                           data={'file': (io.BytesIO(content), 'regions.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['processing_info']['filename'] == 'regions.csv'
+    assert body['data'] == [{'region': 'north', 'revenue': 1}, {'region': 'south', 'revenue': 2}]
+
+
+def test_upload_endpoint_rejects_an_oversized_chunked_multipart_body(database):
+    client = app.test_client()
+    body = multipart_body([('file', 'big.csv', b'a,b\n' + b'1,2\n' * (4 * 1024 * 1024))])
+    stream = CountingStream(body)
+    response = client.post('/process-file/upload', query_string={'session_id': 'upload-test'},
+                           input_stream=stream,
+                           headers={'Content-Type': f'multipart/form-data; boundary={BOUNDARY}',
+                                    'Transfer-Encoding': 'chunked'},
+                           environ_overrides={'wsgi.input_terminated': True})
+    assert response.status_code == 413
+    # Rejected at the limit rather than after buffering the whole body
+    assert stream.bytes_read < len(body) / 2
@@ -5,29 +5,115 @@ Tier management and validation for GetCharty server
 """
 
 import json
+import signal
+import threading
 import time
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List
 import hashlib
 import ipaddress
+from config import USAGE_WINDOW_DAYS, USAGE_WINDOW_BUCKETS, TIER_CONFIG_RELOAD_SECONDS
+from utils.usage_store import create_usage_counter
+from utils.tier_config import CompiledTierConfig, compile_tier_config, file_version, load_tier_config, thaw
 
 class TierManager:
     """Manages user tiers and feature access"""
     
     def __init__(self, config_path: str = "config/tiers.json"):
         self.config_path = config_path
-        self.tier_config = self._load_tier_config()
-        self.user_sessions = {}  # In-memory session storage
-        self.ip_usage = {}       # IP-based usage tracking
+        # Replaced wholesale on reload, so readers use it without locking
+        self._compiled = self._load_tier_config()
+        self._reload_lock = threading.Lock()
+        self._reload_requested = threading.Event()
+        self._stop_watching = threading.Event()
+        self._rejected_version = None
+        self._watcher = None
+        # Charts generated per IP, and actions per session, over the last USAGE_WINDOW_DAYS
+        window_seconds = USAGE_WINDOW_DAYS * 24 * 60 * 60
+        self.chart_usage = create_usage_counter("charts", window_seconds, USAGE_WINDOW_BUCKETS)
+        self.session_usage = create_usage_counter("session_actions", window_seconds, USAGE_WINDOW_BUCKETS)
         
-    def _load_tier_config(self) -> Dict:
+    def _load_tier_config(self) -> CompiledTierConfig:
         """Load tier configuration from JSON file"""
         try:
-            with open(self.config_path, 'r') as f:
-                return json.load(f)
+            return load_tier_config(self.config_path)
         except FileNotFoundError:
             # Return default configuration if file not found
-            return self._get_default_config()
+            return compile_tier_config(self._get_default_config())
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Invalid tier config {self.config_path}, using defaults: {e}")
+            return compile_tier_config(self._get_default_config())
+    
+    @property
+    def tier_config(self) -> Dict:
+        """A copy of the current configuration as loaded"""
+        return thaw(self._compiled.source)
+    
+    def reload_config(self, force: bool = False) -> bool:
+        """
+        Recompile the config file if it changed since the last load (or
+        always with force) and swap it in. An invalid file is rejected and
+        the current config kept. Returns whether a new config was installed.
+        """
+        with self._reload_lock:
+            version = file_version(self.config_path)
+            if version is None:
+                return False
+            if not force and version in (self._compiled.version, self._rejected_version):
+                return False
+            
+            try:
+                compiled = load_tier_config(self.config_path)
+            except (OSError, ValueError) as e:
+                # Warn once per bad version of the file
+                if version != self._rejected_version:
+                    print(f"⚠️  Rejected tier config {self.config_path}, keeping the previous one: {e}")
+                self._rejected_version = version
+                return False
+            
+            self._compiled = compiled
+            self._rejected_version = None
+            print(f"🔄 Tier config reloaded from {self.config_path}")
+            return True
+    
+    def watch_config(self, interval: Optional[float] = TIER_CONFIG_RELOAD_SECONDS,
+                     install_signal_handler: bool = False):
+        """
+        Reload the config when the file changes (checked every interval
+        seconds) and, with install_signal_handler, on SIGHUP. The handler
+        replaces any existing SIGHUP handler of the process, so it is off by
+        default.
+        """
+        if self._watcher is not None:
+            return
+        
+        # Signal handlers can only be installed from the main thread
+        if (install_signal_handler and hasattr(signal, "SIGHUP")
+                and threading.current_thread() is threading.main_thread()):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self._reload_requested.set())
+        
+        def watch():
+            while not self._stop_watching.is_set():
+                requested = self._reload_requested.wait(interval)
+                self._reload_requested.clear()
+                if self._stop_watching.is_set():
+                    break
+                try:
+                    self.reload_config(force=requested)
+                except Exception as e:
+                    print(f"⚠️  Tier config reload failed: {e}")
+        
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=watch, name="tier-config-watcher", daemon=True)
+        self._watcher.start()
+    
+    def stop_watching(self):
+        """Stop the config watcher thread"""
+        self._stop_watching.set()
+        self._reload_requested.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
     
     def _get_default_config(self) -> Dict:
         """Return default tier configuration"""
@@ -117,119 +203,73 @@ class TierManager:
     
     def _check_ip_usage_limits(self, ip_address: str) -> bool:
         """Check if IP address has exceeded usage limits"""
-        current_time = time.time()
-        current_month = datetime.now().strftime("%Y-%m")
-        
-        # Clean up old usage data
-        self._cleanup_old_usage()
-        
-        # Get usage for current month
-        usage_key = f"{ip_address}:{current_month}"
-        usage = self.ip_usage.get(usage_key, {"charts": 0, "last_used": 0})
-        
-        # Check if within limits (10 charts per month for noob tier)
-        return usage["charts"] < 10
-    
-    def _cleanup_old_usage(self):
-        """Clean up usage data older than 3 months"""
-        current_time = time.time()
-        cutoff_time = current_time - (90 * 24 * 60 * 60)  # 90 days
-        
-        keys_to_remove = []
-        for key, usage in self.ip_usage.items():
-            if usage["last_used"] < cutoff_time:
-                keys_to_remove.append(key)
-        
-        for key in keys_to_remove:
-            del self.ip_usage[key]
+        return self.check_usage_limit("noob", ip_address, "generate_chart")
     
     def track_usage(self, session_id: str, ip_address: str, action: str):
         """Track user usage for tier enforcement"""
-        current_time = time.time()
-        current_month = datetime.now().strftime("%Y-%m")
-        
         # Track IP-based usage
-        usage_key = f"{ip_address}:{current_month}"
-        if usage_key not in self.ip_usage:
-            self.ip_usage[usage_key] = {"charts": 0, "last_used": current_time}
-        
         if action == "generate_chart":
-            self.ip_usage[usage_key]["charts"] += 1
-            self.ip_usage[usage_key]["last_used"] = current_time
+            self.chart_usage.add(ip_address)
         
         # Track session usage
-        if session_id not in self.user_sessions:
-            self.user_sessions[session_id] = {
-                "ip_address": ip_address,
-                "created": current_time,
-                "last_used": current_time,
-                "actions": []
-            }
-        
-        self.user_sessions[session_id]["last_used"] = current_time
-        self.user_sessions[session_id]["actions"].append({
-            "action": action,
-            "timestamp": current_time
-        })
+        self.session_usage.add(f"{session_id}:{action}")
+    
+    def get_session_usage(self, session_id: str, action: str) -> int:
+        """Get how many times a session performed an action within the usage window"""
+        return self.session_usage.count(f"{session_id}:{action}")
     
     def get_tier_config(self, tier: str) -> Dict:
         """Get configuration for a specific tier"""
-        return self.tier_config["tiers"].get(tier, {})
+        record = self._compiled.tiers.get(tier)
+        return thaw(record.config) if record is not None else {}
     
     def is_feature_available(self, tier: str, feature: str) -> bool:
         """Check if a feature is available for a tier"""
-        tier_config = self.get_tier_config(tier)
-        return tier_config.get("features", {}).get(feature, False)
+        return self._compiled.features.get((tier, feature), False)
     
     def get_feature_value(self, tier: str, feature: str):
         """Get the value of a feature for a tier"""
-        tier_config = self.get_tier_config(tier)
-        return tier_config.get("features", {}).get(feature)
+        return self._compiled.features.get((tier, feature))
     
     def check_usage_limit(self, tier: str, ip_address: str, action: str) -> bool:
         """Check if user has exceeded usage limits"""
-        tier_config = self.get_tier_config(tier)
-        limits = tier_config.get("limits", {})
-        
         if action == "generate_chart":
-            monthly_limit = limits.get("monthlyCharts", -1)
+            record = self._compiled.tiers.get(tier)
+            monthly_limit = record.monthly_charts if record is not None else -1
             if monthly_limit == -1:  # Unlimited
                 return True
             
-            current_month = datetime.now().strftime("%Y-%m")
-            usage_key = f"{ip_address}:{current_month}"
-            current_usage = self.ip_usage.get(usage_key, {"charts": 0})
-            
-            return current_usage["charts"] < monthly_limit
+            return self.chart_usage.count(ip_address) < monthly_limit
         
         return True
     
     def get_usage_stats(self, ip_address: str) -> Dict:
         """Get usage statistics for an IP address"""
-        current_month = datetime.now().strftime("%Y-%m")
-        usage_key = f"{ip_address}:{current_month}"
-        usage = self.ip_usage.get(usage_key, {"charts": 0, "last_used": 0})
+        charts, last_used = self.chart_usage.get(ip_address)
         
         return {
-            "current_month": current_month,
-            "charts_generated": usage["charts"],
-            "last_used": datetime.fromtimestamp(usage["last_used"]).isoformat() if usage["last_used"] > 0 else None
+            "window_days": USAGE_WINDOW_DAYS,
+            "charts_generated": charts,
+            "last_used": datetime.fromtimestamp(last_used).isoformat() if last_used else None
         }
     
+    def get_max_file_size_mb(self, tier: str) -> float:
+        """Get the upload size limit for a tier in MB"""
+        record = self._compiled.tiers.get(tier)
+        return record.file_size_mb if record is not None else 5
+    
     def validate_file_size(self, tier: str, file_size_mb: float) -> bool:
         """Validate if file size is within tier limits"""
-        tier_config = self.get_tier_config(tier)
-        max_size = tier_config.get("limits", {}).get("fileSizeMB", 5)
-        return file_size_mb <= max_size
+        return file_size_mb <= self.get_max_file_size_mb(tier)
     
     def get_upgrade_info(self, current_tier: str) -> Dict:
         """Get upgrade information for current tier"""
-        upgrades = self.tier_config.get("upgrades", {})
+        upgrades = self._compiled.source.get("upgrades", {})
         
         if current_tier == "noob":
-            return upgrades.get("noob_to_registered", {})
+            return thaw(upgrades.get("noob_to_registered", {}))
         elif current_tier == "registered":
-            return upgrades.get("registered_to_viper", {})
+            return thaw(upgrades.get("registered_to_viper", {}))
         
         return {}
 
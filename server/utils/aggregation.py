@@ -0,0 +1,132 @@
+# utils/aggregation.py
+# 2026-10-18 18:20:00 UTC
+# Top-N category aggregation with an "Other" bucket for bar and pie charts
+
+import pandas as pd
+from config import TOP_N_DEFAULT, TOP_N_MAX
+
+AGG_SUM = 'sum'
+AGG_COUNT = 'count'
+AGG_MEAN = 'mean'
+
+AGG_ALIASES = {'avg': AGG_MEAN, 'average': AGG_MEAN, 'total': AGG_SUM}
+AGGREGATIONS = (AGG_SUM, AGG_COUNT, AGG_MEAN)
+
+OTHER_LABEL = 'Other'
+
+# Chart types whose categories /process-file and /api/files can fold into "Other"
+TOP_N_CHART_TYPES = {'bar', 'pie'}
+
+
+class InvalidAggregationRequest(ValueError):
+    """Raised for an unsupported aggregation or a top N outside 1..TOP_N_MAX"""
+
+
+def normalize_agg(agg):
+    """Canonical aggregation name, or None if it isn't supported"""
+    agg = (agg or AGG_SUM).lower()
+    agg = AGG_ALIASES.get(agg, agg)
+    return agg if agg in AGGREGATIONS else None
+
+
+def parse_agg(agg):
+    """Canonical aggregation name; raises InvalidAggregationRequest if it isn't supported"""
+    normalized = normalize_agg(agg)
+    if normalized is None:
+        raise InvalidAggregationRequest(f"Unsupported aggregation '{agg}', use one of: {', '.join(AGGREGATIONS)}")
+    return normalized
+
+
+def parse_top_n(value, default=None):
+    """
+    Number of categories to keep, or `default` when the request doesn't set
+    one (None turns top-N off). Raises InvalidAggregationRequest unless it is
+    a whole number from 1 to TOP_N_MAX.
+    """
+    if value in (None, ''):
+        return default
+    try:
+        top_n = int(value)
+    except (TypeError, ValueError):
+        top_n = 0
+    if not 1 <= top_n <= TOP_N_MAX:
+        raise InvalidAggregationRequest(f'topN must be a whole number from 1 to {TOP_N_MAX}')
+    return top_n
+
+
+def to_numeric(series):
+    """Numbers from a column, stripping currency symbols, thousands separators and % signs"""
+    if series.dtype.kind in 'biuf':
+        return series.astype(float)
+    text = series.astype(str).str.replace(r'[$,%\s]', '', regex=True)
+    return pd.to_numeric(text, errors='coerce')
+
+
+def top_n_with_other(df, x_column, y_column, agg, n):
+    """
+    Aggregate y per x category, keep the n largest categories and fold the
+    rest into an "Other" bucket.
+
+    y_column may be None for agg='count' (rows per category). Null
+    categories are ignored. Returns a dict with 'x' and 'y' lists (largest
+    first, "Other" last), the number of distinct categories and how many of
+    them were folded into "Other".
+    """
+    categories = df[x_column]
+
+    if y_column is None:
+        counts = categories.value_counts(sort=False)
+        sums = counts.astype(float)
+    else:
+        values = to_numeric(df[y_column])
+        grouped = values.groupby(categories, sort=False, observed=True)
+        sums = grouped.sum()
+        counts = grouped.count()
+
+    if agg == AGG_COUNT:
+        ranked = counts.astype(float)
+    elif agg == AGG_MEAN:
+        ranked = sums / counts.where(counts > 0)
+    else:
+        ranked = sums
+
+    ranked = ranked.dropna()
+    top = ranked.nlargest(n) if len(ranked) > n else ranked.sort_values(ascending=False)
+    labels = [str(label) for label in top.index]
+    totals = top.tolist()
+
+    rest = ranked.index.difference(top.index, sort=False)
+    if len(rest) > 0:
+        if agg == AGG_COUNT:
+            other = float(counts[rest].sum())
+        elif agg == AGG_MEAN:
+            other = float(sums[rest].sum() / counts[rest].sum())
+        else:
+            other = float(sums[rest].sum())
+        # A real category may already be called "Other"
+        labels.append(OTHER_LABEL if OTHER_LABEL not in labels else f'{OTHER_LABEL} ({len(rest)} more)')
+        totals.append(other)
+
+    return {
+        'x': labels,
+        'y': [float(value) for value in totals],
+        'totalCategories': int(len(ranked)),
+        'otherCategories': int(len(rest))
+    }
+
+
+def top_n_frame(df, x_column, y_column, agg, n=TOP_N_DEFAULT):
+    """
+    top_n_with_other as a two-column frame (x categories, aggregated y) so it
+    can be encoded like any other chart data. The y column keeps its name, or
+    is called 'count' when counting rows. Returns (frame, aggregation_info).
+    """
+    result = top_n_with_other(df, x_column, y_column, agg, n)
+    frame = pd.DataFrame({x_column: result['x'], y_column or AGG_COUNT: result['y']})
+    info = {
+        'agg': agg,
+        'topN': n,
+        'totalCategories': result['totalCategories'],
+        'otherCategories': result['otherCategories']
+    }
+    return frame, info
@@ -1,24 +1,236 @@
 # utils/cache_manager.py
 # 4. Cache Management for Filtered Data
-import redis
+
+import hashlib
 import json
+import os
+import struct
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import pandas as pd
+from config import (DATA_CACHE_BACKEND, DATA_CACHE_TTL_SECONDS, DATA_CACHE_MAX_ENTRIES, DATA_CACHE_DIR,
+                    DATA_CACHE_REDIS_URL)
+from utils.columnar import encode_frame, decode_frame
+from utils.single_flight import SingleFlight
+
+# Bump when the serialized layout changes so old entries are never decoded
+CACHE_SCHEMA_VERSION = 1
+
+_TAG_JSON = b'J'
+_TAG_FRAME = b'F'
+_HEADER = struct.Struct('>I')
+
+
+def cache_key(namespace, file_version, params):
+    """
+    Key that is identical in every process: SHA-256 of canonical JSON of the
+    file version and request parameters (Python's hash() is salted per process)
+    """
+    canonical = json.dumps({'schema': CACHE_SCHEMA_VERSION, 'version': file_version, 'params': params},
+                           sort_keys=True, separators=(',', ':'), default=str)
+    return f"{namespace}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+def serialize(value):
+    """DataFrames use the columnar storage encoding; anything else must be JSON-serializable"""
+    if isinstance(value, pd.DataFrame):
+        data, data_format, dtypes_json = encode_frame(value)
+        header = json.dumps({'format': data_format, 'dtypes': dtypes_json}).encode('utf-8')
+        return _TAG_FRAME + _HEADER.pack(len(header)) + header + data
+    return _TAG_JSON + json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def deserialize(payload):
+    tag, body = payload[:1], payload[1:]
+    if tag == _TAG_FRAME:
+        (header_size,) = _HEADER.unpack_from(body)
+        header = json.loads(body[_HEADER.size:_HEADER.size + header_size])
+        return decode_frame(body[_HEADER.size + header_size:], header['format'], header['dtypes'])
+    if tag == _TAG_JSON:
+        return json.loads(body)
+    raise ValueError(f'Unknown cache payload tag {tag!r}')
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries=DATA_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # {key: (expires_at, payload)} in LRU -> MRU order
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, payload, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class DiskBackend:
+    """
+    One file per entry under <directory>/<namespace>/<digest[:2]>/, so several
+    workers on one host share entries. Each file starts with its expiry time
+    as a Unix timestamp; expired files are removed when read.
+    """
+
+    _EXPIRY = struct.Struct('>d')
+
+    def __init__(self, directory=DATA_CACHE_DIR):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        namespace, digest = key.split(':', 1)
+        return os.path.join(self.directory, namespace, digest[:2], digest)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        (expires_at,) = self._EXPIRY.unpack_from(data)
+        if expires_at <= time.time():
+            self.delete(key)
+            return None
+        return data[self._EXPIRY.size:]
+
+    def set(self, key, payload, ttl):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial entry
+        tmp_path = f'{path}.tmp-{uuid.uuid4().hex}'
+        with open(tmp_path, 'wb') as f:
+            f.write(self._EXPIRY.pack(time.time() + ttl))
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class RedisBackend:
+    """
+    Any client speaking the redis-py get/setex/delete interface (a real
+    redis.Redis, or an in-memory fake in tests). Entries expire server-side.
+    """
+
+    def __init__(self, client, prefix='getcharty:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url=DATA_CACHE_REDIS_URL):
+        import redis  # Optional dependency, only needed for this backend
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, payload, ttl):
+        self.client.setex(self.prefix + key, max(1, int(ttl)), payload)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
 
 class DataCache:
-    def __init__(self):
-        self.redis_client = redis.Redis()
-    
+    """
+    Cache of values computed from a file (filtered frames, statistics,
+    aggregates) keyed by namespace, file version and request parameters.
+
+    Files never change once uploaded, so the version (the upload's content
+    hash) is part of the key and entries never need invalidating; the TTL only
+    bounds how long unused entries linger.
+    """
+
+    def __init__(self, backend=None, ttl=DATA_CACHE_TTL_SECONDS):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self._computes = SingleFlight()
+
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, namespace, file_version, params):
+        payload = self.backend.get(cache_key(namespace, file_version, params))
+        with self._stats_lock:
+            if payload is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None if payload is None else deserialize(payload)
+
+    def set(self, namespace, file_version, params, value, ttl=None):
+        key = cache_key(namespace, file_version, params)
+        self.backend.set(key, serialize(value), self.ttl if ttl is None else ttl)
+        return key
+
+    def get_or_compute(self, namespace, file_version, params, compute, ttl=None):
+        """
+        Return (value, cache_hit). Concurrent misses for the same key share one
+        computation; a None result is returned but not cached.
+        """
+        value = self.get(namespace, file_version, params)
+        if value is not None:
+            return value, True
+
+        def compute_and_store():
+            computed = compute()
+            if computed is not None:
+                self.set(namespace, file_version, params, computed, ttl)
+            return computed
+
+        return self._computes.do(cache_key(namespace, file_version, params), compute_and_store), False
+
     def cache_filtered_data(self, file_id, filter_params, data):
-        cache_key = f"filtered_{file_id}_{hash(json.dumps(filter_params))}"
-        self.redis_client.setex(
-            cache_key, 
-            3600,  # 1 hour TTL
-            data.to_json()
-        )
-        return cache_key
-    
+        return self.set('filtered', file_id, filter_params, data)
+
     def get_filtered_data(self, file_id, filter_params):
-        cache_key = f"filtered_{file_id}_{hash(json.dumps(filter_params))}"
-        cached = self.redis_client.get(cache_key)
-        if cached:
-            return pd.read_json(cached)
-        return None
\ No newline at end of file
+        return self.get('filtered', file_id, filter_params)
+
+    def get_stats(self):
+        with self._stats_lock:
+            return {
+                'backend': type(self.backend).__name__,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+def create_backend(name=DATA_CACHE_BACKEND):
+    if name == 'memory':
+        return MemoryBackend()
+    if name == 'disk':
+        return DiskBackend()
+    if name == 'redis':
+        return RedisBackend.from_url()
+    raise ValueError(f"Unknown data cache backend '{name}'")
+
+
+# Global cache instance
+data_cache = DataCache(create_backend())
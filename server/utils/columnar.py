@@ -0,0 +1,89 @@
+# utils/columnar.py
+# 2026-10-18 10:05:00 UTC
+# Typed columnar encoding of DataFrames (Parquet when pyarrow is installed, NumPy .npz otherwise)
+
+import io
+import json
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+FORMAT_CSV = 'csv'
+FORMAT_PARQUET = 'parquet'
+FORMAT_NPZ = 'npz'
+
+
+def column_to_arrays(series):
+    """
+    Convert a column to plain NumPy arrays that can be saved (and memory-mapped)
+    without pickling. Numeric and datetime columns are returned as-is; text
+    columns are dictionary-encoded as int32 codes (-1 for nulls) plus a
+    fixed-width unicode array of the distinct values.
+    """
+    if series.dtype.kind in 'biufcmM':
+        return series.to_numpy(), None
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    return codes.astype(np.int32), np.asarray(uniques, dtype=object).astype(str)
+
+
+def arrays_to_column(values, uniques, dtype, name):
+    """Rebuild a column produced by column_to_arrays with its original dtype"""
+    if uniques is None:
+        return pd.Series(values, name=name, copy=False)
+
+    # Append a NaN slot so the -1 null code indexes it directly
+    lookup = np.append(uniques.astype(object), np.nan)
+    return pd.Series(lookup[values], name=name, dtype=object).astype(dtype)
+
+
+def frame_dtypes(df):
+    """Describe column names and dtypes for storage alongside the encoded data"""
+    return json.dumps({
+        'columns': [str(col) for col in df.columns],
+        'dtypes': [str(dtype) for dtype in df.dtypes]
+    })
+
+
+def encode_frame(df):
+    """Encode a DataFrame into (bytes, format, dtypes_json)"""
+    dtypes_json = frame_dtypes(df)
+
+    if HAS_PYARROW:
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue(), FORMAT_PARQUET, dtypes_json
+
+    arrays = {}
+    for i, col in enumerate(df.columns):
+        values, uniques = column_to_arrays(df[col])
+        arrays[f'c{i}'] = values
+        if uniques is not None:
+            arrays[f'u{i}'] = uniques
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue(), FORMAT_NPZ, dtypes_json
+
+
+def decode_frame(data, data_format, dtypes_json):
+    """Decode bytes produced by encode_frame (or a legacy CSV BLOB) into a DataFrame"""
+    if data_format == FORMAT_PARQUET:
+        return pd.read_parquet(io.BytesIO(data))
+
+    if data_format == FORMAT_NPZ:
+        meta = json.loads(dtypes_json)
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            columns = {}
+            for i, (name, dtype) in enumerate(zip(meta['columns'], meta['dtypes'])):
+                uniques = arrays[f'u{i}'] if f'u{i}' in arrays.files else None
+                columns[name] = arrays_to_column(arrays[f'c{i}'], uniques, dtype, name)
+        return pd.DataFrame(columns, columns=meta['columns'], copy=False)
+
+    # Legacy rows hold the original CSV text
+    return pd.read_csv(io.StringIO(data.decode('utf-8')))
@@ -2,14 +2,62 @@
 # 2025-01-28 16:55:00
 # Updated to work with DataFrames and hybrid storage
 
+import re
+import numpy as np
 import pandas as pd
 
-def process_uploaded_file(df, date_columns=None):
-    """Process DataFrame to add quarter and year information"""
-    # Add quarter information
-    for col in date_columns or []:
-        if col in df.columns:
-            df[f'{col}_quarter'] = pd.to_datetime(df[col]).dt.quarter
-            df[f'{col}_year'] = pd.to_datetime(df[col]).dt.year
-    
-    return df
\ No newline at end of file
+def date_parts(series, date_format=None):
+    """
+    Parse a date column once into compact (year int16, quarter int8) arrays.
+    Unparseable values get year and quarter 0; without a format they raise.
+    """
+    errors = 'coerce' if date_format else 'raise'
+    dates = pd.to_datetime(series, format=date_format, errors=errors)
+    valid = dates.notna().to_numpy()
+    years = np.where(valid, dates.dt.year.fillna(0).to_numpy(), 0).astype(np.int16)
+    quarters = np.where(valid, dates.dt.quarter.fillna(0).to_numpy(), 0).astype(np.int8)
+    return years, quarters
+
+def unique_quarters(years, quarters):
+    """Sorted distinct (year, quarter) pairs, ignoring unparsed dates"""
+    valid = quarters > 0
+    keys = np.unique(years[valid].astype(np.int32) * 4 + (quarters[valid] - 1))
+    return [(int(key // 4), int(key % 4) + 1) for key in keys]
+
+def get_profiled_date_formats(profile):
+    """Map each profiled date column to its detected format"""
+    return {col: column_profile['date_format'] for col, column_profile in (profile or {}).items()
+            if column_profile.get('date_format')}
+
+def resolve_date_column(profile, requested=None):
+    """
+    The date column a request asked for, or else the first column the
+    upload-time profiler detected as a date; None when there is neither
+    """
+    if requested:
+        return requested
+    for col, column_profile in (profile or {}).items():
+        if column_profile.get('is_date'):
+            return col
+    return None
+
+def clean_column_name(name):
+    """
+    Convert raw column names to clean, standardized format
+    """
+    # Remove special characters and standardize
+    cleaned = re.sub(r'[^\w\s]', '', str(name))
+    cleaned = re.sub(r'\s+', '_', cleaned.strip())
+    return cleaned.lower()
+
+def resolve_column(columns, name):
+    """
+    Raw column for a name given either as stored or cleaned (as /process-file
+    and /api/files report columns); None if no column matches
+    """
+    if name in columns:
+        return name
+    for col in columns:
+        if clean_column_name(col) == name:
+            return col
+    return None
@@ -0,0 +1,81 @@
+# utils/date_parsing.py
+# 2026-10-18 18:50:00 UTC
+# Vectorized date parsing: infer a format from a sample, then parse whole columns at once
+
+import numpy as np
+import pandas as pd
+from config import DATE_FORMATS, TIME_FORMATS
+
+DATE_SAMPLE_SIZE = 50  # Values used to pick a candidate date format
+DATE_MIN_MATCH_RATIO = 0.9  # Share of values that must parse for a date column
+
+# Axis labels that are headers or placeholders rather than dates
+SKIP_LABELS = {'date', 'time', 'period', ''}
+
+
+def infer_date_format(text, formats=DATE_FORMATS, sample_size=DATE_SAMPLE_SIZE):
+    """
+    Find the first format that parses a sample of the values, then parse the
+    whole column with it in one call. Returns (format, parsed_series) or
+    (None, None) when no format parses enough values.
+    """
+    if len(text) == 0:
+        return None, None
+
+    sample = text.head(sample_size)
+    for fmt in formats:
+        if pd.to_datetime(sample, format=fmt, errors='coerce').notna().all():
+            parsed = pd.to_datetime(text, format=fmt, errors='coerce')
+            if parsed.notna().mean() >= DATE_MIN_MATCH_RATIO:
+                return fmt, parsed
+    return None, None
+
+
+def parse_date_labels(labels, formats=DATE_FORMATS + TIME_FORMATS, sample_size=DATE_SAMPLE_SIZE):
+    """
+    Parse chart labels into a datetime64[us] array (NaT where a label isn't a date).
+
+    The format that parses most of a sample is applied to every label in a
+    single pd.to_datetime call. Only labels it can't parse (stragglers) are
+    retried against the other formats, in order, as the per-label loop used to
+    do. If nothing in the sample is a date, the labels aren't parsed at all.
+    Header-like labels ('Date', 'Period', blanks, ...) are always NaT.
+    """
+    text = pd.Series(labels, dtype=object).astype(str)
+    valid = ~text.str.lower().isin(SKIP_LABELS)
+    parsed = pd.Series(pd.NaT, index=text.index, dtype='datetime64[us]')
+    if not valid.any():
+        return parsed.to_numpy()
+
+    best_format = _best_format(text[valid].head(sample_size), formats)
+    if best_format is None:
+        return parsed.to_numpy()
+
+    parsed[valid] = pd.to_datetime(text[valid], format=best_format, errors='coerce')
+
+    # Retry stragglers with the remaining formats, one vectorized call per format
+    for fmt in formats:
+        stragglers = valid & parsed.isna()
+        if not stragglers.any():
+            break
+        if fmt != best_format:
+            parsed[stragglers] = pd.to_datetime(text[stragglers], format=fmt, errors='coerce')
+
+    return parsed.to_numpy()
+
+
+def _best_format(sample, formats):
+    """The format parsing the most sample values (earliest wins ties), or None if none parse any"""
+    best_format, best_count = None, 0
+    for fmt in formats:
+        count = int(pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum())
+        if count > best_count:
+            best_format, best_count = fmt, count
+            if count == len(sample):
+                break
+    return best_format
+
+
+def to_datetimes(dates):
+    """datetime64 array -> list of datetime objects, with None for NaT"""
+    return np.asarray(dates).astype('datetime64[us]').astype(object).tolist()
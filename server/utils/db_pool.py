@@ -0,0 +1,180 @@
+# utils/db_pool.py
+# 2026-10-18 13:15:00 UTC
+# Bounded pool of WAL-mode SQLite connections shared across request threads
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+
+
+class PooledConnection:
+    """
+    Thin wrapper around a pooled sqlite3.Connection.
+
+    Behaves like the connection it wraps, except that close() rolls back any
+    uncommitted work and hands the connection back to the pool instead of
+    closing it, so existing "connect / use / close" call sites work unchanged.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError('Cannot operate on a closed database.')
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        self._pool.release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._conn is not None:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        self.close()
+        return False
+
+    def __del__(self):
+        # Return connections that callers forgot to close on an error path
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Bounded LIFO pool of SQLite connections.
+
+    Connections are opened lazily in WAL mode with synchronous=NORMAL, so
+    readers never block on a writer, and each keeps its own prepared
+    statement cache (sqlite3's cached_statements). When every connection is in
+    use, callers queue up first-come first-served for up to `timeout` seconds,
+    so a busy group of readers can't starve an occasional writer.
+    auto_vacuum (e.g. 'INCREMENTAL') is applied to databases the pool creates.
+    """
+
+    def __init__(self, path, max_size=8, timeout=30.0, busy_timeout_ms=5000, cached_statements=256,
+                 auto_vacuum=None):
+        self.path = path
+        self.auto_vacuum = auto_vacuum
+        self.max_size = max_size
+        self.timeout = timeout
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = []
+        self._waiters = deque()
+        self._created = 0
+        self._pid = os.getpid()
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        if self.auto_vacuum:
+            # Only takes effect on a new, empty database, and only if set before
+            # journal_mode=WAL writes its header; otherwise a harmless no-op
+            conn.execute(f'PRAGMA auto_vacuum={self.auto_vacuum}')
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        return conn
+
+    def _reset_after_fork(self):
+        # Connections must never be shared with a forked worker process
+        if self._pid != os.getpid():
+            self._idle = []
+            self._waiters.clear()
+            self._created = 0
+            self._pid = os.getpid()
+
+    def _take(self):
+        """Take an idle connection or reserve a slot for a new one (call with the lock held)"""
+        if self._idle:
+            return self._idle.pop()
+        if self._created < self.max_size:
+            self._created += 1
+            return None
+        raise queue.Empty
+
+    def acquire(self):
+        """Borrow a connection, opening a new one if the pool isn't full yet"""
+        with self._cond:
+            self._reset_after_fork()
+            try:
+                if self._waiters:
+                    raise queue.Empty
+                conn = self._take()
+            except queue.Empty:
+                conn = self._wait_for_turn()
+
+        if conn is None:
+            try:
+                conn = self._open()
+            except sqlite3.Error:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify_all()
+                raise
+        return PooledConnection(self, conn)
+
+    def _wait_for_turn(self):
+        ticket = object()
+        self._waiters.append(ticket)
+        deadline = time.monotonic() + self.timeout
+        try:
+            while True:
+                if self._waiters[0] is ticket:
+                    try:
+                        return self._take()
+                    except queue.Empty:
+                        pass
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise sqlite3.OperationalError(
+                        f'Timed out after {self.timeout}s waiting for a database connection'
+                    )
+                self._cond.wait(remaining)
+        finally:
+            self._waiters.remove(ticket)
+            self._cond.notify_all()
+
+    def release(self, conn):
+        """Return a connection to the pool, discarding any uncommitted work"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # A broken connection is dropped and replaced on demand
+            conn.close()
+            conn = None
+
+        with self._cond:
+            if self._pid != os.getpid():
+                return
+            if conn is None:
+                self._created -= 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify_all()
+
+    def close_all(self):
+        """Close every idle connection in the pool"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for conn in idle:
+            conn.close()
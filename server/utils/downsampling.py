@@ -0,0 +1,195 @@
+# utils/downsampling.py
+# 2026-10-18 17:30:00 UTC
+# Server-side downsampling of large series before they are sent to Plotly
+
+import numpy as np
+import pandas as pd
+from config import DOWNSAMPLE_POINTS_PER_PIXEL, DOWNSAMPLE_MIN_POINTS
+
+METHOD_LTTB = 'lttb'  # Largest-Triangle-Three-Buckets, keeps the visual shape of lines
+METHOD_MINMAX = 'minmax'  # Min and max of each bucket, keeps every peak and trough of bars
+METHOD_UNIFORM = 'uniform'  # Evenly spaced rows, for series without numeric values
+
+# Chart types drawn as connected points; everything else is treated as bar-like
+LINE_CHART_TYPES = {'line', 'scatter', 'area'}
+
+
+class InvalidDownsampleRequest(ValueError):
+    """Raised for a max_points or chart_width that isn't a positive number"""
+
+
+def target_points(max_points=None, chart_width=None):
+    """
+    Resolve how many points a chart can usefully show, or None for no limit.
+    An explicit max_points wins; otherwise a chart width in pixels allows
+    DOWNSAMPLE_POINTS_PER_PIXEL points per pixel column.
+    """
+    try:
+        if max_points not in (None, ''):
+            target = int(max_points)
+        elif chart_width not in (None, ''):
+            target = int(float(chart_width) * DOWNSAMPLE_POINTS_PER_PIXEL)
+        else:
+            return None
+    except (TypeError, ValueError):
+        raise InvalidDownsampleRequest("'max_points' and 'chart_width' must be numbers")
+
+    if target <= 0:
+        raise InvalidDownsampleRequest("'max_points' and 'chart_width' must be positive")
+    return max(target, DOWNSAMPLE_MIN_POINTS)
+
+
+def method_for_chart(chart_type):
+    """LTTB for line-like charts, min/max per bucket for bar-like ones"""
+    return METHOD_LTTB if chart_type in LINE_CHART_TYPES else METHOD_MINMAX
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points that preserve the
+    shape of the series. The first and last points are always kept; from each
+    bucket in between, the point forming the largest triangle with the point
+    kept from the previous bucket and the average of the next bucket is kept.
+
+    Bucket bounds and next-bucket averages are computed for all buckets at once;
+    only the (inherently sequential) selection loops over buckets, each step
+    being a vectorized argmax. Non-finite y values are never chosen unless a
+    bucket has nothing else.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    finite = np.isfinite(y)
+    y_filled = np.where(finite, y, 0.0)
+
+    # Buckets over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Average of each bucket's finite points (the "third" point of the triangle)
+    interior = slice(0, n - 1)  # reduceat runs the last bucket to the end of the array
+    counts = np.add.reduceat(finite[interior], starts).astype(np.float64)
+    sum_x = np.add.reduceat(np.where(finite, x, 0.0)[interior], starts)
+    sum_y = np.add.reduceat(y_filled[interior], starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_x = np.where(counts > 0, sum_x / counts, (x[starts] + x[ends - 1]) / 2)
+        avg_y = np.where(counts > 0, sum_y / counts, np.nan)
+    # The last bucket looks ahead to the final point
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    anchor_x, anchor_y = x[0], y[0] if finite[0] else 0.0
+
+    for bucket, (start, end) in enumerate(zip(starts, ends)):
+        bx = x[start:end]
+        by = y_filled[start:end]
+        cx, cy = next_x[bucket], next_y[bucket]
+        if not np.isfinite(cy):
+            cy = anchor_y
+
+        # Twice the triangle area; the constant factor doesn't change the argmax
+        area = np.abs((anchor_x - cx) * (by - anchor_y) - (anchor_x - bx) * (cy - anchor_y))
+        area[~finite[start:end]] = -1.0
+
+        chosen = start + int(np.argmax(area))
+        selected[bucket + 1] = chosen
+        if finite[chosen]:
+            anchor_x, anchor_y = x[chosen], y[chosen]
+
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Indices of the minimum and maximum of each bucket (about n_out points in
+    total, in original order), plus the first and last points. Every peak and
+    trough survives, so bar-like charts keep their visual envelope.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    buckets = max(n_out // 2, 1)
+    if n_out >= n:
+        return np.arange(n)
+
+    # Pad to equal-sized buckets so all of them reduce in one call
+    size = -(-n // buckets)
+    padded_low = np.full(buckets * size, np.inf)
+    padded_high = np.full(buckets * size, -np.inf)
+    finite = np.isfinite(y)
+    padded_low[:n] = np.where(finite, y, np.inf)
+    padded_high[:n] = np.where(finite, y, -np.inf)
+
+    offsets = np.arange(buckets) * size
+    low = offsets + padded_low.reshape(buckets, size).argmin(axis=1)
+    high = offsets + padded_high.reshape(buckets, size).argmax(axis=1)
+
+    indices = np.unique(np.concatenate(([0, n - 1], low, high)))
+    return indices[indices < n]
+
+
+def uniform_indices(n, n_out):
+    """Evenly spaced indices including the first and last rows"""
+    if n_out >= n:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, n_out).round().astype(np.int64))
+
+
+def downsample_indices(x, y, n_out, method):
+    """Row indices to keep for the given method"""
+    if method == METHOD_LTTB:
+        return lttb_indices(x, y, n_out)
+    if method == METHOD_MINMAX:
+        return minmax_indices(y, n_out)
+    return uniform_indices(len(y), n_out)
+
+
+def downsample_frame(df, x_column, y_column, n_out, method):
+    """
+    Reduce a DataFrame to about n_out rows chosen by its x/y columns.
+
+    Returns (frame, info) where info describes the reduction for the response:
+    {'reduced', 'method', 'original_points', 'returned_points'}. The frame is
+    returned untouched when it already fits.
+    """
+    original = len(df)
+    if n_out is None or original <= n_out or y_column not in df.columns:
+        return df, {'reduced': False, 'method': None,
+                    'original_points': original, 'returned_points': original}
+
+    y = numeric_values(df[y_column])
+    if not np.isfinite(y).any():
+        method = METHOD_UNIFORM
+
+    x = axis_positions(df[x_column] if x_column in df.columns else None, original)
+    reduced = df.iloc[downsample_indices(x, y, n_out, method)]
+    return reduced, {'reduced': True, 'method': method,
+                     'original_points': original, 'returned_points': len(reduced)}
+
+
+def numeric_values(values):
+    """Float array of a column or list, with NaN for anything non-numeric"""
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def axis_positions(x_series, n):
+    """
+    Numeric x positions for bucketing: the values themselves for sorted
+    numeric or datetime columns, otherwise the row position (categorical or
+    text axes are drawn in row order)
+    """
+    if x_series is not None:
+        if x_series.dtype.kind in 'iuf':
+            values = x_series.to_numpy(dtype=np.float64, na_value=np.nan)
+        elif x_series.dtype.kind == 'M':
+            values = x_series.to_numpy().astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+        else:
+            values = None
+        if values is not None and np.isfinite(values).all() and (np.diff(values) >= 0).all():
+            return values
+    return np.arange(n, dtype=np.float64)
@@ -0,0 +1,176 @@
+# utils/frame_cache.py
+# 2026-10-18 09:12:00 UTC
+# Process-wide, byte-budgeted LRU cache for DataFrames shared by all users
+
+from collections import OrderedDict
+import sys
+import threading
+import numpy as np
+import pandas as pd
+
+
+def estimate_nbytes(value):
+    """Estimate the in-memory size of a cached value in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True, index=True))
+    if isinstance(value, np.ndarray) or hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class FrameCache:
+    """
+    Least-recently-used cache bounded by total bytes across all users.
+
+    Entries are keyed by (owner, key) so one user can't read another user's
+    frames, but eviction order is global: the least recently used entry in the
+    whole process goes first. An optional per-owner cap limits how many
+    entries a single user may hold at once.
+
+    The same object may be cached under several keys (e.g. deduplicated
+    uploads); its bytes are charged against the budget only once.
+
+    All operations are thread-safe. The on_evict callback runs after the
+    internal lock is released so slow callbacks (e.g. spilling to disk) never
+    block other readers.
+    """
+
+    def __init__(self, max_bytes, max_entries_per_owner=None, on_evict=None):
+        self.max_bytes = max_bytes
+        self.max_entries_per_owner = max_entries_per_owner
+        # Called as on_evict(owner, key, value) when an entry is pushed out by
+        # the budget (not on explicit pop)
+        self.on_evict = on_evict
+
+        # {(owner, key): (value, nbytes)} in LRU -> MRU order
+        self._entries = OrderedDict()
+        # {owner: OrderedDict({key: None})} in LRU -> MRU order per owner
+        self._owner_keys = {}
+        # {id(value): [reference count, nbytes]} so shared values are charged once
+        self._value_refs = {}
+        self.current_bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, owner, key):
+        """Return the cached value and mark it most recently used, or None"""
+        with self._lock:
+            entry = self._entries.get((owner, key))
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end((owner, key))
+            self._owner_keys[owner].move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, owner, key):
+        """Return the cached value without touching LRU order or counters"""
+        with self._lock:
+            entry = self._entries.get((owner, key))
+            return entry[0] if entry is not None else None
+
+    def put(self, owner, key, value, nbytes=None):
+        """Insert or replace a value, evicting LRU entries to stay within budget"""
+        with self._lock:
+            shared = self._value_refs.get(id(value))
+        if nbytes is None:
+            nbytes = shared[1] if shared is not None else estimate_nbytes(value)
+
+        evicted = []
+        with self._lock:
+            self._remove(owner, key)
+
+            # A single value larger than the whole budget is never cached
+            if nbytes > self.max_bytes:
+                return False
+
+            # Enforce the per-owner cap by evicting that owner's oldest entry
+            owner_keys = self._owner_keys.setdefault(owner, OrderedDict())
+            if self.max_entries_per_owner:
+                while len(owner_keys) >= self.max_entries_per_owner:
+                    oldest_key = next(iter(owner_keys))
+                    evicted.append((owner, oldest_key, self._remove(owner, oldest_key)))
+
+            # Enforce the global byte budget (a value that is already cached
+            # under another key costs nothing extra)
+            while (self._entries and id(value) not in self._value_refs
+                   and self.current_bytes + nbytes > self.max_bytes):
+                lru_owner, lru_key = next(iter(self._entries))
+                evicted.append((lru_owner, lru_key, self._remove(lru_owner, lru_key)))
+
+            self._entries[(owner, key)] = (value, nbytes)
+            self._owner_keys.setdefault(owner, OrderedDict())[key] = None
+            refs = self._value_refs.setdefault(id(value), [0, nbytes])
+            if refs[0] == 0:
+                self.current_bytes += nbytes
+            refs[0] += 1
+            self.evictions += len(evicted)
+
+        if self.on_evict is not None:
+            for evicted_owner, evicted_key, evicted_value in evicted:
+                self.on_evict(evicted_owner, evicted_key, evicted_value)
+        return True
+
+    def pop(self, owner, key):
+        """Remove an entry without counting it as an eviction"""
+        with self._lock:
+            return self._remove(owner, key)
+
+    def _remove(self, owner, key):
+        entry = self._entries.pop((owner, key), None)
+        if entry is None:
+            return None
+
+        refs = self._value_refs[id(entry[0])]
+        refs[0] -= 1
+        if refs[0] == 0:
+            del self._value_refs[id(entry[0])]
+            self.current_bytes -= refs[1]
+        owner_keys = self._owner_keys.get(owner)
+        if owner_keys is not None:
+            owner_keys.pop(key, None)
+            if not owner_keys:
+                del self._owner_keys[owner]
+        return entry[0]
+
+    def contains(self, owner, key):
+        """Check membership without touching LRU order or counters"""
+        with self._lock:
+            return (owner, key) in self._entries
+
+    def items_for_owner(self, owner):
+        """List (key, value) pairs for an owner, oldest first, without touching LRU order"""
+        with self._lock:
+            return [(key, self._entries[(owner, key)][0]) for key in self._owner_keys.get(owner, ())]
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._owner_keys.clear()
+            self._value_refs.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'owners': len(self._owner_keys),
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
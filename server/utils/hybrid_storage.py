@@ -2,59 +2,323 @@
 # 2025-07-28 17:50:00 UTC
 # Hybrid storage manager for in-memory and database file storage
 
-from collections import defaultdict, deque
 import pandas as pd
 import io
 import json
 import uuid
 import sqlite3
+import hashlib
+import threading
+import weakref
 from datetime import datetime
 from models import get_session
+from config import (FRAME_CACHE_MAX_BYTES, FRAME_CACHE_MAX_FILES_PER_USER, DERIVED_CACHE_MAX_BYTES,
+                    SPILL_CACHE_DIR, SPILL_CACHE_MAX_BYTES)
+from utils.frame_cache import FrameCache
+from utils.spill_store import SpillStore
+from utils.columnar import encode_frame, decode_frame, FORMAT_CSV
+from utils.single_flight import SingleFlight, StripedLock
+from utils.column_profiler import profile_frame
+from utils.data_processor import date_parts, get_profiled_date_formats
+from utils.range_index import TimeRangeIndex
+from utils.quarterly_summaries import (summarize_quarters, insert_summaries, copy_summaries, delete_summaries,
+                                       has_summaries, fetch_summary, fetch_quarters, fetch_sketches)
 
 class HybridStorageManager:
-    def __init__(self, max_files_per_user=3):
-        # In-memory storage: {user_id: deque([(file_id, DataFrame), ...], maxlen=max_files_per_user)}
-        self.in_memory_files = defaultdict(lambda: deque(maxlen=max_files_per_user))
+    def __init__(self, max_files_per_user=FRAME_CACHE_MAX_FILES_PER_USER, max_cache_bytes=FRAME_CACHE_MAX_BYTES,
+                 spill_dir=SPILL_CACHE_DIR, max_spill_bytes=SPILL_CACHE_MAX_BYTES,
+                 max_derived_bytes=DERIVED_CACHE_MAX_BYTES):
+        # In-memory storage: process-wide LRU of {(user_id, file_id): DataFrame}
+        # bounded by total DataFrame bytes, with an optional per-user cap
+        self.in_memory_files = FrameCache(max_cache_bytes, max_entries_per_owner=max_files_per_user,
+                                          on_evict=self._spill_evicted)
         self.max_files_per_user = max_files_per_user
+        
+        # Middle tier: frames evicted from memory are spilled to memory-mapped
+        # column files so they can be reopened without touching the database
+        self.spilled_files = SpillStore(spill_dir, max_spill_bytes) if spill_dir else None
+        
+        # Values derived from a file (cleaned frame, chart elements, ...):
+        # {(user_id, (file_id, name)): value}, computed once per file
+        self.derived_values = FrameCache(max_derived_bytes)
+        
+        # Concurrent misses for the same file share one load, and loads and
+        # deletes of the same file are serialized by a striped per-file lock
+        self._loads = SingleFlight()
+        self._file_locks = StripedLock()
+        
+        # Content-addressed uploads: {content_hash: DataFrame} for every frame
+        # still alive somewhere, so identical uploads share one object
+        self._shared_frames = weakref.WeakValueDictionary()
+        self._shared_lock = threading.Lock()
     
     def store_file(self, user_id, file_content, filename):
         """Store a file using hybrid approach - recent files in memory, older in DB"""
+        content_bytes = file_content.encode('utf-8')
+        return self.store_upload(user_id, filename, hash_content(content_bytes), len(content_bytes),
+                                 lambda: pd.read_csv(io.StringIO(file_content)))
+    
+    def store_upload(self, user_id, filename, content_hash, file_size, parse):
+        """
+        Store an upload whose content hash and size are already known.
+        parse() returns the DataFrame and is only called for content not seen before.
+        """
         file_id = str(uuid.uuid4())
         
-        # Process the file content
-        df = pd.read_csv(io.StringIO(file_content))
-        file_size = len(file_content.encode('utf-8'))
+        # Identical content was uploaded before: just add a new handle to it
+        if self._add_file_reference(file_id, user_id, filename, file_size, content_hash):
+            df = self._get_shared_frame(content_hash)
+            if df is not None:
+                self.in_memory_files.put(user_id, file_id, df)
+            return file_id
+        
+        # Process the file content, profile its columns and summarize its quarters once
+        df = parse()
         total_records = len(df)
         columns_json = json.dumps(list(df.columns))
+        profile = profile_frame(df)
+        summaries = summarize_quarters(df, profile)
         
-        # Check if we need to move oldest file to database
-        if len(self.in_memory_files[user_id]) == self.max_files_per_user:
-            self._move_oldest_to_db(user_id)
-        
-        # Add new file to memory
-        self.in_memory_files[user_id].append((file_id, df))
+        # Store in database for persistence, in typed columnar form so later
+        # loads skip CSV parsing and type inference
+        data, data_format, dtypes_json = encode_frame(df)
+        self._store_in_db(file_id, user_id, filename, content_hash, data, file_size, total_records, columns_json,
+                          data_format, dtypes_json, json.dumps(profile), summaries)
         
-        # Also store in database for persistence
-        self._store_in_db(file_id, user_id, filename, file_content, file_size, total_records, columns_json)
+        # Add new file to memory (the cache evicts least recently used files,
+        # which are already persisted in the database)
+        df = self._share_frame(content_hash, df)
+        self.in_memory_files.put(user_id, file_id, df)
+        self.derived_values.put(user_id, (file_id, 'profile'), profile)
         
         return file_id
     
+    def get_derived(self, user_id, file_id, name, compute):
+        """
+        Get a value derived from a file, computing it at most once per file.
+        Returns (value, cache_hit). Uploaded files never change, so entries
+        only need invalidating when the file is deleted.
+        """
+        value = self.derived_values.get(user_id, (file_id, name))
+        if value is not None:
+            return value, True
+        
+        value = self._loads.do(('derived', user_id, file_id, name),
+                               lambda: self._compute_derived(user_id, file_id, name, compute))
+        return value, False
+    
+    def _compute_derived(self, user_id, file_id, name, compute):
+        value = compute()
+        with self._file_locks(file_id):
+            # Don't cache values for a file deleted while they were computed
+            if self._file_exists(user_id, file_id):
+                self.derived_values.put(user_id, (file_id, name), value)
+        return value
+    
+    def get_quarter_summary(self, user_id, file_id, date_column, year, quarter):
+        """
+        Look up upload-time statistics for one quarter of a date column (year =
+        quarter = 0 for the whole file). Returns (record_count, {column: stats}),
+        or None if the file doesn't exist or date_column wasn't summarized.
+        """
+        if not self._ensure_quarterly_summaries(user_id, file_id):
+            return None
+        conn = get_session()
+        summary = fetch_summary(conn.cursor(), file_id, date_column, year, quarter)
+        conn.close()
+        return summary
+    
+    def get_available_quarters(self, user_id, file_id, date_column):
+        """Sorted (year, quarter) pairs present in a date column, or None if it wasn't summarized"""
+        if not self._ensure_quarterly_summaries(user_id, file_id):
+            return None
+        conn = get_session()
+        quarters = fetch_quarters(conn.cursor(), file_id, date_column)
+        conn.close()
+        return quarters
+    
+    def get_quarter_sketches(self, user_id, file_id, date_column, periods):
+        """
+        {column: QuantileSketch} merged over (year, quarter) periods from the
+        upload-time sketches, or None if the file doesn't exist or date_column
+        wasn't summarized
+        """
+        if not self._ensure_quarterly_summaries(user_id, file_id):
+            return None
+        conn = get_session()
+        sketches = fetch_sketches(conn.cursor(), file_id, date_column, periods)
+        conn.close()
+        return sketches
+    
+    def _ensure_quarterly_summaries(self, user_id, file_id):
+        """Check the file belongs to the user and has summaries, once per file"""
+        ready, _ = self.get_derived(user_id, file_id, 'quarterly_summaries',
+                                    lambda: self._materialize_quarterly_summaries(user_id, file_id))
+        return ready
+    
+    def _materialize_quarterly_summaries(self, user_id, file_id):
+        conn = get_session()
+        cursor = conn.cursor()
+        cursor.execute('SELECT 1 FROM files WHERE file_id = ? AND user_id = ?', (file_id, user_id))
+        exists = cursor.fetchone() is not None
+        summarized = exists and has_summaries(cursor, file_id)
+        conn.close()
+        if not exists:
+            return False
+        if summarized:
+            return True
+        
+        # Files uploaded before summaries (or sketches) existed are summarized on first use
+        df = self.get_file_df(user_id, file_id)
+        if df is None:
+            return False
+        summaries = summarize_quarters(df, self.get_file_profile(user_id, file_id))
+        with self._file_locks(file_id):
+            conn = get_session()
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1 FROM files WHERE file_id = ?', (file_id,))
+            if cursor.fetchone() is not None:
+                insert_summaries(cursor, file_id, summaries)
+                conn.commit()
+            conn.close()
+        return True
+    
+    def get_date_parts(self, user_id, file_id, column):
+        """
+        (years int16, quarters int8) arrays of a date column, parsed once per
+        file and cached alongside the frame, which is never modified. Unparsed
+        dates are 0. Returns None if the file or column doesn't exist.
+        """
+        parts, _ = self.get_derived(user_id, file_id, ('date_parts', column),
+                                    lambda: self._parse_date_parts(user_id, file_id, column))
+        return parts
+    
+    def _parse_date_parts(self, user_id, file_id, column):
+        df = self.get_file_df(user_id, file_id)
+        if df is None or column not in df.columns:
+            return None
+        return date_parts(df[column], get_profiled_date_formats(self.get_file_profile(user_id, file_id)).get(column))
+    
+    def get_range_index(self, user_id, file_id, date_column):
+        """
+        Sorted time index of a profiled date column with prefix sums of every
+        numeric column, built on first use and dropped with the file. Returns
+        None if the file doesn't exist or date_column isn't a date column.
+        """
+        index, _ = self.get_derived(user_id, file_id, ('range_index', date_column),
+                                    lambda: self._build_range_index(user_id, file_id, date_column))
+        return index
+    
+    def _build_range_index(self, user_id, file_id, date_column):
+        profile = self.get_file_profile(user_id, file_id) or {}
+        if not profile.get(date_column, {}).get('is_date'):
+            return None
+        df = self.get_file_df(user_id, file_id)
+        if df is None:
+            return None
+        numeric_columns = [col for col, column_profile in profile.items()
+                           if column_profile.get('is_numeric') and col != date_column and col in df.columns]
+        return TimeRangeIndex.build(df, date_column, profile[date_column].get('date_format'), numeric_columns)
+    
+    def get_file_version(self, user_id, file_id):
+        """
+        Identifier of a file's content that is the same in every process (its
+        content hash, or the file id for uploads stored before hashing), or
+        None if the file doesn't exist
+        """
+        version, _ = self.get_derived(user_id, file_id, 'version', lambda: self._load_version(user_id, file_id))
+        return version
+    
+    def _load_version(self, user_id, file_id):
+        conn = get_session()
+        cursor = conn.cursor()
+        cursor.execute('SELECT content_hash FROM files WHERE file_id = ? AND user_id = ?', (file_id, user_id))
+        record = cursor.fetchone()
+        conn.close()
+        if record is None:
+            return None
+        return record[0] or f'file:{file_id}'
+    
+    def get_file_profile(self, user_id, file_id):
+        """Get the column profile recorded for a file at upload, or None if the file doesn't exist"""
+        profile, _ = self.get_derived(user_id, file_id, 'profile', lambda: self._load_profile(user_id, file_id))
+        return profile
+    
+    def _load_profile(self, user_id, file_id):
+        conn = get_session()
+        cursor = conn.cursor()
+        cursor.execute('SELECT profile FROM files WHERE file_id = ? AND user_id = ?', (file_id, user_id))
+        record = cursor.fetchone()
+        conn.close()
+        
+        if record is None:
+            return None
+        if record[0] is not None:
+            return json.loads(record[0])
+        
+        # Files uploaded before profiling are profiled on first use
+        df = self.get_file_df(user_id, file_id)
+        if df is None:
+            return None
+        profile = profile_frame(df)
+        
+        conn = get_session()
+        cursor = conn.cursor()
+        cursor.execute('UPDATE files SET profile = ? WHERE file_id = ?', (json.dumps(profile), file_id))
+        conn.commit()
+        conn.close()
+        return profile
+    
+    def _get_shared_frame(self, content_hash):
+        with self._shared_lock:
+            return self._shared_frames.get(content_hash)
+    
+    def _share_frame(self, content_hash, df):
+        """Register a frame for its content hash, returning the frame already registered if any"""
+        with self._shared_lock:
+            existing = self._shared_frames.get(content_hash)
+            if existing is not None:
+                return existing
+            self._shared_frames[content_hash] = df
+            return df
+    
     def get_file_df(self, user_id, file_id):
         """Get a file DataFrame - check memory first, then database"""
         # Check in-memory first
-        for fid, df in self.in_memory_files[user_id]:
-            if fid == file_id:
-                return df
+        df = self.in_memory_files.get(user_id, file_id)
+        if df is not None:
+            return df
         
-        # If not in memory, load from database
-        return self._load_from_db(user_id, file_id)
+        # Concurrent requests for the same file wait on a single load
+        return self._loads.do((user_id, file_id), lambda: self._load_into_memory(user_id, file_id))
+    
+    def _load_into_memory(self, user_id, file_id):
+        """Load a file from the spill tier or database and cache it in memory"""
+        with self._file_locks(file_id):
+            # Another load may have completed while we waited for the lock
+            df = self.in_memory_files.peek(user_id, file_id)
+            if df is not None:
+                return df
+            
+            # Then the memory-mapped spill tier
+            if self.spilled_files is not None:
+                df = self.spilled_files.get(user_id, file_id)
+            
+            # If not spilled, load from database
+            if df is None:
+                df = self._load_from_db(user_id, file_id)
+            
+            # Move this file to memory (evicting least recently used if needed)
+            if df is not None:
+                self.in_memory_files.put(user_id, file_id, df)
+            return df
     
     def get_user_files(self, user_id):
         """Get list of files for a user (both in-memory and database)"""
         files = []
         
         # Add in-memory files
-        for file_id, df in self.in_memory_files[user_id]:
+        for file_id, df in self.in_memory_files.items_for_owner(user_id):
             files.append({
                 'file_id': file_id,
                 'filename': f"Recent: {len(df)} records",
@@ -72,7 +336,7 @@ class HybridStorageManager:
         for file_record in db_files:
             file_id, filename, total_records, columns_json, upload_date = file_record
             # Skip if already in memory
-            if not any(fid == file_id for fid, _ in self.in_memory_files[user_id]):
+            if not self.in_memory_files.contains(user_id, file_id):
                 files.append({
                     'file_id': file_id,
                     'filename': filename,
@@ -85,21 +349,101 @@ class HybridStorageManager:
         conn.close()
         return files
     
-    def _move_oldest_to_db(self, user_id):
-        """Move the oldest file from memory to database"""
-        if len(self.in_memory_files[user_id]) > 0:
-            # The oldest file is at the beginning of the deque
-            # It's already in the database, so we just remove it from memory
-            self.in_memory_files[user_id].popleft()
+    def _spill_evicted(self, user_id, file_id, df):
+        """Write a frame evicted from memory to the spill tier"""
+        if self.spilled_files is None:
+            return
+        try:
+            self.spilled_files.put(user_id, file_id, df)
+        except (OSError, ValueError) as e:
+            # The database copy is still authoritative, so a failed spill only costs
+            # speed; ValueError comes from columns that only save as pickled objects
+            # (tz-aware datetimes, nullable integers with missing values, ...)
+            print(f"Error spilling file {file_id}: {e}")
+            return
+        
+        # delete_file removes the database row before the spill, so checking
+        # afterwards guarantees a concurrent delete can't leave a readable spill
+        if not self._file_exists(user_id, file_id):
+            self.spilled_files.pop(user_id, file_id)
+    
+    def _file_exists(self, user_id, file_id):
+        conn = get_session()
+        cursor = conn.cursor()
+        cursor.execute('SELECT 1 FROM files WHERE file_id = ? AND user_id = ?', (file_id, user_id))
+        exists = cursor.fetchone() is not None
+        conn.close()
+        return exists
+    
+    def cleanup_orphaned_spills(self):
+        """Remove spill files for files that no longer exist in the database"""
+        if self.spilled_files is None:
+            return 0
+        
+        conn = get_session()
+        cursor = conn.cursor()
+        cursor.execute('SELECT user_id, file_id FROM files')
+        live_keys = set(cursor.fetchall())
+        conn.close()
+        
+        return self.spilled_files.cleanup_orphans(live_keys)
+    
+    def delete_orphaned_files(self):
+        """Delete files whose owner no longer has any session; returns how many were deleted"""
+        conn = get_session()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT user_id, file_id FROM files
+            WHERE NOT EXISTS (SELECT 1 FROM user_sessions WHERE user_sessions.user_id = files.user_id)
+        ''')
+        orphans = cursor.fetchall()
+        conn.close()
+        
+        for user_id, file_id in orphans:
+            self.delete_file(user_id, file_id)
+        return len(orphans)
+    
+    def _add_file_reference(self, file_id, user_id, filename, file_size, content_hash):
+        """Point a new file at an existing blob, returns False if no blob has this content"""
+        conn = get_session()
+        cursor = conn.cursor()
+        cursor.execute('UPDATE file_blobs SET ref_count = ref_count + 1 WHERE content_hash = ?', (content_hash,))
+        if cursor.rowcount == 0:
+            conn.rollback()
+            conn.close()
+            return False
+        
+        cursor.execute('''
+            INSERT INTO files (file_id, user_id, filename, data, file_size, total_records, columns,
+                               data_format, dtypes, content_hash, profile)
+            SELECT ?, ?, ?, X'', ?, total_records, columns, data_format, dtypes, content_hash, profile
+            FROM file_blobs WHERE content_hash = ?
+        ''', (file_id, user_id, filename, file_size, content_hash))
+        copy_summaries(cursor, content_hash, file_id)
+        conn.commit()
+        conn.close()
+        return True
     
-    def _store_in_db(self, file_id, user_id, filename, file_content, file_size, total_records, columns_json):
+    def _store_in_db(self, file_id, user_id, filename, content_hash, data, file_size, total_records, columns_json,
+                     data_format, dtypes_json, profile_json, summaries=None):
         """Store file in database"""
         conn = get_session()
         cursor = conn.cursor()
+        # The same content may have been stored concurrently, in which case
+        # this upload just takes another reference to it
         cursor.execute('''
-            INSERT INTO files (file_id, user_id, filename, data, file_size, total_records, columns)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (file_id, user_id, filename, file_content.encode('utf-8'), file_size, total_records, columns_json))
+            INSERT INTO file_blobs (content_hash, data, data_format, dtypes, total_records, columns, profile, ref_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+            ON CONFLICT(content_hash) DO UPDATE SET ref_count = ref_count + 1
+        ''', (content_hash, data, data_format, dtypes_json, total_records, columns_json, profile_json))
+        cursor.execute('''
+            INSERT INTO files (file_id, user_id, filename, data, file_size, total_records, columns,
+                               data_format, dtypes, content_hash, profile)
+            VALUES (?, ?, ?, X'', ?, ?, ?, ?, ?, ?, ?)
+        ''', (file_id, user_id, filename, file_size, total_records, columns_json, data_format, dtypes_json,
+              content_hash, profile_json))
+        if summaries is not None:
+            insert_summaries(cursor, file_id, summaries)
         conn.commit()
         conn.close()
     
@@ -107,39 +451,108 @@ class HybridStorageManager:
         """Load file from database"""
         conn = get_session()
         cursor = conn.cursor()
-        cursor.execute('SELECT data FROM files WHERE file_id = ? AND user_id = ?', (file_id, user_id))
+        cursor.execute('SELECT content_hash FROM files WHERE file_id = ? AND user_id = ?', (file_id, user_id))
         record = cursor.fetchone()
         
-        if record:
-            # Decode the data and create DataFrame
-            file_content = record[0].decode('utf-8')
-            df = pd.read_csv(io.StringIO(file_content))
-            
-            # Move this file to memory (evicting oldest if needed)
-            if len(self.in_memory_files[user_id]) == self.max_files_per_user:
-                self.in_memory_files[user_id].popleft()
-            self.in_memory_files[user_id].append((file_id, df))
-            
+        if record is None:
+            conn.close()
+            return None
+        
+        content_hash = record[0]
+        if content_hash is not None:
+            # Another handle to the same content may already be in memory
+            df = self._get_shared_frame(content_hash)
+            if df is None:
+                cursor.execute('SELECT data, data_format, dtypes FROM file_blobs WHERE content_hash = ?',
+                               (content_hash,))
+                data, data_format, dtypes_json = cursor.fetchone()
+                df = self._share_frame(content_hash, decode_frame(data, data_format, dtypes_json))
             conn.close()
             return df
         
+        # Files stored before deduplication keep their data inline
+        cursor.execute('SELECT data, data_format, dtypes FROM files WHERE file_id = ?', (file_id,))
+        data, data_format, dtypes_json = cursor.fetchone()
+        df = decode_frame(data, data_format, dtypes_json)
+        
+        # Legacy CSV rows are converted the first time they are read
+        if data_format == FORMAT_CSV:
+            self._rewrite_as_columnar(cursor, file_id, df)
+            conn.commit()
+        
         conn.close()
-        return None
+        return df
     
-    def delete_file(self, user_id, file_id):
-        """Delete a file from both memory and database"""
-        # Remove from memory
-        self.in_memory_files[user_id] = deque(
-            [(fid, df) for fid, df in self.in_memory_files[user_id] if fid != file_id],
-            maxlen=self.max_files_per_user
+    def _rewrite_as_columnar(self, cursor, file_id, df):
+        """Replace a legacy CSV BLOB with its columnar encoding"""
+        data, data_format, dtypes_json = encode_frame(df)
+        cursor.execute(
+            'UPDATE files SET data = ?, data_format = ?, dtypes = ? WHERE file_id = ?',
+            (data, data_format, dtypes_json, file_id)
         )
-        
-        # Remove from database
+    
+    def migrate_csv_blobs(self, batch_size=100):
+        """Convert every remaining CSV BLOB row to columnar storage, returns rows migrated"""
+        migrated = 0
         conn = get_session()
         cursor = conn.cursor()
-        cursor.execute('DELETE FROM files WHERE file_id = ? AND user_id = ?', (file_id, user_id))
-        conn.commit()
+        
+        while True:
+            cursor.execute('SELECT file_id, data FROM files WHERE data_format = ? AND content_hash IS NULL LIMIT ?',
+                           (FORMAT_CSV, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            
+            for file_id, data in rows:
+                df = decode_frame(data, FORMAT_CSV, None)
+                self._rewrite_as_columnar(cursor, file_id, df)
+                migrated += 1
+            conn.commit()
+        
         conn.close()
+        return migrated
+    
+    def delete_file(self, user_id, file_id):
+        """Delete a file from both memory and database"""
+        with self._file_locks(file_id):
+            # Remove from database first so a concurrent spill sees it is gone
+            conn = get_session()
+            cursor = conn.cursor()
+            cursor.execute('SELECT content_hash FROM files WHERE file_id = ? AND user_id = ?', (file_id, user_id))
+            record = cursor.fetchone()
+            cursor.execute('DELETE FROM files WHERE file_id = ? AND user_id = ?', (file_id, user_id))
+            deleted = cursor.rowcount > 0
+            if deleted:
+                delete_summaries(cursor, file_id)
+            
+            # Drop the shared blob only when its last reference is gone
+            if deleted and record and record[0]:
+                cursor.execute('UPDATE file_blobs SET ref_count = ref_count - 1 WHERE content_hash = ?', (record[0],))
+                cursor.execute('DELETE FROM file_blobs WHERE content_hash = ? AND ref_count <= 0', (record[0],))
+            conn.commit()
+            conn.close()
+            
+            # Remove from memory, derived values and the spill tier
+            self.in_memory_files.pop(user_id, file_id)
+            for key, _ in self.derived_values.items_for_owner(user_id):
+                if key[0] == file_id:
+                    self.derived_values.pop(user_id, key)
+            if self.spilled_files is not None:
+                self.spilled_files.pop(user_id, file_id)
+    
+    def get_cache_stats(self):
+        """Get hit/miss/eviction counters for the in-memory cache and spill tier"""
+        stats = self.in_memory_files.stats()
+        stats['derived'] = self.derived_values.stats()
+        if self.spilled_files is not None:
+            stats['spill'] = self.spilled_files.stats()
+        stats['loads'] = self._loads.stats()
+        return stats
+
+def hash_content(content_bytes):
+    """Content address of an upload"""
+    return hashlib.blake2b(content_bytes, digest_size=32).hexdigest()
 
 # Global storage manager instance
 storage_manager = HybridStorageManager() 
\ No newline at end of file
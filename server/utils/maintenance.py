@@ -0,0 +1,103 @@
+# utils/maintenance.py
+# 2026-10-18 22:10:00 UTC
+# In-process scheduler for periodic database cleanup: expired sessions, orphaned files, VACUUM, optimize
+
+import threading
+import time
+from models import get_session
+from config import MAINTENANCE_INTERVAL_SECONDS, MAINTENANCE_VACUUM_PAGES
+from utils.hybrid_storage import storage_manager
+from utils.user_manager import user_manager
+from utils.usage_store import purge_expired_usage
+
+
+class MaintenanceScheduler:
+    """
+    Runs run_once() every `interval` seconds on a daemon thread.
+
+    Each run removes sessions idle for more than 24 hours, deletes the files
+    of users left without any session (through storage_manager so shared blobs,
+    summaries and caches are released too), purges usage counter buckets that
+    left their window, returns up to vacuum_pages free pages to the OS with
+    incremental VACUUM, and lets SQLite refresh its query planner statistics
+    with PRAGMA optimize. Every step's row count and run time is logged.
+    """
+
+    def __init__(self, interval=MAINTENANCE_INTERVAL_SECONDS, vacuum_pages=MAINTENANCE_VACUUM_PAGES):
+        self.interval = interval
+        self.vacuum_pages = vacuum_pages
+        self._thread = None
+        self._stop = threading.Event()
+        self._run_lock = threading.Lock()
+        self.last_report = None
+
+    def start(self):
+        """Start the background thread (no-op when disabled or already running)"""
+        if not self.interval or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='database-maintenance', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"⚠️  Database maintenance failed: {e}")
+
+    def run_once(self):
+        """Run every maintenance step now; returns {step: {'rows': n, 'ms': t}}"""
+        with self._run_lock:
+            report = {}
+            started = time.perf_counter()
+
+            self._step(report, 'expired_sessions', user_manager.cleanup_expired_sessions)
+            self._step(report, 'orphaned_files', storage_manager.delete_orphaned_files)
+            self._step(report, 'orphaned_spills', storage_manager.cleanup_orphaned_spills)
+            self._step(report, 'expired_usage', purge_expired_usage)
+            self._step(report, 'vacuumed_pages', self._incremental_vacuum)
+            self._step(report, 'optimize', self._optimize)
+
+            total_ms = (time.perf_counter() - started) * 1000
+            steps = ', '.join(f"{name} {step['rows']} ({step['ms']:.0f} ms)" for name, step in report.items())
+            print(f"🧹 Database maintenance in {total_ms:.0f} ms: {steps}")
+            self.last_report = report
+            return report
+
+    @staticmethod
+    def _step(report, name, fn):
+        started = time.perf_counter()
+        rows = fn()
+        report[name] = {'rows': int(rows or 0), 'ms': (time.perf_counter() - started) * 1000}
+
+    def _incremental_vacuum(self):
+        """Free up to vacuum_pages pages; returns how many were released"""
+        conn = get_session()
+        try:
+            before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            # execute() steps this pragma only once (freeing one page); executescript runs it to completion
+            conn.executescript(f'PRAGMA incremental_vacuum({int(self.vacuum_pages)});')
+            after = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        finally:
+            conn.close()
+        return before - after
+
+    @staticmethod
+    def _optimize():
+        conn = get_session()
+        try:
+            conn.execute('PRAGMA optimize').fetchall()
+        finally:
+            conn.close()
+        return 0
+
+
+# Global scheduler instance, started by app.py
+maintenance_scheduler = MaintenanceScheduler()
@@ -0,0 +1,135 @@
+# utils/pagination.py
+# 2026-10-18 17:00:00 UTC
+# Row windows and column projection for file data requests, with opaque continuation tokens
+
+import base64
+import json
+from config import FILE_PAGE_MAX_ROWS
+
+
+class InvalidPageRequest(ValueError):
+    """Raised for malformed offset/limit/rows/columns/cursor parameters"""
+
+
+def parse_page_request(args, file_id, columns, total_rows):
+    """
+    Read the window and projection of a file data request from query args.
+
+    Supported parameters:
+      offset, limit  - first row (0-based) and number of rows
+      rows=start:end - half-open row range, an alternative to offset/limit
+      columns=a,b    - comma-separated subset of the (cleaned) column names
+      cursor         - continuation token from a previous response; carries
+                       its own offset, limit and columns
+
+    Returns {'offset', 'limit', 'columns'}; limit is None when the request
+    doesn't ask for a window (every remaining row, as before pagination).
+    """
+    cursor = args.get('cursor')
+    if cursor:
+        page = decode_cursor(cursor, file_id)
+    else:
+        page = {
+            'offset': _int_arg(args, 'offset', 0),
+            'limit': _int_arg(args, 'limit', None),
+            'columns': _columns_arg(args.get('columns'))
+        }
+        if args.get('rows'):
+            if 'offset' in args or 'limit' in args:
+                raise InvalidPageRequest("Use either 'rows' or 'offset'/'limit', not both")
+            page['offset'], page['limit'] = _parse_row_range(args['rows'])
+
+    if page['offset'] < 0:
+        raise InvalidPageRequest("'offset' must not be negative")
+    if page['limit'] is not None:
+        if page['limit'] <= 0:
+            raise InvalidPageRequest("'limit' must be positive")
+        page['limit'] = min(page['limit'], FILE_PAGE_MAX_ROWS)
+
+    if page['columns'] is not None:
+        unknown = [col for col in page['columns'] if col not in columns]
+        if unknown:
+            raise InvalidPageRequest(f"Unknown columns: {', '.join(unknown)}")
+
+    page['offset'] = min(page['offset'], total_rows)
+    return page
+
+
+def slice_frame(df, page):
+    """Select the requested rows and columns (positional, without copying the rest)"""
+    end = None if page['limit'] is None else page['offset'] + page['limit']
+    window = df.iloc[page['offset']:end]
+    if page['columns'] is not None:
+        window = window[page['columns']]
+    return window
+
+
+def page_info(page, returned_rows, total_rows, file_id):
+    """Response fields describing the window and how to fetch the next one"""
+    next_offset = page['offset'] + returned_rows
+    next_cursor = None
+    if next_offset < total_rows:
+        next_cursor = encode_cursor(file_id, next_offset, page['limit'], page['columns'])
+    return {
+        'total_rows': total_rows,
+        'offset': page['offset'],
+        'returned_rows': returned_rows,
+        'next_cursor': next_cursor
+    }
+
+
+def encode_cursor(file_id, offset, limit, columns):
+    """Opaque, URL-safe continuation token for the next window of a file"""
+    state = {'f': file_id, 'o': offset, 'l': limit, 'c': columns}
+    raw = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, file_id):
+    """Decode a continuation token, checking it belongs to this file"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        state = json.loads(raw)
+        page = {'offset': int(state['o']), 'limit': state['l'], 'columns': state['c']}
+        if page['limit'] is not None:
+            page['limit'] = int(page['limit'])
+        if page['columns'] is not None and not all(isinstance(col, str) for col in page['columns']):
+            raise ValueError('columns must be strings')
+    except (ValueError, KeyError, TypeError):
+        raise InvalidPageRequest('Invalid cursor')
+
+    if state.get('f') != file_id:
+        raise InvalidPageRequest('Cursor belongs to a different file')
+    return page
+
+
+def _int_arg(args, name, default):
+    value = args.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidPageRequest(f"'{name}' must be an integer")
+
+
+def _columns_arg(value):
+    if not value:
+        return None
+    return [col.strip() for col in value.split(',') if col.strip()]
+
+
+def _parse_row_range(value):
+    start, sep, end = value.partition(':')
+    if not sep:
+        raise InvalidPageRequest("'rows' must look like start:end")
+    try:
+        start = int(start) if start else 0
+        end = int(end) if end else None
+    except ValueError:
+        raise InvalidPageRequest("'rows' must look like start:end")
+    if end is None:
+        return start, None
+    if end <= start:
+        raise InvalidPageRequest("'rows' end must be greater than start")
+    return start, end - start
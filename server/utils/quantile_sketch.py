@@ -0,0 +1,163 @@
+# utils/quantile_sketch.py
+# 2026-10-18 21:30:00 UTC
+# Mergeable KLL quantile sketch for approximate medians and percentiles
+
+import struct
+import numpy as np
+from config import QUANTILE_SKETCH_K
+
+# Shrink factor of compactor capacities from the top level down (the KLL paper's c)
+_CAPACITY_DECAY = 2 / 3
+_MIN_CAPACITY = 8
+
+_HEADER = struct.Struct('<IQddI')  # k, count, min, max, number of levels
+
+_rng = np.random.default_rng()
+
+
+class QuantileSketch:
+    """
+    KLL sketch: a stack of compactors where items at level h stand for 2**h
+    values. A level over capacity is sorted and every other item (random
+    offset) moves up a level, so memory stays O(k) however many values are
+    added. Rank errors stay within 2/k of the count for a sketch built from
+    one array and within rank_error_bound(k) = 3/k after many merges.
+
+    Sketches of disjoint sets of values merge into a sketch of their union,
+    so percentiles of any combination of periods come from merging the
+    periods' sketches. min and max are tracked exactly.
+    """
+
+    def __init__(self, k=QUANTILE_SKETCH_K):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = np.nan
+        self.max = np.nan
+
+    @classmethod
+    def from_values(cls, values, k=QUANTILE_SKETCH_K):
+        """Sketch of a numeric array (NaN and infinities are ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        return cls.from_sorted(np.sort(values[np.isfinite(values)]), k)
+
+    @classmethod
+    def from_sorted(cls, values, k=QUANTILE_SKETCH_K):
+        """
+        Sketch of finite values already sorted ascending. Halving the sorted
+        array directly is the same as compacting it one level at a time, so a
+        whole column is sketched with a few slices instead of per-value updates.
+        """
+        sketch = cls(k)
+        sketch.count = len(values)
+        if sketch.count == 0:
+            return sketch
+        sketch.min, sketch.max = float(values[0]), float(values[-1])
+
+        levels = []
+        items = values
+        while len(items) > k:
+            # An odd item out stays at this level so total weight is preserved
+            kept = len(items) % 2
+            levels.append(items[len(items) - kept:].copy())
+            items = items[:len(items) - kept][_rng.integers(2)::2]
+        levels.append(items.copy())
+        sketch.levels = levels
+        return sketch
+
+    def merge(self, other):
+        """Fold another sketch into this one (in place) and return self"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.min, self.max = other.min, other.max
+        else:
+            self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self.count += other.count
+        self.k = max(self.k, other.k)
+
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            if len(items):
+                self.levels[h] = np.concatenate((self.levels[h], items))
+        self._compress()
+        return self
+
+    def _capacity(self, h):
+        depth = len(self.levels) - 1 - h
+        return max(_MIN_CAPACITY, int(np.ceil(self.k * _CAPACITY_DECAY ** depth)))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self._capacity(h):
+                items = np.sort(items)
+                kept = len(items) % 2
+                promoted = items[:len(items) - kept][_rng.integers(2)::2]
+                self.levels[h] = items[len(items) - kept:]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate((self.levels[h + 1], promoted))
+            h += 1
+
+    def quantiles(self, qs):
+        """Approximate values at fractions qs (0..1), or a list of None for an empty sketch"""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.count == 0:
+            return [None] * len(qs)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+
+        positions = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+        values = items[np.minimum(positions, len(items) - 1)]
+        values = np.where(qs <= 0, self.min, np.where(qs >= 1, self.max, values))
+        return [float(value) for value in values]
+
+    @property
+    def nbytes(self):
+        return int(sum(level.nbytes for level in self.levels))
+
+    def to_bytes(self):
+        sizes = [len(level) for level in self.levels]
+        return (_HEADER.pack(self.k, self.count, self.min, self.max, len(sizes))
+                + struct.pack(f'<{len(sizes)}I', *sizes)
+                + np.concatenate(self.levels).astype('<f8').tobytes())
+
+    @classmethod
+    def from_bytes(cls, data):
+        k, count, min_value, max_value, n_levels = _HEADER.unpack_from(data)
+        offset = _HEADER.size
+        sizes = struct.unpack_from(f'<{n_levels}I', data, offset)
+        offset += 4 * n_levels
+        items = np.frombuffer(data, dtype='<f8', offset=offset).astype(np.float64)
+
+        sketch = cls(k)
+        sketch.count, sketch.min, sketch.max = count, min_value, max_value
+        sketch.levels = np.split(items, np.cumsum(sizes)[:-1]) if n_levels else [np.empty(0)]
+        return sketch
+
+
+def rank_error_bound(k=QUANTILE_SKETCH_K):
+    """Largest rank error, as a fraction of the count, of any quantile of a (merged) sketch"""
+    return 3 / k
+
+
+def sketch_groups(values, group_ids, n_groups, k=QUANTILE_SKETCH_K):
+    """
+    One sketch per group (group_ids in 0 .. n_groups-1): rows are bucketed by
+    group with one stable argsort, then each group's slice is sorted and
+    sketched directly. NaN and infinities are ignored.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    values, group_ids = values[finite], np.asarray(group_ids)[finite]
+    order = np.argsort(group_ids, kind='stable')
+    values, group_ids = values[order], group_ids[order]
+    bounds = np.searchsorted(group_ids, np.arange(n_groups + 1), side='left')
+    return [QuantileSketch.from_sorted(np.sort(values[bounds[g]:bounds[g + 1]]), k) for g in range(n_groups)]
@@ -0,0 +1,201 @@
+# utils/quarterly_summaries.py
+# 2026-10-18 20:10:00 UTC
+# Per-quarter statistics materialized at upload and stored in the quarterly_summaries table
+
+import json
+import numpy as np
+from utils.data_processor import date_parts
+from utils.quantile_sketch import QuantileSketch, sketch_groups
+
+# Period key of the row holding statistics over every row of the file
+TOTALS_PERIOD = (0, 0)
+
+_AGGREGATES = ['sum', 'mean', 'min', 'max']
+
+# Periods looked up per query, keeping bound parameters well under SQLite's limit
+_PERIOD_BATCH = 200
+
+
+def summary_date_columns(profile):
+    """{column: strptime format or None} for every column the profiler detected as a date"""
+    return {col: column_profile.get('date_format') for col, column_profile in (profile or {}).items()
+            if column_profile.get('is_date')}
+
+
+def summarize_quarters(df, profile):
+    """
+    Compute per-quarter statistics and quantile sketches for each profiled
+    date column. Returns (summary_rows, sketch_rows).
+
+    One groupby([year, quarter]) per date column aggregates every numeric
+    column at once. summary_rows are (date_column, year, quarter,
+    record_count, summary_json), including a TOTALS_PERIOD row per date column
+    with the statistics over the whole file. summary_json maps each numeric
+    column to {'sum', 'average', 'min', 'max'}. sketch_rows are (date_column,
+    year, quarter, column, sketch_bytes) for the same periods.
+    """
+    rows = []
+    sketch_rows = []
+    for date_column, date_format in summary_date_columns(profile).items():
+        if date_column not in df.columns:
+            continue
+
+        years, quarters = date_parts(df[date_column], date_format)
+        dated = quarters > 0
+        numeric = df.select_dtypes(include=['number']).drop(columns=[date_column], errors='ignore')
+
+        columns = list(numeric.columns)
+        # agg() raises on a frame without columns
+        totals = numeric.agg(_AGGREGATES).unstack() if columns else None
+        rows.append((date_column, *TOTALS_PERIOD, len(df), _summary_json(totals, columns)))
+
+        grouped = numeric[dated].groupby([years[dated], quarters[dated]])
+        stats = grouped.agg(_AGGREGATES) if columns else None
+        for (year, quarter), size in grouped.size().items():
+            period_stats = stats.loc[(year, quarter)] if stats is not None else None
+            rows.append((date_column, int(year), int(quarter), int(size), _summary_json(period_stats, columns)))
+
+        sketch_rows.extend(_sketch_rows(date_column, numeric, years, quarters, dated))
+    return rows, sketch_rows
+
+
+def _sketch_rows(date_column, numeric, years, quarters, dated):
+    """Quantile sketches of each numeric column for the whole file and each quarter"""
+    keys, group_ids = np.unique(years[dated].astype(np.int32) * 4 + (quarters[dated] - 1), return_inverse=True)
+    periods = [(int(key // 4), int(key % 4) + 1) for key in keys]
+    rows = []
+    for col in numeric.columns:
+        values = numeric[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        rows.append((date_column, *TOTALS_PERIOD, str(col), QuantileSketch.from_values(values).to_bytes()))
+        for (year, quarter), sketch in zip(periods, sketch_groups(values[dated], group_ids, len(periods))):
+            rows.append((date_column, year, quarter, str(col), sketch.to_bytes()))
+    return rows
+
+
+def _summary_json(stats, columns):
+    """{column: {'sum', 'average', 'min', 'max'}} from a Series indexed by (column, aggregate)"""
+    return json.dumps({
+        str(col): {
+            'sum': float(stats[(col, 'sum')]),
+            'average': float(stats[(col, 'mean')]),
+            'min': float(stats[(col, 'min')]),
+            'max': float(stats[(col, 'max')])
+        }
+        for col in columns
+    })
+
+
+def empty_summary(totals_summary):
+    """Statistics of a quarter with no rows, matching pandas' results over an empty frame"""
+    nan = float('nan')
+    return {col: {'sum': 0.0, 'average': nan, 'min': nan, 'max': nan} for col in totals_summary}
+
+
+def insert_summaries(cursor, file_id, summaries):
+    """Store the (summary_rows, sketch_rows) returned by summarize_quarters"""
+    summary_rows, sketch_rows = summaries
+    cursor.executemany('''
+        INSERT OR IGNORE INTO quarterly_summaries (file_id, date_column, year, quarter, record_count, summary_data)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(file_id, *row) for row in summary_rows])
+    cursor.executemany('''
+        INSERT OR IGNORE INTO quarterly_sketches (file_id, date_column, year, quarter, column_name, sketch)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(file_id, *row) for row in sketch_rows])
+
+
+def copy_summaries(cursor, content_hash, file_id):
+    """Give a deduplicated upload the summaries of another file with the same content"""
+    cursor.execute('''
+        INSERT OR IGNORE INTO quarterly_summaries (file_id, date_column, year, quarter, record_count, summary_data)
+        SELECT ?, date_column, year, quarter, record_count, summary_data
+        FROM quarterly_summaries
+        WHERE file_id = (SELECT file_id FROM files WHERE content_hash = ? AND file_id != ?
+                         AND EXISTS (SELECT 1 FROM quarterly_summaries q WHERE q.file_id = files.file_id)
+                         LIMIT 1)
+    ''', (file_id, content_hash, file_id))
+    cursor.execute('''
+        INSERT OR IGNORE INTO quarterly_sketches (file_id, date_column, year, quarter, column_name, sketch)
+        SELECT ?, date_column, year, quarter, column_name, sketch
+        FROM quarterly_sketches
+        WHERE file_id = (SELECT file_id FROM files WHERE content_hash = ? AND file_id != ?
+                         AND EXISTS (SELECT 1 FROM quarterly_sketches q WHERE q.file_id = files.file_id)
+                         LIMIT 1)
+    ''', (file_id, content_hash, file_id))
+
+
+def delete_summaries(cursor, file_id):
+    cursor.execute('DELETE FROM quarterly_summaries WHERE file_id = ?', (file_id,))
+    cursor.execute('DELETE FROM quarterly_sketches WHERE file_id = ?', (file_id,))
+
+
+def has_summaries(cursor, file_id):
+    """Whether the file has both summaries and sketches (uploads predating sketches have only summaries)"""
+    cursor.execute('''
+        SELECT EXISTS (SELECT 1 FROM quarterly_summaries WHERE file_id = ?)
+           AND EXISTS (SELECT 1 FROM quarterly_sketches WHERE file_id = ?)
+    ''', (file_id, file_id))
+    return bool(cursor.fetchone()[0])
+
+
+def fetch_summary(cursor, file_id, date_column, year, quarter):
+    """
+    (record_count, {column: stats}) for one quarter, or TOTALS_PERIOD for the
+    whole file. Returns None when the date column wasn't summarized.
+    """
+    cursor.execute('''
+        SELECT year, quarter, record_count, summary_data FROM quarterly_summaries
+        WHERE file_id = ? AND date_column = ? AND ((year = ? AND quarter = ?) OR (year = ? AND quarter = ?))
+    ''', (file_id, date_column, year, quarter, *TOTALS_PERIOD))
+    rows = {(row[0], row[1]): (row[2], json.loads(row[3])) for row in cursor.fetchall()}
+
+    if TOTALS_PERIOD not in rows:
+        return None
+    if (year, quarter) in rows:
+        return rows[(year, quarter)]
+    return 0, empty_summary(rows[TOTALS_PERIOD][1])
+
+
+def fetch_quarters(cursor, file_id, date_column):
+    """Sorted (year, quarter) pairs with data, or None when the date column wasn't summarized"""
+    cursor.execute('''
+        SELECT year, quarter FROM quarterly_summaries
+        WHERE file_id = ? AND date_column = ?
+        ORDER BY year, quarter
+    ''', (file_id, date_column))
+    periods = [(row[0], row[1]) for row in cursor.fetchall()]
+    if TOTALS_PERIOD not in periods:
+        return None
+    return [period for period in periods if period != TOTALS_PERIOD]
+
+
+def fetch_sketches(cursor, file_id, date_column, periods):
+    """
+    {column: sketch} merged over the given (year, quarter) periods (use
+    [TOTALS_PERIOD] for the whole file), or None when the date column wasn't
+    summarized. Periods without data contribute nothing.
+    """
+    if fetch_summary(cursor, file_id, date_column, *TOTALS_PERIOD) is None:
+        return None
+
+    periods = sorted(set(periods))
+    merged = {}
+    for start in range(0, len(periods), _PERIOD_BATCH):
+        batch = periods[start:start + _PERIOD_BATCH]
+        conditions = ' OR '.join(['(year = ? AND quarter = ?)'] * len(batch))
+        cursor.execute(f'''
+            SELECT column_name, sketch FROM quarterly_sketches
+            WHERE file_id = ? AND date_column = ? AND ({conditions})
+        ''', (file_id, date_column, *[value for period in batch for value in period]))
+        for column_name, sketch in cursor.fetchall():
+            sketch = QuantileSketch.from_bytes(sketch)
+            if column_name in merged:
+                merged[column_name].merge(sketch)
+            else:
+                merged[column_name] = sketch
+    return merged
+
+
+def percentile_name(percentile):
+    """'median' for 50, otherwise 'p90', 'p99', 'p99.9', ..."""
+    return 'median' if percentile == 50 else f'p{percentile:g}'
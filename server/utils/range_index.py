@@ -0,0 +1,178 @@
+# utils/range_index.py
+# 2026-10-18 21:00:00 UTC
+# Sorted time index with prefix sums: statistics for any date range by binary search
+
+import numpy as np
+import pandas as pd
+from utils.aggregation import to_numeric
+
+PERIOD_MONTH = 'month'
+PERIOD_WEEK = 'week'
+PERIOD_QUARTER = 'quarter'
+PERIOD_YEAR = 'year'
+PERIODS = (PERIOD_MONTH, PERIOD_WEEK, PERIOD_QUARTER, PERIOD_YEAR)
+
+# Months per period for the month-based periods
+_PERIOD_MONTHS = {PERIOD_MONTH: 1, PERIOD_QUARTER: 3, PERIOD_YEAR: 12}
+
+_ONE_MICROSECOND = np.timedelta64(1, 'us')
+_ONE_DAY = np.timedelta64(1, 'D')
+
+
+class InvalidRangeRequest(ValueError):
+    """Raised for unparseable dates, unknown periods or too many periods"""
+
+
+class TimeRangeIndex:
+    """
+    A date column's rows in time order, with prefix sums of numeric columns.
+
+    times holds the parseable dates sorted ascending as datetime64[us] (rows
+    whose date didn't parse are left out). For each numeric column, sums[i]
+    and counts[i] are the sum and number of non-null values of the first i
+    sorted rows, so any half-open range [start, end) takes two searchsorted
+    calls and a subtraction per column, whatever its length.
+    """
+
+    def __init__(self, times, values):
+        order = np.argsort(times, kind='stable')
+        self.times = times[order]
+        self.sums = {}
+        self.counts = {}
+        for name, column in values.items():
+            column = column[order]
+            present = ~np.isnan(column)
+            self.sums[name] = np.concatenate(([0.0], np.cumsum(np.where(present, column, 0.0))))
+            self.counts[name] = np.concatenate(([0], np.cumsum(present, dtype=np.int64)))
+
+    @classmethod
+    def build(cls, df, date_column, date_format, columns):
+        """Index df by date_column (parsed with date_format) over the given numeric columns"""
+        dates = pd.to_datetime(df[date_column], format=date_format, errors='coerce')
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_localize(None)
+        dates = dates.to_numpy().astype('datetime64[us]')
+        dated = ~np.isnat(dates)
+        values = {col: to_numeric(df[col]).to_numpy(dtype=np.float64, na_value=np.nan)[dated] for col in columns}
+        return cls(dates[dated], values)
+
+    @property
+    def columns(self):
+        return list(self.sums)
+
+    @property
+    def nbytes(self):
+        return int(self.times.nbytes + sum(a.nbytes for a in self.sums.values())
+                   + sum(a.nbytes for a in self.counts.values()))
+
+    def bounds(self):
+        """(first date, start of the day after the last date), or (None, None) for an empty index"""
+        if len(self.times) == 0:
+            return None, None
+        return self.times[0], (self.times[-1].astype('datetime64[D]') + _ONE_DAY).astype('datetime64[us]')
+
+    def stats(self, starts, ends, columns):
+        """
+        Statistics of the half-open ranges [starts[i], ends[i]): returns
+        (row_counts, {column: (sums, counts)}) as arrays aligned with starts
+        """
+        lo = np.searchsorted(self.times, starts, side='left')
+        hi = np.searchsorted(self.times, ends, side='left')
+        hi = np.maximum(hi, lo)
+        return hi - lo, {col: (self.sums[col][hi] - self.sums[col][lo], self.counts[col][hi] - self.counts[col][lo])
+                         for col in columns}
+
+
+def parse_bound(value, name, is_end=False):
+    """
+    datetime64[us] from a request date. End dates are inclusive: a date
+    without a time covers that whole day. Returns the exclusive bound.
+    """
+    if value in (None, ''):
+        return None
+    try:
+        timestamp = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        raise InvalidRangeRequest(f"'{name}' is not a date: {value!r}")
+    if timestamp is pd.NaT:
+        raise InvalidRangeRequest(f"'{name}' is not a date: {value!r}")
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(None)
+    bound = np.datetime64(timestamp.to_datetime64(), 'us')
+    if is_end:
+        bound += _ONE_DAY if timestamp == timestamp.normalize() else _ONE_MICROSECOND
+    return bound
+
+
+def period_edges(start, end, period, fiscal_year_start=1, max_periods=None):
+    """
+    Boundaries of the periods overlapping [start, end), clipped to it, plus
+    a label per period. Weeks start on Monday; quarters and years start in
+    fiscal_year_start (1 = calendar quarters and years).
+    """
+    if period not in PERIODS:
+        raise InvalidRangeRequest(f"Unsupported period '{period}', use one of: {', '.join(PERIODS)}")
+
+    first = pd.Timestamp(start).normalize()
+    if period == PERIOD_WEEK:
+        first -= pd.Timedelta(days=first.weekday())
+        step = pd.DateOffset(weeks=1)
+    else:
+        months = _PERIOD_MONTHS[period]
+        first = first.replace(day=1)
+        first -= pd.DateOffset(months=(first.month - fiscal_year_start) % months)
+        step = pd.DateOffset(months=months)
+
+    last = pd.Timestamp(end - _ONE_MICROSECOND)
+    count = _period_count(first, last, period)
+    if max_periods is not None and count > max_periods:
+        raise InvalidRangeRequest(f'The range spans {count} {period}s, at most {max_periods} are allowed')
+
+    period_starts = pd.DatetimeIndex([first + step * i for i in range(count + 1)]).as_unit('us').to_numpy()
+    edges = np.maximum(np.minimum(period_starts, end), start)
+    labels = [_period_label(pd.Timestamp(s), period, fiscal_year_start) for s in period_starts[:-1]]
+    return edges[:-1], edges[1:], labels
+
+
+def _period_count(first, last, period):
+    if period == PERIOD_WEEK:
+        return (last.normalize() - first).days // 7 + 1
+    months = (last.year - first.year) * 12 + last.month - first.month
+    return months // _PERIOD_MONTHS[period] + 1
+
+
+def _period_label(period_start, period, fiscal_year_start):
+    year, month = period_start.year, period_start.month
+    if period == PERIOD_MONTH:
+        return f'{year}-{month:02d}'
+    if period == PERIOD_WEEK:
+        iso = period_start.isocalendar()
+        return f'{iso[0]}-W{iso[1]:02d}'
+
+    # Fiscal years are named after the calendar year they end in
+    if fiscal_year_start == 1:
+        if period == PERIOD_QUARTER:
+            return f'Q{(month - 1) // 3 + 1} {year}'
+        return str(year)
+    fiscal_year = year + 1 if month >= fiscal_year_start else year
+    if period == PERIOD_QUARTER:
+        return f'Q{(month - fiscal_year_start) % 12 // 3 + 1} FY{fiscal_year}'
+    return f'FY{fiscal_year}'
+
+
+def range_payloads(row_counts, column_stats):
+    """JSON-ready statistics per range: {'totalRecords', 'stats': {column: {'sum', 'mean', 'count'}}}"""
+    return [
+        {
+            'totalRecords': int(rows),
+            'stats': {
+                col: {
+                    'sum': float(sums[i]),
+                    'mean': float(sums[i] / counts[i]) if counts[i] else None,
+                    'count': int(counts[i])
+                }
+                for col, (sums, counts) in column_stats.items()
+            }
+        }
+        for i, rows in enumerate(row_counts)
+    ]
@@ -0,0 +1,213 @@
+# utils/serializers.py
+# 2026-10-18 16:05:00 UTC
+# Content-negotiated encodings for DataFrame responses: row JSON, columnar JSON, Arrow IPC, MessagePack
+
+import base64
+import datetime
+import io
+import json
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+FORMAT_RECORDS = 'records'  # [{column: value}, ...] - the original layout
+FORMAT_COLUMNS = 'columns'  # {column: [values]} with typed arrays for numbers
+FORMAT_ARROW = 'arrow'
+FORMAT_MSGPACK = 'msgpack'
+
+MIMETYPES = {
+    FORMAT_RECORDS: 'application/json',
+    FORMAT_COLUMNS: 'application/vnd.getcharty.columns+json',
+    FORMAT_ARROW: 'application/vnd.apache.arrow.stream',
+    FORMAT_MSGPACK: 'application/msgpack'
+}
+
+FORMAT_ALIASES = {'json': FORMAT_RECORDS, 'columnar': FORMAT_COLUMNS, 'msgpack': FORMAT_MSGPACK}
+
+# Arrow schema metadata key that carries the non-tabular part of the response
+ARROW_METADATA_KEY = b'getcharty'
+
+# Integer ranges for narrowing 64-bit columns to dtypes Plotly typed arrays support
+_INT32 = np.iinfo(np.int32)
+_UINT32 = np.iinfo(np.uint32)
+
+
+class UnsupportedFormat(ValueError):
+    """Raised when a client asks for a response format this server can't produce"""
+
+    def __init__(self, requested):
+        self.requested = requested
+        super().__init__(f"Unsupported response format '{requested}'. "
+                         f"Available: {', '.join(available_formats())}")
+
+
+def available_formats():
+    """Response formats supported with the installed libraries"""
+    formats = [FORMAT_RECORDS, FORMAT_COLUMNS]
+    if HAS_PYARROW:
+        formats.append(FORMAT_ARROW)
+    if HAS_MSGPACK:
+        formats.append(FORMAT_MSGPACK)
+    return formats
+
+
+def negotiate_format(req):
+    """
+    Pick the response format for a Flask request.
+
+    An explicit ?format= query parameter wins, and naming a format this server
+    can't produce raises UnsupportedFormat. Otherwise the Accept header is
+    matched against the supported media types; clients that send none, accept
+    anything, or accept nothing we produce get the original row-oriented JSON.
+    """
+    requested = req.args.get('format')
+    if requested:
+        fmt = FORMAT_ALIASES.get(requested.lower(), requested.lower())
+        if fmt not in available_formats():
+            raise UnsupportedFormat(requested)
+        return fmt
+
+    mimetypes = [MIMETYPES[fmt] for fmt in available_formats()]
+    best = req.accept_mimetypes.best_match(mimetypes)
+    if best is None:
+        return FORMAT_RECORDS
+    return next(fmt for fmt in available_formats() if MIMETYPES[fmt] == best)
+
+
+def encode_frame_payload(df, payload, fmt):
+    """
+    Encode a DataFrame under payload['data'] in the given format.
+
+    payload holds the rest of the response (chart elements, column list, ...).
+    Returns (body_bytes, mimetype).
+    """
+    if fmt == FORMAT_RECORDS:
+        body = dict(payload, data=frame_to_records(df))
+        return dumps_json(body), MIMETYPES[fmt]
+
+    if fmt == FORMAT_COLUMNS:
+        body = dict(payload, format=FORMAT_COLUMNS, data=frame_to_columns(df, binary=False))
+        return dumps_json(body), MIMETYPES[fmt]
+
+    if fmt == FORMAT_MSGPACK and HAS_MSGPACK:
+        body = dict(payload, format=FORMAT_COLUMNS, data=frame_to_columns(df, binary=True))
+        return msgpack.packb(body, default=_default, use_bin_type=True), MIMETYPES[fmt]
+
+    if fmt == FORMAT_ARROW and HAS_PYARROW:
+        return frame_to_arrow_stream(df, payload), MIMETYPES[fmt]
+
+    raise UnsupportedFormat(fmt)
+
+
+def dumps_json(obj):
+    """Serialize to JSON bytes with orjson when installed, the standard library otherwise"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_default).encode('utf-8')
+
+
+def frame_to_records(df):
+    """
+    Convert a DataFrame to [{column: value}, ...] with None for every missing
+    value (NaN, NaT, pd.NA), so both JSON encoders write null.
+    """
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def frame_to_columns(df, binary=False):
+    """
+    Convert a DataFrame to {column: values}.
+
+    Numeric columns become Plotly typed arrays ({'dtype': 'f8', 'bdata': <base64>});
+    with binary=True bdata is left as raw bytes for binary encodings such as
+    MessagePack.
+    Other columns become plain lists with None for missing values.
+    """
+    return {str(col): column_values(df[col], binary) for col in df.columns}
+
+
+def column_values(series, binary=False):
+    """Encode one column as a typed array (numbers) or a list (everything else)"""
+    typed = _typed_array(series)
+    if typed is not None:
+        data = typed.tobytes()
+        return {
+            'dtype': typed.dtype.str[1:],
+            'bdata': data if binary else base64.b64encode(data).decode('ascii')
+        }
+
+    if series.dtype.kind in 'mM':
+        return [None if pd.isna(value) else value.isoformat() for value in series]
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def _typed_array(series):
+    """Little-endian array in a dtype Plotly can decode, or None for non-numeric columns"""
+    kind = series.dtype.kind
+    if kind not in 'iuf' or not isinstance(series.dtype, np.dtype):
+        return None
+
+    values = series.to_numpy()
+    if kind == 'f':
+        return values.astype('<f4' if values.dtype.itemsize == 4 else '<f8', copy=False)
+
+    # Plotly has no 64-bit integer arrays; narrow when the values fit, else use doubles
+    if values.dtype.itemsize <= 4:
+        return values.astype(values.dtype.newbyteorder('<'), copy=False)
+    if len(values) == 0:
+        return values.astype('<i4')
+    low, high = values.min(), values.max()
+    if kind == 'i' and _INT32.min <= low and high <= _INT32.max:
+        return values.astype('<i4')
+    if kind == 'u' and high <= _UINT32.max:
+        return values.astype('<u4')
+    return values.astype('<f8')
+
+
+def frame_to_arrow_stream(df, payload):
+    """Encode a DataFrame as an Arrow IPC stream with the payload in the schema metadata"""
+    try:
+        table = pyarrow.Table.from_pandas(df, preserve_index=False)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        # Object columns mixing numbers and text can't be typed; send them as strings
+        text_columns = {col: 'string' for col in df.columns if df[col].dtype == object}
+        table = pyarrow.Table.from_pandas(df.astype(text_columns), preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[ARROW_METADATA_KEY] = dumps_json(payload)
+    table = table.replace_schema_metadata(metadata)
+
+    sink = io.BytesIO()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _default(value):
+    """Serialize NumPy/pandas scalars and timestamps the JSON encoders don't handle natively"""
+    if value is pd.NaT:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not serializable')
@@ -0,0 +1,71 @@
+# utils/single_flight.py
+# 2026-10-18 12:02:00 UTC
+# Concurrency helpers: single-flight call deduplication and striped locks
+
+import threading
+import zlib
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function; callers that arrive while it
+    is running wait for it and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        """Return how many calls ran and how many were served by another caller's run"""
+        with self._lock:
+            return {'executions': self.executions, 'shared': self.shared}
+
+
+class StripedLock:
+    """Fixed pool of locks selected by hashing a key, for per-item locking without per-item lock objects"""
+
+    def __init__(self, stripes=64):
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def __call__(self, key):
+        return self._locks[zlib.crc32(str(key).encode('utf-8')) % len(self._locks)]
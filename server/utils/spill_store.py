@@ -0,0 +1,197 @@
+# utils/spill_store.py
+# 2026-10-18 11:20:00 UTC
+# Memory-mapped on-disk tier for DataFrames evicted from the in-memory cache
+
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from utils.columnar import column_to_arrays, arrays_to_column
+
+META_FILENAME = 'meta.json'
+TMP_PREFIX = '.tmp-'
+
+
+class SpillStore:
+    """
+    Size-bounded directory of spilled DataFrames, one per-column .npy file each.
+
+    Layout: <directory>/<owner>/<key>/{meta.json, c0.npy, u0.npy, ...}
+    Numeric and datetime columns are reopened with mmap_mode='r', so loading is
+    close to free and the OS page cache decides what stays resident. Text
+    columns are stored as int32 codes plus their distinct values.
+
+    The index is guarded by a lock; column files are written outside it and
+    renamed into place under it.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # {(owner, key): nbytes} in LRU -> MRU order
+        self._index = OrderedDict()
+        self.current_bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._adopt_existing()
+
+    def _path(self, owner, key):
+        return os.path.join(self.directory, owner, key)
+
+    def _adopt_existing(self):
+        """Index complete spill directories left by a previous process, drop partial ones"""
+        found = []
+        for owner in os.listdir(self.directory):
+            owner_dir = os.path.join(self.directory, owner)
+            if not os.path.isdir(owner_dir):
+                continue
+            for key in os.listdir(owner_dir):
+                path = os.path.join(owner_dir, key)
+                if key.startswith(TMP_PREFIX) or not os.path.isfile(os.path.join(path, META_FILENAME)):
+                    shutil.rmtree(path, ignore_errors=True)
+                    continue
+                found.append((os.path.getmtime(path), owner, key, _directory_size(path)))
+
+        for _, owner, key, nbytes in sorted(found):
+            self._index[(owner, key)] = nbytes
+            self.current_bytes += nbytes
+        self._enforce_limit()
+
+    def contains(self, owner, key):
+        with self._lock:
+            return (owner, key) in self._index
+
+    def put(self, owner, key, df):
+        """Write a DataFrame as per-column .npy files, evicting old spills to stay within budget"""
+        with self._lock:
+            if (owner, key) in self._index:
+                self._index.move_to_end((owner, key))
+                return True
+
+        owner_dir = os.path.join(self.directory, owner)
+
+        # Write into a temporary directory and rename it into place so readers
+        # never see a half-written spill
+        tmp_path = os.path.join(owner_dir, f'{TMP_PREFIX}{uuid.uuid4().hex}')
+        os.makedirs(tmp_path)
+        try:
+            meta = {
+                'columns': [str(col) for col in df.columns],
+                'dtypes': [str(dtype) for dtype in df.dtypes],
+                'text_columns': []
+            }
+            for i, col in enumerate(df.columns):
+                values, uniques = column_to_arrays(df[col])
+                np.save(os.path.join(tmp_path, f'c{i}.npy'), values, allow_pickle=False)
+                if uniques is not None:
+                    np.save(os.path.join(tmp_path, f'u{i}.npy'), uniques, allow_pickle=False)
+                    meta['text_columns'].append(i)
+
+            with open(os.path.join(tmp_path, META_FILENAME), 'w') as f:
+                json.dump(meta, f)
+
+            nbytes = _directory_size(tmp_path)
+            if nbytes > self.max_bytes:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                return False
+
+            with self._lock:
+                # Another thread may have spilled the same frame meanwhile
+                if (owner, key) in self._index:
+                    shutil.rmtree(tmp_path, ignore_errors=True)
+                    return True
+                os.replace(tmp_path, self._path(owner, key))
+                self._index[(owner, key)] = nbytes
+                self.current_bytes += nbytes
+                self._enforce_limit()
+        except (OSError, ValueError):
+            # ValueError: a column that np.save can only write as pickled objects
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        return True
+
+    def get(self, owner, key):
+        """Reopen a spilled DataFrame with memory-mapped columns, or None"""
+        with self._lock:
+            if (owner, key) not in self._index:
+                self.misses += 1
+                return None
+
+        path = self._path(owner, key)
+        try:
+            with open(os.path.join(path, META_FILENAME)) as f:
+                meta = json.load(f)
+
+            text_columns = set(meta['text_columns'])
+            columns = {}
+            for i, (name, dtype) in enumerate(zip(meta['columns'], meta['dtypes'])):
+                values = np.load(os.path.join(path, f'c{i}.npy'), mmap_mode='r', allow_pickle=False)
+                uniques = np.load(os.path.join(path, f'u{i}.npy'), allow_pickle=False) if i in text_columns else None
+                columns[name] = arrays_to_column(values, uniques, dtype, name)
+        except (OSError, ValueError, KeyError):
+            # Spill files were removed or damaged underneath us
+            with self._lock:
+                self.pop(owner, key)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if (owner, key) in self._index:
+                self._index.move_to_end((owner, key))
+            self.hits += 1
+        return pd.DataFrame(columns, columns=meta['columns'], copy=False)
+
+    def pop(self, owner, key):
+        """Remove a spilled DataFrame from disk"""
+        with self._lock:
+            nbytes = self._index.pop((owner, key), None)
+            if nbytes is None:
+                return False
+
+            self.current_bytes -= nbytes
+            shutil.rmtree(self._path(owner, key), ignore_errors=True)
+            try:
+                os.rmdir(os.path.join(self.directory, owner))
+            except OSError:
+                # Still holds other spills (or a spill being written)
+                pass
+            return True
+
+    def cleanup_orphans(self, live_keys):
+        """Remove spills whose (owner, key) is not in live_keys, returns the number removed"""
+        with self._lock:
+            orphans = [entry for entry in self._index if entry not in live_keys]
+            for owner, key in orphans:
+                self.pop(owner, key)
+            return len(orphans)
+
+    def _enforce_limit(self):
+        while self._index and self.current_bytes > self.max_bytes:
+            owner, key = next(iter(self._index))
+            self.pop(owner, key)
+            self.evictions += 1
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current disk usage"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._index),
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+def _directory_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
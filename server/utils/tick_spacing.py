@@ -0,0 +1,205 @@
+# utils/tick_spacing.py
+# 2026-10-18 19:20:00 UTC
+# Vectorized x-axis tick selection for time series labels (datetime64 in, Plotly xaxis config out)
+
+import calendar as _calendar_names
+from datetime import date
+import numpy as np
+import pandas as pd
+
+MONTH_NAMES = {
+    1: 'Jan', 2: 'Feb', 3: 'March', 4: 'April', 5: 'May', 6: 'June',
+    7: 'July', 8: 'Aug', 9: 'Sept', 10: 'Oct', 11: 'Nov', 12: 'Dec'
+}
+
+# Axis styling shared by every time-based spacing
+TICK_STYLE = {
+    'tickangle': 0,
+    'showticklabels': True,
+    'showgrid': False,
+    'ticks': 'outside',
+    'ticklen': 8,
+    'tickwidth': 2,
+    'tickcolor': 'black',
+    'showline': True,
+    'linecolor': 'black',
+    'linewidth': 1
+}
+
+
+class _Calendar:
+    """Calendar fields of the parseable labels, computed once per request"""
+
+    def __init__(self, dates):
+        dates = np.asarray(dates, dtype='datetime64[us]')
+        self.valid = ~np.isnat(dates)
+        self.positions = np.flatnonzero(self.valid)
+        index = pd.DatetimeIndex(dates[self.valid])
+        self.index = index
+        self.year = index.year.to_numpy()
+        self.month = index.month.to_numpy()
+        self.hour = index.hour.to_numpy()
+        self.weekday = index.weekday.to_numpy()
+
+
+def time_spacing(dates, x_labels, interval_type):
+    """
+    Pick and label x-axis ticks for a time series.
+
+    dates is a datetime64 array aligned with x_labels (NaT for labels that
+    aren't dates). Ticks are chosen with array masks and only the chosen ticks
+    are formatted.
+    """
+    calendar = _Calendar(dates)
+
+    if interval_type == 'hour':
+        # Every 6th hour: 0600, 1200, 1800, 2400
+        chosen = np.isin(calendar.hour, (0, 6, 12, 18))
+        return _tick_config(*_label(calendar, chosen, _hour_text))
+    if interval_type == 'day':
+        # Only Mondays
+        chosen = calendar.weekday == 0
+        return _tick_config(*_label(calendar, chosen, _monday_text))
+    if interval_type == 'week':
+        # Every 4th week, starting with the 4th label
+        chosen = (calendar.positions >= 3) & ((calendar.positions - 3) % 4 == 0)
+        return _tick_config(*_label(calendar, chosen, _day_month_year_text))
+    if interval_type == 'month':
+        # Every 3rd month: March, June, Sept, Dec
+        chosen = np.isin(calendar.month, (3, 6, 9, 12))
+        return _tick_config(*_label(calendar, chosen, _month_year_text))
+    if interval_type == 'quarter':
+        return _quarterly_spacing(calendar, x_labels)
+    if interval_type == 'year':
+        return _yearly_spacing(calendar, x_labels)
+    return apply_default_spacing(x_labels)
+
+
+def _label(calendar, chosen, formatter):
+    tickvals = calendar.positions[chosen]
+    ticktext = list(formatter(calendar.index[chosen])) if len(tickvals) else []
+    return _drop_irregular_last(tickvals.tolist(), ticktext)
+
+
+# Tick text is built from the calendar fields of the chosen ticks only; each
+# formatter matches the strftime pattern named in its docstring.
+
+def _hour_text(index):
+    """'%H:%M'"""
+    return [f"{hour:02d}:{minute:02d}" for hour, minute in zip(index.hour.to_numpy(), index.minute.to_numpy())]
+
+
+def _monday_text(index):
+    """'%a %m/%d' for ticks that are all Mondays"""
+    monday = _calendar_names.day_abbr[0]
+    return [f"{monday} {month:02d}/{day:02d}" for month, day in zip(index.month.to_numpy(), index.day.to_numpy())]
+
+
+def _day_month_year_text(index):
+    """'%d %B %Y'"""
+    years = _year_text(index.year.to_numpy())
+    month_names = list(_calendar_names.month_name)  # Locale lookups are slow; resolve them once
+    return [f"{day:02d} {month_names[month]} {years[year]}"
+            for day, month, year in zip(index.day.to_numpy(), index.month.to_numpy(), index.year.to_numpy())]
+
+
+def _year_text(years):
+    """{year: strftime('%Y')} for each distinct year (padding of years < 1000 is platform-specific)"""
+    return {year: date(year, 1, 1).strftime('%Y') for year in np.unique(years).tolist()}
+
+
+def _month_year_text(index):
+    months = index.month.to_numpy()
+    years = index.year.to_numpy()
+    return [f"{MONTH_NAMES[month]} {year}" for month, year in zip(months, years)]
+
+
+def _drop_irregular_last(tickvals, ticktext):
+    """Drop the final tick when its gap differs from the average earlier gap by more than 50%"""
+    if len(tickvals) > 2:
+        spacings = np.diff(tickvals)
+        avg_spacing = spacings[:-1].mean()
+        if abs(spacings[-1] - avg_spacing) > avg_spacing * 0.5:
+            tickvals = tickvals[:-1]
+            ticktext = ticktext[:-1]
+    return tickvals, ticktext
+
+
+def _quarterly_spacing(calendar, x_labels):
+    """Label the final quarter of each year; every quarter gets a minor tick"""
+    if len(calendar.positions) < 2:
+        return apply_default_spacing(x_labels)
+
+    # Latest month of each year (earliest label on ties), years in ascending order
+    order = np.lexsort((calendar.positions, -calendar.month, calendar.year))
+    _, firsts = np.unique(calendar.year[order], return_index=True)
+    picked = order[firsts]
+    tickvals = calendar.positions[picked].tolist()
+    ticktext = _month_year_text(calendar.index[picked])
+
+    # Drop the final label if it's not the last date of its year
+    if len(tickvals) > 1:
+        last = picked[-1]
+        year_dates = calendar.index[calendar.year == calendar.year[last]]
+        if calendar.index[last] != year_dates.max():
+            tickvals.pop()
+            ticktext.pop()
+
+    tickvals, ticktext = _drop_irregular_last(tickvals, ticktext)
+
+    config = _tick_config(tickvals, ticktext)
+    config['minor'] = {
+        'tickmode': 'array',
+        'tickvals': calendar.positions.tolist(),
+        'showgrid': False,
+        'ticks': 'outside',
+        'ticklen': 5,
+        'tickwidth': 1,
+        'tickcolor': 'black'
+    }
+    return config
+
+
+def _yearly_spacing(calendar, x_labels):
+    """Evenly spaced years: 1, 2, 5, 10 or 20 year steps depending on the span"""
+    if len(calendar.valid) < 2 or len(calendar.positions) < 2:
+        return apply_default_spacing(x_labels)
+
+    min_year = int(calendar.year.min())
+    year_span = int(calendar.year.max()) - min_year
+
+    if year_span <= 5:
+        step = 1
+    elif year_span <= 20:
+        step = 2
+    elif year_span <= 50:
+        step = 5
+    elif year_span <= 100:
+        step = 10
+    else:
+        step = 20
+
+    chosen = (calendar.year - min_year) % step == 0
+    return _tick_config(*_label(calendar, chosen, lambda index: [str(year) for year in index.year]))
+
+
+def _tick_config(tickvals, ticktext):
+    return dict({'tickmode': 'array', 'tickvals': tickvals, 'ticktext': ticktext}, **TICK_STYLE)
+
+
+def apply_default_spacing(x_labels):
+    """Default spacing for non-time-series data"""
+    if len(x_labels) <= 20:
+        return {}  # No spacing needed
+
+    # Show every nth label
+    n = max(1, len(x_labels) // 10)
+    tickvals = list(range(0, len(x_labels), n))
+    ticktext = [x_labels[i] for i in tickvals]
+
+    return {
+        'tickmode': 'array',
+        'tickvals': tickvals,
+        'ticktext': ticktext,
+        'tickangle': 45
+    }
@@ -0,0 +1,126 @@
+# utils/tier_config.py
+# 2026-10-18 23:10:00 UTC
+# Tier configuration compiled into immutable lookup tables, validated before use
+
+import json
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+
+_SCALARS = (bool, int, float, str, type(None))
+
+
+class InvalidTierConfig(ValueError):
+    """Raised when a tier configuration fails validation"""
+
+
+@dataclass(frozen=True)
+class TierRecord:
+    """One tier's settings; every mapping is read-only"""
+    name: str
+    features: Mapping[str, Any]
+    limits: Mapping[str, Any]
+    monthly_charts: int  # -1 means unlimited
+    file_size_mb: float
+    config: Mapping[str, Any]  # The tier's whole section as loaded
+
+
+@dataclass(frozen=True)
+class CompiledTierConfig:
+    """
+    A validated tier configuration. `features` and `limits` are flat
+    {(tier, name): value} tables so a lookup is a single dict access.
+    Instances are never modified; a reload builds a new one and swaps it in.
+    """
+    tiers: Mapping[str, TierRecord]
+    features: Mapping[Tuple[str, str], Any]
+    limits: Mapping[Tuple[str, str], Any]
+    source: Mapping[str, Any]  # Whole configuration as loaded, read-only
+    version: Optional[Tuple[int, int]] = None  # (mtime_ns, size) of the file it came from
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Plain dict/list copy of a frozen section, e.g. for jsonify"""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def _section(tier, tier_config, name):
+    section = tier_config.get(name, {})
+    if not isinstance(section, dict):
+        raise InvalidTierConfig(f"tiers.{tier}.{name} must be an object")
+    for key, value in section.items():
+        if not isinstance(value, _SCALARS):
+            raise InvalidTierConfig(f"tiers.{tier}.{name}.{key} must be a number, string, boolean or null")
+    return section
+
+
+def compile_tier_config(raw, version=None, required_tiers=('noob',)):
+    """Validate a parsed tiers.json and build its lookup tables; raises InvalidTierConfig"""
+    if not isinstance(raw, dict) or not isinstance(raw.get('tiers'), dict) or not raw['tiers']:
+        raise InvalidTierConfig("'tiers' must be a non-empty object")
+    missing = [tier for tier in required_tiers if tier not in raw['tiers']]
+    if missing:
+        raise InvalidTierConfig(f"Missing tiers: {', '.join(missing)}")
+
+    tiers, features, limits = {}, {}, {}
+    for tier, tier_config in raw['tiers'].items():
+        if not isinstance(tier_config, dict):
+            raise InvalidTierConfig(f"tiers.{tier} must be an object")
+        tier_features = _section(tier, tier_config, 'features')
+        tier_limits = _section(tier, tier_config, 'limits')
+
+        monthly_charts = tier_limits.get('monthlyCharts', -1)
+        if isinstance(monthly_charts, bool) or not isinstance(monthly_charts, int) or monthly_charts < -1:
+            raise InvalidTierConfig(f"tiers.{tier}.limits.monthlyCharts must be an integer >= -1")
+        file_size_mb = tier_limits.get('fileSizeMB', 5)
+        if isinstance(file_size_mb, bool) or not isinstance(file_size_mb, (int, float)) or file_size_mb <= 0:
+            raise InvalidTierConfig(f"tiers.{tier}.limits.fileSizeMB must be a positive number")
+
+        tiers[tier] = TierRecord(
+            name=str(tier_config.get('name', tier)),
+            features=MappingProxyType(dict(tier_features)),
+            limits=MappingProxyType(dict(tier_limits)),
+            monthly_charts=monthly_charts,
+            file_size_mb=float(file_size_mb),
+            config=_freeze(tier_config)
+        )
+        features.update(((tier, name), value) for name, value in tier_features.items())
+        limits.update(((tier, name), value) for name, value in tier_limits.items())
+
+    return CompiledTierConfig(
+        tiers=MappingProxyType(tiers),
+        features=MappingProxyType(features),
+        limits=MappingProxyType(limits),
+        source=_freeze(raw),
+        version=version
+    )
+
+
+def file_version(path):
+    """(mtime_ns, size) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_tier_config(path):
+    """Read and compile a tier config file; raises OSError, ValueError or InvalidTierConfig"""
+    version = file_version(path)
+    with open(path, 'r') as f:
+        raw = json.load(f)
+    return compile_tier_config(raw, version)
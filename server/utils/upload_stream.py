@@ -0,0 +1,133 @@
+# utils/upload_stream.py
+# 2026-10-18 14:30:00 UTC
+# Streaming upload helpers: spool a request body to disk and parse CSV in chunks
+
+import hashlib
+import tempfile
+import pandas as pd
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.formparser import parse_form_data
+
+SPOOL_CHUNK_BYTES = 1024 * 1024  # Read the request body 1 MB at a time
+CSV_CHUNK_ROWS = 100_000  # Rows per pandas chunk while parsing
+MULTIPART_OVERHEAD_BYTES = 64 * 1024  # Boundaries, part headers and small fields allowed beyond the file limit
+
+
+class UploadTooLarge(Exception):
+    """Raised as soon as an upload exceeds the allowed size"""
+
+    def __init__(self, max_bytes, received_bytes):
+        self.max_bytes = max_bytes
+        self.received_bytes = received_bytes
+        super().__init__(f"Upload exceeds the {max_bytes / (1024 * 1024):g} MB limit")
+
+
+class _Spool:
+    """
+    Write-only view of an anonymous temporary file that hashes and counts
+    bytes as they are written, raising UploadTooLarge past max_bytes
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.file = tempfile.TemporaryFile()
+        self.digest = hashlib.blake2b(digest_size=32)
+        self.size = 0
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadTooLarge(self.max_bytes, self.size)
+        self.digest.update(chunk)
+        return self.file.write(chunk)
+
+    def seek(self, offset, whence=0):
+        return self.file.seek(offset, whence)
+
+    def close(self):
+        self.file.close()
+
+    def result(self):
+        """(spool_file, size_in_bytes, content_hash) with the file rewound to the start"""
+        self.file.seek(0)
+        return self.file, self.size, self.digest.hexdigest()
+
+
+def spool_stream(stream, max_bytes, chunk_bytes=SPOOL_CHUNK_BYTES):
+    """
+    Copy a byte stream to an anonymous temporary file, hashing and counting as it goes.
+
+    Returns (spool_file, size_in_bytes, content_hash) with the file rewound to
+    the start. Raises UploadTooLarge once more than max_bytes have been read,
+    without reading the rest of the stream.
+    """
+    spool = _Spool(max_bytes)
+    try:
+        while True:
+            chunk = stream.read(chunk_bytes)
+            if not chunk:
+                break
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    return spool.result()
+
+
+def spool_multipart(environ, field, max_bytes):
+    """
+    Parse a multipart/form-data request body, writing the `field` file part
+    straight into a spool (no intermediate copy by Werkzeug).
+
+    Returns (spool_file, size_in_bytes, content_hash, filename), or None when
+    the body has no such file part. Raises UploadTooLarge as soon as the file
+    part passes max_bytes or the whole body passes max_bytes plus
+    MULTIPART_OVERHEAD_BYTES, which also bounds chunked bodies that declare
+    no Content-Length.
+    """
+    spools = []
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        spool = _Spool(max_bytes)
+        spools.append(spool)
+        return spool
+
+    upload = None
+    try:
+        _, _, files = parse_form_data(environ, stream_factory=stream_factory,
+                                      max_content_length=max_bytes + MULTIPART_OVERHEAD_BYTES)
+        upload = files.get(field)
+    except RequestEntityTooLarge:
+        raise UploadTooLarge(max_bytes, None)
+    finally:
+        for spool in spools:
+            if upload is None or spool is not upload.stream:
+                spool.close()
+
+    if upload is None:
+        return None
+    return (*upload.stream.result(), upload.filename)
+
+
+def read_csv_in_chunks(fileobj, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Parse a seekable CSV file object chunk by chunk and combine the chunks
+    into one DataFrame, so the raw text is never held in memory as a whole.
+    """
+    with pd.read_csv(fileobj, chunksize=chunk_rows) as reader:
+        chunks = list(reader)
+
+    if len(chunks) == 1:
+        return chunks[0]
+    df = pd.concat(chunks, ignore_index=True)
+
+    # Columns that were numeric in some chunks and text in others come out as
+    # mixed objects; re-read just those as text, as a single-pass parse would
+    mixed = [col for col in df.columns if len({str(chunk[col].dtype) for chunk in chunks}) > 1
+             and df[col].dtype == object]
+    if mixed:
+        fileobj.seek(0)
+        text = pd.read_csv(fileobj, usecols=mixed, dtype=str)
+        for col in mixed:
+            df[col] = text[col]
+    return df
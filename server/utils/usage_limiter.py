@@ -0,0 +1,162 @@
+# utils/usage_limiter.py
+# 2026-10-18 22:30:00 UTC
+# Bucketed sliding-window counters with O(1) updates and timing-wheel expiry
+
+import threading
+import time
+import numpy as np
+
+_COUNT_MAX = np.iinfo(np.uint16).max
+
+
+class SlidingWindowCounter:
+    """
+    Counts events per key over the last `window_seconds`, split into `buckets`
+    equal time buckets. Each key owns one fixed-size row of bucket counts (a
+    ring indexed by bucket number) in a shared numpy slab, so memory per key
+    is constant however many events it records; counts leave the window one
+    bucket at a time.
+
+    Idle keys are reclaimed with a timing wheel: wheel[b % buckets] holds the
+    keys last touched in bucket b. When the clock enters bucket b + buckets
+    those keys have nothing left in the window, so the whole wheel slot is set
+    aside and freed a few keys per call (expire_batch), instead of scanning
+    every key. All operations are O(1) amortized and thread-safe.
+    """
+
+    def __init__(self, window_seconds, buckets, clock=time.time, initial_capacity=1024, expire_batch=64):
+        self.buckets = buckets
+        self.bucket_seconds = window_seconds / buckets
+        self.clock = clock
+        self.expire_batch = expire_batch
+
+        self._slots = {}  # {key: row in the slab}
+        self._keys = []  # Row -> key (None for free rows)
+        self._free = []
+        self._counts = np.zeros((initial_capacity, buckets), dtype=np.uint16)
+        self._totals = np.zeros(initial_capacity, dtype=np.uint32)
+        self._last_bucket = np.zeros(initial_capacity, dtype=np.int64)
+        self._last_used = np.zeros(initial_capacity, dtype=np.float64)
+
+        self._wheel = [set() for _ in range(buckets)]
+        self._due = []  # Wheel slots that left the window, still being freed
+        self._current = None
+        self._lock = threading.Lock()
+
+    def add(self, key, amount=1):
+        """Record `amount` events for key now; returns its count in the window"""
+        with self._lock:
+            now = self._tick()
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._allocate(key)
+            else:
+                self._rotate(key, slot)
+
+            position = self._current % self.buckets
+            added = min(amount, _COUNT_MAX - int(self._counts[slot, position]))
+            self._counts[slot, position] += added
+            self._totals[slot] += added
+            self._last_used[slot] = now
+            return int(self._totals[slot])
+
+    def count(self, key):
+        """Events recorded for key within the window"""
+        return self.get(key)[0]
+
+    def get(self, key):
+        """(count within the window, time of the last event or None)"""
+        with self._lock:
+            self._tick()
+            slot = self._slots.get(key)
+            if slot is None:
+                return 0, None
+            gap = self._current - int(self._last_bucket[slot])
+            if gap >= self.buckets:
+                return 0, None
+            expired = sum(int(self._counts[slot, b % self.buckets])
+                          for b in range(self._current - gap + 1, self._current + 1))
+            return int(self._totals[slot]) - expired, float(self._last_used[slot])
+
+    def __len__(self):
+        return len(self._slots)
+
+    @property
+    def nbytes(self):
+        return int(self._counts.nbytes + self._totals.nbytes + self._last_bucket.nbytes + self._last_used.nbytes)
+
+    def _tick(self):
+        """Advance to the clock's bucket, queue wheel slots that left the window and free a few of their keys"""
+        now = self.clock()
+        bucket = int(now // self.bucket_seconds)
+        if self._current is None:
+            self._current = bucket
+        elif bucket > self._current:
+            for b in range(max(self._current + 1, bucket - self.buckets + 1), bucket + 1):
+                position = b % self.buckets
+                if self._wheel[position]:
+                    self._due.append(self._wheel[position])
+                    self._wheel[position] = set()
+            self._current = bucket
+
+        budget = self.expire_batch
+        while self._due and budget:
+            keys = self._due[-1]
+            while keys and budget:
+                key = keys.pop()
+                budget -= 1
+                slot = self._slots.get(key)
+                # Keys touched again since are already in a newer wheel slot
+                if slot is not None and int(self._last_bucket[slot]) <= self._current - self.buckets:
+                    self._release(key, slot)
+            if not keys:
+                self._due.pop()
+        return now
+
+    def _rotate(self, key, slot):
+        """Clear the buckets of key's ring that left the window and move it to the current wheel slot"""
+        last = int(self._last_bucket[slot])
+        gap = self._current - last
+        if gap <= 0:
+            return
+        if gap >= self.buckets:
+            self._counts[slot] = 0
+            self._totals[slot] = 0
+        else:
+            for b in range(last + 1, self._current + 1):
+                position = b % self.buckets
+                self._totals[slot] -= self._counts[slot, position]
+                self._counts[slot, position] = 0
+        self._last_bucket[slot] = self._current
+        self._wheel[last % self.buckets].discard(key)
+        self._wheel[self._current % self.buckets].add(key)
+
+    def _allocate(self, key):
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self._slots[key] = slot
+        self._keys[slot] = key
+        self._counts[slot] = 0
+        self._totals[slot] = 0
+        self._last_bucket[slot] = self._current
+        self._wheel[self._current % self.buckets].add(key)
+        return slot
+
+    def _release(self, key, slot):
+        del self._slots[key]
+        self._keys[slot] = None
+        self._free.append(slot)
+
+    def _grow(self):
+        old = len(self._keys)
+        new = max(old * 2, len(self._totals))
+        extra = new - len(self._totals)
+        if extra > 0:
+            self._counts = np.concatenate((self._counts, np.zeros((extra, self.buckets), dtype=np.uint16)))
+            self._totals = np.concatenate((self._totals, np.zeros(extra, dtype=np.uint32)))
+            self._last_bucket = np.resize(self._last_bucket, new)
+            self._last_used = np.resize(self._last_used, new)
+        self._keys.extend([None] * (new - old))
+        # Hand out low rows first
+        self._free.extend(range(new - 1, old - 1, -1))
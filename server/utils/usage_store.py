@@ -0,0 +1,167 @@
+# utils/usage_store.py
+# 2026-10-18 22:50:00 UTC
+# Sliding-window usage counters in SQLite, shared by every worker process
+
+import atexit
+import sqlite3
+import threading
+import time
+import weakref
+from models import get_session
+from config import USAGE_COUNTER_BACKEND, USAGE_FLUSH_SECONDS
+from utils.usage_limiter import SlidingWindowCounter
+
+# Every SharedUsageCounter, so maintenance can purge their expired buckets
+_counters = weakref.WeakSet()
+
+
+class SharedUsageCounter:
+    """
+    Same interface and bucketing as SlidingWindowCounter, but the bucket
+    counts live in the usage_counters table, so every worker enforces limits
+    against the same totals and they survive restarts.
+
+    Increments are buffered in process and added to the table by a background
+    flusher every flush_interval seconds with one batched UPSERT, so counting
+    a request costs no database write. Reads sum the key's buckets still in
+    the window plus this process's unflushed increments; increments made by
+    other workers become visible within their flush interval.
+    """
+
+    def __init__(self, name, window_seconds, buckets, flush_interval=USAGE_FLUSH_SECONDS, clock=time.time):
+        self.name = name
+        self.buckets = buckets
+        self.bucket_seconds = window_seconds / buckets
+        self.flush_interval = flush_interval
+        self.clock = clock
+
+        # {key: {bucket: count}} and {key: time of the last event} not yet written
+        self._pending = {}
+        self._pending_last_used = {}
+        self._lock = threading.Lock()
+
+        self._flusher = None
+        self._stop_flusher = threading.Event()
+        self.flushes = 0
+        _counters.add(self)
+
+    def add(self, key, amount=1):
+        """Record `amount` events for key now (written at the next flush)"""
+        now = self.clock()
+        bucket = int(now // self.bucket_seconds)
+        with self._lock:
+            counts = self._pending.setdefault(key, {})
+            counts[bucket] = counts.get(bucket, 0) + amount
+            self._pending_last_used[key] = now
+        self._start_flusher()
+
+    def count(self, key):
+        """Events recorded for key within the window"""
+        return self.get(key)[0]
+
+    def get(self, key):
+        """(count within the window, time of the last event or None)"""
+        now = self.clock()
+        oldest = int(now // self.bucket_seconds) - self.buckets + 1
+
+        conn = get_session()
+        try:
+            count, last_used = conn.execute(
+                'SELECT COALESCE(SUM(count), 0), MAX(last_used) FROM usage_counters '
+                'WHERE counter = ? AND key = ? AND bucket >= ?',
+                (self.name, key, oldest)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending:
+                count += sum(n for bucket, n in pending.items() if bucket >= oldest)
+                last_used = max(last_used or 0, self._pending_last_used[key])
+        if not count:
+            return 0, None
+        return count, last_used
+
+    def _start_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name=f'usage-flusher-{self.name}', daemon=True)
+            self._flusher.start()
+        atexit.register(self.stop)
+
+    def _flush_loop(self):
+        while not self._stop_flusher.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"⚠️  Failed to flush usage counters: {e}")
+
+    def flush(self):
+        """Add buffered increments to the table in one transaction; returns how many buckets were written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            last_used, self._pending_last_used = self._pending_last_used, {}
+        if not pending:
+            return 0
+
+        rows = [(self.name, key, bucket, count, last_used[key])
+                for key, counts in pending.items() for bucket, count in counts.items()]
+        conn = get_session()
+        try:
+            conn.executemany(
+                'INSERT INTO usage_counters (counter, key, bucket, count, last_used) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (counter, key, bucket) DO UPDATE SET '
+                'count = count + excluded.count, last_used = MAX(last_used, excluded.last_used)',
+                rows
+            )
+            conn.commit()
+        except sqlite3.Error:
+            # Merge the increments back for the next attempt
+            with self._lock:
+                for key, counts in pending.items():
+                    merged = self._pending.setdefault(key, {})
+                    for bucket, count in counts.items():
+                        merged[bucket] = merged.get(bucket, 0) + count
+                    self._pending_last_used[key] = max(self._pending_last_used.get(key, 0), last_used[key])
+            raise
+        finally:
+            conn.close()
+        self.flushes += 1
+        return len(rows)
+
+    def stop(self):
+        """Stop the background flusher and write any buffered increments"""
+        self._stop_flusher.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self.flush()
+
+    def purge_expired(self):
+        """Delete buckets that left the window; returns how many rows were removed"""
+        oldest = int(self.clock() // self.bucket_seconds) - self.buckets + 1
+        conn = get_session()
+        try:
+            cursor = conn.execute('DELETE FROM usage_counters WHERE counter = ? AND bucket < ?', (self.name, oldest))
+            removed = cursor.rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return removed
+
+
+def purge_expired_usage():
+    """Purge expired buckets of every shared counter; returns how many rows were removed"""
+    return sum(counter.purge_expired() for counter in list(_counters))
+
+
+def create_usage_counter(name, window_seconds, buckets, backend=USAGE_COUNTER_BACKEND):
+    """SharedUsageCounter for 'sqlite', or a per-process SlidingWindowCounter for 'memory'"""
+    if backend == 'sqlite':
+        return SharedUsageCounter(name, window_seconds, buckets)
+    if backend == 'memory':
+        return SlidingWindowCounter(window_seconds, buckets)
+    raise ValueError(f"Unknown usage counter backend: {backend}")
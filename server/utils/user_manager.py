@@ -2,20 +2,60 @@
 # 2025-07-28 17:50:00 UTC
 # User session management for hybrid storage system
 
+import atexit
 import uuid
 import sqlite3
-from datetime import datetime, timedelta
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from models import get_session
+from config import SESSION_CACHE_TTL_SECONDS, SESSION_CACHE_MAX_ENTRIES, SESSION_ACTIVITY_FLUSH_SECONDS
 
 class UserManager:
-    def __init__(self):
+    """
+    Maps session IDs to user IDs.
+    
+    Known sessions are answered from an in-process map whose entries are
+    re-checked against the database after cache_ttl seconds (so sessions
+    removed by another process eventually disappear here too). Activity
+    timestamps are buffered and written by a background flusher every
+    flush_interval seconds in one batch, instead of an UPDATE and commit per
+    request. New sessions are still inserted and committed immediately.
+    cache_ttl=0 turns both off and restores the write-per-request behaviour.
+    """
+    
+    def __init__(self, cache_ttl=SESSION_CACHE_TTL_SECONDS, max_entries=SESSION_CACHE_MAX_ENTRIES,
+                 flush_interval=SESSION_ACTIVITY_FLUSH_SECONDS):
         self.session_timeout = timedelta(hours=24)  # 24 hour session timeout
+        self.cache_ttl = cache_ttl
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        
+        # {session_id: (user_id, cached_at)} in LRU -> MRU order
+        self._sessions = OrderedDict()
+        # {session_id: last activity as a SQLite CURRENT_TIMESTAMP string (UTC)}
+        self._pending_activity = {}
+        self._lock = threading.Lock()
+        
+        self._flusher = None
+        self._stop_flusher = threading.Event()
+        
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
     
     def get_or_create_user_id(self, session_id=None):
         """Get or create a user ID from session"""
         if not session_id:
             session_id = str(uuid.uuid4())
         
+        if self.cache_ttl:
+            user_id = self._cached_user(session_id)
+            if user_id is not None:
+                self._record_activity(session_id)
+                return user_id
+        
         conn = get_session()
         cursor = conn.cursor()
         
@@ -24,32 +64,123 @@ class UserManager:
         result = cursor.fetchone()
         
         if result:
-            # Update last activity
-            cursor.execute('UPDATE user_sessions SET last_activity = CURRENT_TIMESTAMP WHERE session_id = ?', (session_id,))
-            conn.commit()
             user_id = result[0]
+            if self.cache_ttl:
+                self._record_activity(session_id)
+            else:
+                # Update last activity
+                cursor.execute('UPDATE user_sessions SET last_activity = CURRENT_TIMESTAMP WHERE session_id = ?',
+                               (session_id,))
+                conn.commit()
         else:
-            # Create new user session
-            user_id = str(uuid.uuid4())
-            cursor.execute('INSERT INTO user_sessions (session_id, user_id) VALUES (?, ?)', (session_id, user_id))
+            # Create new user session; a concurrent request may create it first
+            cursor.execute('INSERT OR IGNORE INTO user_sessions (session_id, user_id) VALUES (?, ?)',
+                           (session_id, str(uuid.uuid4())))
             conn.commit()
+            cursor.execute('SELECT user_id FROM user_sessions WHERE session_id = ?', (session_id,))
+            user_id = cursor.fetchone()[0]
         
         conn.close()
+        if self.cache_ttl:
+            self._cache_user(session_id, user_id)
         return user_id
     
+    def _cached_user(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or time.monotonic() - entry[1] > self.cache_ttl:
+                self.misses += 1
+                return None
+            self._sessions.move_to_end(session_id)
+            self.hits += 1
+            return entry[0]
+    
+    def _cache_user(self, session_id, user_id):
+        with self._lock:
+            self._sessions[session_id] = (user_id, time.monotonic())
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+    
+    def _record_activity(self, session_id):
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            self._pending_activity[session_id] = now
+        self._start_flusher()
+    
+    def _start_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name='session-activity-flusher', daemon=True)
+            self._flusher.start()
+        atexit.register(self.stop)
+    
+    def _flush_loop(self):
+        while not self._stop_flusher.wait(self.flush_interval):
+            try:
+                self.flush_activity()
+            except sqlite3.Error as e:
+                print(f"⚠️  Failed to flush session activity: {e}")
+    
+    def flush_activity(self):
+        """Write buffered last_activity timestamps in one transaction; returns how many were written"""
+        with self._lock:
+            pending, self._pending_activity = self._pending_activity, {}
+        if not pending:
+            return 0
+        
+        conn = get_session()
+        try:
+            conn.executemany('UPDATE user_sessions SET last_activity = ? WHERE session_id = ?',
+                             [(timestamp, session_id) for session_id, timestamp in pending.items()])
+            conn.commit()
+        except sqlite3.Error:
+            # Keep the timestamps for the next attempt unless newer ones arrived
+            with self._lock:
+                for session_id, timestamp in pending.items():
+                    self._pending_activity.setdefault(session_id, timestamp)
+            raise
+        finally:
+            conn.close()
+        self.flushes += 1
+        return len(pending)
+    
+    def stop(self):
+        """Stop the background flusher and write any buffered activity"""
+        self._stop_flusher.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self.flush_activity()
+    
     def cleanup_expired_sessions(self):
-        """Remove expired sessions from database"""
+        """Remove expired sessions from database; returns how many were removed"""
+        # Buffered activity may keep a session alive
+        self.flush_activity()
+        
         conn = get_session()
         cursor = conn.cursor()
         
         # SQLite doesn't have a direct way to subtract timedelta, so we'll use a simpler approach
         # For now, we'll just delete sessions older than 24 hours
         cursor.execute('DELETE FROM user_sessions WHERE last_activity < datetime("now", "-24 hours")')
+        removed = cursor.rowcount
         conn.commit()
         conn.close()
+        
+        with self._lock:
+            self._sessions.clear()
+        return removed
     
     def get_user_from_session(self, session_id):
         """Get user ID from session ID"""
+        if self.cache_ttl:
+            user_id = self._cached_user(session_id)
+            if user_id is not None:
+                return user_id
+        
         conn = get_session()
         cursor = conn.cursor()
         cursor.execute('SELECT user_id FROM user_sessions WHERE session_id = ?', (session_id,))
@@ -57,8 +188,20 @@ class UserManager:
         conn.close()
         
         if result:
+            if self.cache_ttl:
+                self._cache_user(session_id, result[0])
             return result[0]
         return None
+    
+    def get_stats(self):
+        with self._lock:
+            return {
+                'cached_sessions': len(self._sessions),
+                'pending_activity': len(self._pending_activity),
+                'hits': self.hits,
+                'misses': self.misses,
+                'flushes': self.flushes
+            }
 
 # Global user manager instance
-user_manager = UserManager() 
\ No newline at end of file
+user_manager = UserManager()